@@ -0,0 +1,166 @@
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Sequence
+from kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.common import ResponseObject
+from kong_gateway_client.resources.consumers import KongConsumer
+from kong_gateway_client.utils.concurrency import run_concurrently
+from benchmarks.server import ServerProcess, generate
+
+
+class Metric:
+    """One measurement of a benchmark run."""
+
+    def __init__(
+        self, name: str, value: float, unit: str, lower_is_better: bool = True
+    ) -> None:
+        """Initializes the Metric object.
+
+        Args:
+            name (str): A stable name, used as the baseline key.
+            value (float): The measured value.
+            unit (str): The unit of the value, e.g. "us" or "MB".
+            lower_is_better (bool, optional): Whether a lower value is an
+                                              improvement. Defaults to True.
+        """
+        self.name = name
+        self.value = value
+        self.unit = unit
+        self.lower_is_better = lower_is_better
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "value": self.value,
+            "unit": self.unit,
+            "lower_is_better": self.lower_is_better,
+        }
+
+    def __repr__(self) -> str:
+        return f"<Metric(name={self.name}, value={self.value:.3f} {self.unit})>"
+
+
+def _client(url: str) -> KongClient:
+    return KongAPIClient(url, admin_token="bench").get_kong_client()
+
+
+def _best(
+    func: Callable[[], Any],
+    repeat: int = 3,
+    clock: Callable[[], float] = time.perf_counter,
+) -> float:
+    """Return the fastest of `repeat` runs of `func`, in seconds of `clock`."""
+    timings = []
+    for _ in range(repeat):
+        start = clock()
+        func()
+        timings.append(clock() - start)
+    return min(timings)
+
+
+def request_overhead(calls: int) -> List[Metric]:
+    """
+    Time `KongClient.request` against a bare `Session.get` of the same URL.
+
+    Both are also measured in CPU time of this process, which excludes the
+    server. Their difference is the overhead of the client itself; it is not
+    reported as a metric, as it is too small to compare across runs reliably.
+    """
+    with ServerProcess([("consumers", 1)]) as server:
+        client = _client(server.url)
+        endpoint = "/consumers/consumer-0"
+        url = f"{client.admin_ws_url}{endpoint}"
+
+        def raw() -> None:
+            for _ in range(calls):
+                client.session.get(url).json()
+
+        def wrapped() -> None:
+            for _ in range(calls):
+                client.request("GET", endpoint)
+
+        raw()
+        request_seconds = _best(wrapped) / calls
+        raw_cpu = _best(raw, 5, time.process_time) / calls
+        request_cpu = _best(wrapped, 5, time.process_time) / calls
+    return [
+        Metric("request.per_call", request_seconds * 1e6, "us"),
+        Metric("request.cpu_per_call", request_cpu * 1e6, "us"),
+        Metric("request.session_cpu_per_call", raw_cpu * 1e6, "us"),
+    ]
+
+
+def fetch_all_throughput(entities: int, page_size: int = 1000) -> List[Metric]:
+    """Time `fetch_all` over every page of a collection."""
+    with ServerProcess([("consumers", entities)]) as server:
+        client = _client(server.url)
+        seconds = _best(lambda: client.fetch_all("/consumers", page_size), 2)
+    pages = -(-entities // page_size)
+    return [
+        Metric("fetch_all.entities_per_s", entities / seconds, "1/s", False),
+        Metric("fetch_all.per_page", seconds / pages * 1e3, "ms"),
+    ]
+
+
+def model_construction(entities: int) -> List[Metric]:
+    """Time building ResponseObject and KongConsumer objects from raw data."""
+    data = [
+        {"id": str(index), "created_at": 0, "updated_at": 0, **consumer}
+        for index, consumer in enumerate(generate("consumers", entities))
+    ]
+    response_seconds = _best(lambda: [ResponseObject(item) for item in data])
+    model_seconds = _best(lambda: [KongConsumer(item) for item in data])
+    return [
+        Metric("models.response_object", response_seconds / entities * 1e6, "us"),
+        Metric("models.kong_consumer", model_seconds / entities * 1e6, "us"),
+    ]
+
+
+def get_all_memory(sizes: Sequence[int]) -> List[Metric]:
+    """Measure the peak memory of `Consumer.get_all` at several sizes."""
+    metrics = []
+    for size in sizes:
+        with ServerProcess([("consumers", size)]) as server:
+            client = _client(server.url)
+            tracemalloc.start()
+            try:
+                start = time.perf_counter()
+                consumers = client.consumer.get_all()
+                seconds = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            del consumers
+        metrics.append(Metric(f"get_all.{size}.peak", peak / 2**20, "MB"))
+        metrics.append(Metric(f"get_all.{size}.per_entity", peak / size, "B"))
+        metrics.append(Metric(f"get_all.{size}.seconds", seconds, "s"))
+    return metrics
+
+
+def bulk_write(
+    writes: int, workers: Sequence[int], latency: float = 0.002
+) -> List[Metric]:
+    """Measure upsert throughput at several concurrency levels."""
+    metrics = []
+    with ServerProcess(latency=latency) as server:
+        client = _client(server.url)
+        for max_workers in workers:
+
+            def upsert(index: int, max_workers: int = max_workers) -> Any:
+                return client.consumer.upsert(f"bulk-{max_workers}-{index}")
+
+            start = time.perf_counter()
+            results = run_concurrently(upsert, range(writes), max_workers)
+            seconds = time.perf_counter() - start
+            failed = [result for result in results if not result.ok]
+            if failed:
+                raise failed[0].error
+            metrics.append(
+                Metric(
+                    f"bulk_write.workers_{max_workers}.writes_per_s",
+                    writes / seconds,
+                    "1/s",
+                    False,
+                )
+            )
+    return metrics
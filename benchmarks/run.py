@@ -0,0 +1,158 @@
+"""
+Run the client benchmarks and compare them with a stored baseline.
+
+Usage:
+    python -m benchmarks.run [--quick] [--save] [--threshold 0.2]
+
+Every benchmark runs against a FakeAdminAPI in a child process. Results are
+compared with the baseline file when it exists, and the exit status is 1 when
+any metric is worse than the baseline by more than the threshold. Baselines
+depend on the machine, so save one on the machine that compares against it.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from typing import Any, Dict, List, Tuple
+from benchmarks import cases
+from benchmarks.cases import Metric
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Arguments of each benchmark, for a full and a quick run.
+FULL: Dict[str, Dict[str, Any]] = {
+    "request_overhead": {"calls": 1000},
+    "fetch_all_throughput": {"entities": 50000},
+    "model_construction": {"entities": 100000},
+    "get_all_memory": {"sizes": [10000, 100000]},
+    "bulk_write": {"writes": 1000, "workers": [1, 4, 8]},
+}
+QUICK: Dict[str, Dict[str, Any]] = {
+    "request_overhead": {"calls": 200},
+    "fetch_all_throughput": {"entities": 5000},
+    "model_construction": {"entities": 10000},
+    "get_all_memory": {"sizes": [10000]},
+    "bulk_write": {"writes": 200, "workers": [1, 8]},
+}
+
+
+def run(settings: Dict[str, Dict[str, Any]], only: List[str]) -> List[Metric]:
+    metrics: List[Metric] = []
+    for name, kwargs in settings.items():
+        if only and name not in only:
+            continue
+        print(f"Running {name}...", file=sys.stderr)
+        metrics.extend(getattr(cases, name)(**kwargs))
+    return metrics
+
+
+def compare(
+    metrics: List[Metric], baseline: Dict[str, Any], threshold: float
+) -> List[Tuple[Metric, float]]:
+    """
+    Return the metrics that regressed, with their change from the baseline.
+
+    Args:
+        metrics (List[Metric]): The current results.
+        baseline (Dict[str, Any]): A baseline written by `--save`.
+        threshold (float): The relative change tolerated, e.g. 0.2 for 20%.
+
+    Returns:
+        List[Tuple[Metric, float]]: Each regressed metric and its relative
+                                    change, positive when it got worse.
+    """
+    regressions = []
+    for metric in metrics:
+        previous = baseline.get("metrics", {}).get(metric.name)
+        if not previous or not previous["value"]:
+            continue
+        change = (metric.value - previous["value"]) / abs(previous["value"])
+        if not metric.lower_is_better:
+            change = -change
+        if change > threshold:
+            regressions.append((metric, change))
+    return regressions
+
+
+def _load_baseline(path: str, quick: bool) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("quick") != quick:
+        print("The baseline was run with other sizes, skipping.", file=sys.stderr)
+        return {}
+    return baseline
+
+
+def _print_results(
+    metrics: List[Metric], baseline: Dict[str, Any], regressions: Dict[str, float]
+) -> None:
+    for metric in metrics:
+        previous = baseline.get("metrics", {}).get(metric.name)
+        line = f"{metric.name:<40} {metric.value:>14.3f} {metric.unit:<4}"
+        if previous:
+            line += f" (baseline {previous['value']:.3f})"
+        if metric.name in regressions:
+            line += f" REGRESSION {regressions[metric.name]:+.0%}"
+        print(line)
+
+
+def _write_results(path: str, results: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="Use smaller sizes.")
+    parser.add_argument("--save", action="store_true", help="Save as baseline.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--output", help="Also write the results to this file.")
+    parser.add_argument(
+        "--sizes", help="Comma separated get_all sizes, e.g. 10000,1000000."
+    )
+    parser.add_argument("only", nargs="*", help="Only run these benchmarks.")
+    args = parser.parse_args()
+
+    settings = json.loads(json.dumps(QUICK if args.quick else FULL))
+    if args.sizes:
+        settings["get_all_memory"]["sizes"] = [int(s) for s in args.sizes.split(",")]
+    metrics = run(settings, args.only)
+
+    baseline = _load_baseline(args.baseline, args.quick)
+    regressions = {
+        metric.name: change
+        for metric, change in compare(metrics, baseline, args.threshold)
+    }
+    _print_results(metrics, baseline, regressions)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "metrics": {metric.name: metric.as_dict() for metric in metrics},
+    }
+    if args.output:
+        _write_results(args.output, results)
+    if args.save:
+        if baseline:
+            # Keep metrics of benchmarks that were not run this time.
+            results["metrics"] = {**baseline["metrics"], **results["metrics"]}
+        _write_results(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}.", file=sys.stderr)
+        return 0
+    if regressions:
+        print(
+            f"{len(regressions)} metric(s) regressed by more than "
+            f"{args.threshold:.0%}.",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
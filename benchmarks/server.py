@@ -0,0 +1,77 @@
+import multiprocessing
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from kong_gateway_client.testing.fake_admin_api import FakeAdminAPI
+
+# An entity type and the number of entities of it to generate.
+Fixture = Tuple[str, int]
+
+
+def generate(entity_type: str, count: int) -> Iterator[Dict[str, Any]]:
+    """Yield `count` synthetic entities of a type."""
+    for index in range(count):
+        if entity_type == "consumers":
+            yield {"username": f"consumer-{index}", "tags": ["bench"]}
+        elif entity_type == "services":
+            yield {"name": f"service-{index}", "host": f"s{index}.local"}
+        elif entity_type == "consumer_groups":
+            yield {"name": f"group-{index}"}
+        else:
+            raise ValueError(f"No generator for {entity_type}.")
+
+
+def _serve(
+    fixtures: Sequence[Fixture],
+    latency: float,
+    urls: "multiprocessing.Queue[str]",
+    stop: Any,
+) -> None:
+    api = FakeAdminAPI(latency=latency)
+    for entity_type, count in fixtures:
+        api.load(entity_type, generate(entity_type, count))
+    with api:
+        urls.put(api.url)
+        stop.wait()
+
+
+class ServerProcess:
+    """
+    Run a FakeAdminAPI in a child process.
+
+    The server gets its own interpreter so that its request handling does not
+    compete with the client for the GIL, and its allocations do not show up in
+    the client's memory measurements.
+    """
+
+    def __init__(
+        self, fixtures: Optional[List[Fixture]] = None, latency: float = 0.0
+    ) -> None:
+        """Initializes the ServerProcess object.
+
+        Args:
+            fixtures (Optional[List[Fixture]], optional): Entities to generate
+                                                          before serving.
+            latency (float, optional): Seconds the server waits per request.
+        """
+        self.fixtures = fixtures or []
+        self.latency = latency
+        self.url: Optional[str] = None
+        self._stop = multiprocessing.Event()
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "ServerProcess":
+        urls: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(self.fixtures, self.latency, urls, self._stop),
+            daemon=True,
+        )
+        self._process.start()
+        self.url = urls.get(timeout=600)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._process is not None:
+            self._process.join(timeout=10)
+            if self._process.is_alive():
+                self._process.terminate()
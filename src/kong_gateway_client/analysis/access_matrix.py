@@ -0,0 +1,388 @@
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.state.snapshot import WorkspaceSnapshot, reference_value
+
+ACL_PLUGIN = "acl"
+KEY_AUTH_PLUGIN = "key-auth"
+ACCESS_PLUGINS = (ACL_PLUGIN, KEY_AUTH_PLUGIN)
+
+
+def _as_dict(entity: Any) -> Dict[str, Any]:
+    """Accept raw entity data as well as model objects such as KongRoute."""
+    return entity if isinstance(entity, dict) else vars(entity)
+
+
+def _empty(size: int) -> bytearray:
+    return bytearray((size + 7) // 8)
+
+
+def _set_bit(bitmap: bytearray, position: int) -> None:
+    bitmap[position >> 3] |= 1 << (position & 7)
+
+
+class RoutePolicy:
+    """The access rules in effect on one route."""
+
+    def __init__(
+        self,
+        key_auth: bool = False,
+        allow: Optional[FrozenSet[str]] = None,
+        deny: Optional[FrozenSet[str]] = None,
+    ) -> None:
+        """Initializes the RoutePolicy object.
+
+        Args:
+            key_auth (bool, optional): Whether key-auth is enforced.
+            allow (Optional[FrozenSet[str]], optional): The ACL allow list.
+            deny (Optional[FrozenSet[str]], optional): The ACL deny list.
+        """
+        self.key_auth = key_auth
+        self.allow = allow
+        self.deny = deny
+
+    @property
+    def has_acl(self) -> bool:
+        return self.allow is not None or self.deny is not None
+
+    def admits(self, groups: Set[str], has_key: bool) -> bool:
+        """Whether a consumer with these ACL groups and credentials gets in."""
+        if self.key_auth and not has_key:
+            return False
+        if self.has_acl and not self.key_auth:
+            # The ACL plugin rejects requests without an identified consumer.
+            return False
+        if self.allow is not None and not groups & self.allow:
+            return False
+        return not (self.deny and groups & self.deny)
+
+    def __repr__(self) -> str:
+        return (
+            f"<RoutePolicy(key_auth={self.key_auth}, allow={self.allow}, "
+            f"deny={self.deny})>"
+        )
+
+
+class AccessMatrix:
+    """
+    Which consumers can reach which routes through key-auth and ACL plugins.
+
+    Consumers are numbered and every ACL group is stored as a bitset, a Python
+    integer with one bit per member, as is the set of consumers holding a
+    key-auth key. A route's column is then a handful of bitwise operations
+    over whole groups: the key holders, AND the union of the allowed groups,
+    AND NOT the union of the denied groups.
+
+    Each route's acl and key-auth plugins are resolved like Kong does, with a
+    route plugin taking precedence over a service plugin and a service plugin
+    over a global one. Routes without key-auth are open to everyone, unless
+    they have an ACL, which then rejects every request as no consumer is
+    identified. The `anonymous` setting of key-auth is not modelled.
+    """
+
+    def __init__(
+        self,
+        consumers: Iterable[Any],
+        routes: Iterable[Any],
+        plugins: Iterable[Any],
+        acls: Iterable[Dict[str, Any]],
+        key_auths: Iterable[Dict[str, Any]],
+    ) -> None:
+        """Initializes the AccessMatrix object.
+
+        Args:
+            consumers (Iterable[Any]): Raw consumer data or KongConsumer objects.
+            routes (Iterable[Any]): Raw route data or KongRoute objects.
+            plugins (Iterable[Any]): Raw plugin data or KongPlugin objects.
+            acls (Iterable[Dict[str, Any]]): Entries of the `/acls` collection.
+            key_auths (Iterable[Dict[str, Any]]): Entries of the `/key-auths`
+                                                  collection.
+        """
+        self.consumer_ids: List[Optional[str]] = [
+            _as_dict(consumer)["id"] for consumer in consumers
+        ]
+        self.positions: Dict[str, int] = {
+            consumer_id: position
+            for position, consumer_id in enumerate(self.consumer_ids)
+        }
+        self.all_consumers = (1 << len(self.consumer_ids)) - 1
+
+        # Bitsets are built from bytes at once, as setting bits one by one
+        # copies the whole integer every time.
+        size = len(self.consumer_ids)
+        self.consumer_groups: Dict[str, Set[str]] = {}
+        members: Dict[str, bytearray] = {}
+        for acl in acls:
+            consumer_id = reference_value(acl.get("consumer"))
+            if consumer_id in self.positions:
+                group = acl["group"]
+                self.consumer_groups.setdefault(consumer_id, set()).add(group)
+                if group not in members:
+                    members[group] = _empty(size)
+                _set_bit(members[group], self.positions[consumer_id])
+        self.groups: Dict[str, int] = {
+            group: int.from_bytes(bitmap, "little") for group, bitmap in members.items()
+        }
+
+        holders = _empty(size)
+        for key_auth in key_auths:
+            consumer_id = reference_value(key_auth.get("consumer"))
+            if consumer_id in self.positions:
+                _set_bit(holders, self.positions[consumer_id])
+        self.key_holders = int.from_bytes(holders, "little")
+
+        self.routes: Dict[str, Dict[str, Any]] = {}
+        for route in routes:
+            route = _as_dict(route)
+            self.routes[route["id"]] = route
+        self.plugins: Dict[str, Dict[str, Any]] = {}
+        self.scoped_plugins: Dict[Tuple[str, Any, Any], Dict[str, Any]] = {}
+        for plugin in plugins:
+            plugin = _as_dict(plugin)
+            if plugin.get("name") in ACCESS_PLUGINS:
+                self.plugins[plugin["id"]] = plugin
+                self._index_plugin(plugin, add=True)
+
+        self.policies: Dict[str, RoutePolicy] = {}
+        self.access: Dict[str, int] = {}
+        for route_id in self.routes:
+            self._recompute_route(route_id)
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: WorkspaceSnapshot,
+        acls: Iterable[Dict[str, Any]],
+        key_auths: Iterable[Dict[str, Any]],
+    ) -> "AccessMatrix":
+        """Build a matrix from a snapshot and the workspace's credentials."""
+        return cls(
+            snapshot.entities["consumers"],
+            snapshot.entities["routes"],
+            snapshot.entities["plugins"],
+            acls,
+            key_auths,
+        )
+
+    @classmethod
+    def fetch(cls, client: KongClient, page_size: int = 1000) -> "AccessMatrix":
+        """
+        Build a matrix from the client's target workspace.
+
+        Args:
+            client (KongClient): The client to read with.
+            page_size (int, optional): The page size for the credential reads.
+
+        Returns:
+            AccessMatrix: The access matrix.
+        """
+        snapshot = WorkspaceSnapshot.fetch(
+            client, entity_types=("consumers", "routes", "plugins")
+        )
+        return cls.from_snapshot(
+            snapshot,
+            client.iter_all("/acls", page_size),
+            client.iter_all("/key-auths", page_size),
+        )
+
+    def _bit(self, consumer_id: str) -> int:
+        position = self.positions.get(consumer_id)
+        return 0 if position is None else 1 << position
+
+    def _add_consumer(self, consumer_id: str) -> int:
+        self.positions[consumer_id] = len(self.consumer_ids)
+        self.consumer_ids.append(consumer_id)
+        bit = self._bit(consumer_id)
+        self.all_consumers |= bit
+        return bit
+
+    @staticmethod
+    def _scope(plugin: Dict[str, Any]) -> Optional[Tuple[str, Any, Any]]:
+        """Return the index key of a plugin, or None if it never applies."""
+        if plugin.get("enabled") is False:
+            return None
+        if plugin.get("consumer") or plugin.get("consumer_group"):
+            return None
+        return (
+            plugin["name"],
+            reference_value(plugin.get("route")),
+            reference_value(plugin.get("service")),
+        )
+
+    def _index_plugin(self, plugin: Dict[str, Any], add: bool) -> None:
+        scope = self._scope(plugin)
+        if scope is None:
+            return
+        if add:
+            self.scoped_plugins[scope] = plugin
+        elif self.scoped_plugins.get(scope) is plugin:
+            del self.scoped_plugins[scope]
+
+    def _effective_plugin(
+        self, route: Dict[str, Any], name: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the plugin of `name` Kong would run on a route, if any."""
+        service_id = reference_value(route.get("service"))
+        for scope in (
+            (name, route["id"], service_id),
+            (name, route["id"], None),
+            (name, None, service_id),
+            (name, None, None),
+        ):
+            plugin = self.scoped_plugins.get(scope)
+            if plugin is not None:
+                return plugin
+        return None
+
+    def _policy(self, route: Dict[str, Any]) -> RoutePolicy:
+        acl = self._effective_plugin(route, ACL_PLUGIN)
+        config = (acl or {}).get("config") or {}
+        allow, deny = config.get("allow"), config.get("deny")
+        return RoutePolicy(
+            key_auth=self._effective_plugin(route, KEY_AUTH_PLUGIN) is not None,
+            allow=frozenset(allow) if allow else None,
+            deny=frozenset(deny) if deny else None,
+        )
+
+    def _union(self, groups: Iterable[str]) -> int:
+        bits = 0
+        for group in groups:
+            bits |= self.groups.get(group, 0)
+        return bits
+
+    def _recompute_route(self, route_id: str) -> None:
+        policy = self._policy(self.routes[route_id])
+        self.policies[route_id] = policy
+        if policy.has_acl and not policy.key_auth:
+            self.access[route_id] = 0
+            return
+        bits = self.key_holders if policy.key_auth else self.all_consumers
+        if policy.allow is not None:
+            bits &= self._union(policy.allow)
+        if policy.deny:
+            bits &= ~self._union(policy.deny)
+        self.access[route_id] = bits
+
+    def _routes_using(self, plugin: Dict[str, Any]) -> List[str]:
+        route_id = reference_value(plugin.get("route"))
+        service_id = reference_value(plugin.get("service"))
+        return [
+            r
+            for r, route in self.routes.items()
+            if (not route_id or r == route_id)
+            and (not service_id or reference_value(route.get("service")) == service_id)
+        ]
+
+    def can_access(self, consumer_id: str, route_id: str) -> bool:
+        """Whether a consumer can reach a route."""
+        return bool(self.access.get(route_id, 0) & self._bit(consumer_id))
+
+    def consumers_for(self, route_id: str) -> List[str]:
+        """Return the IDs of the consumers that can reach a route."""
+        # The binary string is read once, as shifting per bit is quadratic.
+        bits = bin(self.access.get(route_id, 0))[:1:-1]
+        return [
+            self.consumer_ids[position]
+            for position, bit in enumerate(bits)
+            if bit == "1" and self.consumer_ids[position] is not None
+        ]
+
+    def routes_for(self, consumer_id: str) -> List[str]:
+        """Return the IDs of the routes a consumer can reach."""
+        bit = self._bit(consumer_id)
+        if not bit:
+            return []
+        return [route_id for route_id, bits in self.access.items() if bits & bit]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of consumers that can reach each route."""
+        return {
+            route_id: bin(bits).count("1") for route_id, bits in self.access.items()
+        }
+
+    def update_consumer(
+        self, consumer_id: str, groups: Iterable[str], has_key: bool
+    ) -> None:
+        """
+        Replace one consumer's ACL groups and key-auth status.
+
+        Only the consumer's bit is updated in every group and route, without
+        rebuilding the other bitsets.
+
+        Args:
+            consumer_id (str): The ID of the consumer, which may be new.
+            groups (Iterable[str]): The consumer's ACL groups.
+            has_key (bool): Whether the consumer holds a key-auth key.
+        """
+        bit = self._bit(consumer_id) or self._add_consumer(consumer_id)
+        groups = set(groups)
+        for group in self.consumer_groups.get(consumer_id, set()) - groups:
+            self.groups[group] &= ~bit
+        for group in groups:
+            self.groups[group] = self.groups.get(group, 0) | bit
+        self.consumer_groups[consumer_id] = groups
+        if has_key:
+            self.key_holders |= bit
+        else:
+            self.key_holders &= ~bit
+        for route_id, policy in self.policies.items():
+            if policy.admits(groups, has_key):
+                self.access[route_id] |= bit
+            else:
+                self.access[route_id] &= ~bit
+
+    def remove_consumer(self, consumer_id: str) -> None:
+        """Remove a consumer. Its bit position is not reused."""
+        position = self.positions.pop(consumer_id, None)
+        if position is None:
+            return
+        self.consumer_ids[position] = None
+        mask = ~(1 << position)
+        self.all_consumers &= mask
+        self.key_holders &= mask
+        for group in self.consumer_groups.pop(consumer_id, set()):
+            self.groups[group] &= mask
+        for route_id in self.access:
+            self.access[route_id] &= mask
+
+    def update_plugin(self, plugin: Any) -> None:
+        """Add or replace an acl or key-auth plugin and recompute its routes."""
+        plugin = _as_dict(plugin)
+        if plugin.get("name") not in ACCESS_PLUGINS:
+            return
+        previous = self.plugins.get(plugin["id"])
+        if previous is not None:
+            self._index_plugin(previous, add=False)
+        self.plugins[plugin["id"]] = plugin
+        self._index_plugin(plugin, add=True)
+        affected = set(self._routes_using(plugin))
+        if previous is not None:
+            affected.update(self._routes_using(previous))
+        for route_id in affected:
+            self._recompute_route(route_id)
+
+    def remove_plugin(self, plugin_id: str) -> None:
+        """Remove a plugin, recomputing the routes it applied to."""
+        plugin = self.plugins.pop(plugin_id, None)
+        if plugin is not None:
+            self._index_plugin(plugin, add=False)
+            for route_id in self._routes_using(plugin):
+                self._recompute_route(route_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.routes)
+
+    def __repr__(self) -> str:
+        return (
+            f"<AccessMatrix(consumers={len(self.positions)}, "
+            f"routes={len(self.routes)}, groups={len(self.groups)})>"
+        )
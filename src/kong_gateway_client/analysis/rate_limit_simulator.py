@@ -0,0 +1,231 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional and only speeds up large traces.
+    np = None
+
+SLIDING = "sliding"
+FIXED = "fixed"
+
+
+class SimulationResult:
+    """The outcome of replaying one request trace."""
+
+    def __init__(
+        self, total: int, rejected: int, first_rejected_at: Optional[float] = None
+    ) -> None:
+        """Initializes the SimulationResult object.
+
+        Args:
+            total (int): The number of requests replayed.
+            rejected (int): The number of requests that would be rejected.
+            first_rejected_at (Optional[float], optional): The timestamp of the
+                                                           first rejection.
+        """
+        self.total = total
+        self.rejected = rejected
+        self.first_rejected_at = first_rejected_at
+
+    @property
+    def accepted(self) -> int:
+        return self.total - self.rejected
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.rejected / self.total if self.total else 0.0
+
+    def __add__(self, other: "SimulationResult") -> "SimulationResult":
+        firsts = [
+            t
+            for t in (self.first_rejected_at, other.first_rejected_at)
+            if t is not None
+        ]
+        return SimulationResult(
+            self.total + other.total,
+            self.rejected + other.rejected,
+            min(firsts) if firsts else None,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<SimulationResult(total={self.total}, accepted={self.accepted}, "
+            f"rejected={self.rejected})>"
+        )
+
+
+class RateLimitSimulator:
+    """
+    Replay request timestamps against rate-limiting-advanced window counters.
+
+    Windows are aligned to multiples of their size, as in Kong. A fixed window
+    rejects a request once the window already holds `limit` accepted requests.
+    A sliding window weighs the previous window's count by the share of it
+    still covered by a window ending now, and rejects a request when
+    `current + previous * weight` has reached `limit`. Rejected requests are
+    not counted, and with several limits a request must pass all of them and
+    is then counted in all of them.
+
+    With numpy installed, traces checked against a single limit are evaluated
+    one window at a time with array operations instead of one request at a
+    time.
+    """
+
+    def __init__(
+        self,
+        limit: Sequence[int],
+        window_size: Sequence[int],
+        window_type: str = SLIDING,
+    ) -> None:
+        """Initializes the RateLimitSimulator object.
+
+        Args:
+            limit (Sequence[int]): Requests allowed per window, one per window.
+            window_size (Sequence[int]): The window sizes in seconds.
+            window_type (str, optional): "sliding" or "fixed". Defaults to
+                                         "sliding".
+
+        Raises:
+            ValueError: If the limits and window sizes do not pair up or the
+                        window type is unknown.
+        """
+        if not limit or len(limit) != len(window_size):
+            raise ValueError("limit and window_size should have the same length.")
+        if window_type not in (SLIDING, FIXED):
+            raise ValueError(f"window_type should be '{SLIDING}' or '{FIXED}'.")
+        if any(size <= 0 for size in window_size):
+            raise ValueError("window_size values should be positive.")
+        self.limit = list(limit)
+        self.window_size = list(window_size)
+        self.window_type = window_type
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RateLimitSimulator":
+        """
+        Build a simulator from a rate-limiting-advanced plugin config.
+
+        Args:
+            config (Dict[str, Any]): A config with `limit`, `window_size` and
+                                     optionally `window_type`, as returned by
+                                     Kong or passed to `configure_rate_limit`.
+
+        Returns:
+            RateLimitSimulator: The simulator.
+        """
+        return cls(
+            config["limit"], config["window_size"], config.get("window_type") or SLIDING
+        )
+
+    def simulate(
+        self, timestamps: Sequence[float], use_numpy: Optional[bool] = None
+    ) -> SimulationResult:
+        """
+        Replay the requests of one consumer.
+
+        Args:
+            timestamps (Sequence[float]): Request times in seconds. They are
+                                          sorted if needed.
+            use_numpy (Optional[bool], optional): Force the numpy or the pure
+                Python implementation. Defaults to numpy when it is installed
+                and there is a single limit.
+
+        Returns:
+            SimulationResult: The number of requests rejected.
+        """
+        if use_numpy is None:
+            use_numpy = np is not None and len(self.limit) == 1
+        if use_numpy:
+            if np is None:
+                raise ValueError("numpy is not installed.")
+            if len(self.limit) != 1:
+                raise ValueError("The numpy implementation supports one limit.")
+            return self._simulate_numpy(np.sort(np.asarray(timestamps, dtype=float)))
+        return self._simulate_python(sorted(timestamps))
+
+    def simulate_traces(
+        self,
+        traces: Dict[str, Sequence[float]],
+        use_numpy: Optional[bool] = None,
+    ) -> Dict[str, SimulationResult]:
+        """
+        Replay the requests of many consumers, each with its own counters.
+
+        Args:
+            traces (Dict[str, Sequence[float]]): Request times per consumer.
+            use_numpy (Optional[bool], optional): As in `simulate`.
+
+        Returns:
+            Dict[str, SimulationResult]: The result of each consumer. Results
+                                         can be summed for a total.
+        """
+        return {
+            consumer: self.simulate(timestamps, use_numpy)
+            for consumer, timestamps in traces.items()
+        }
+
+    def _simulate_python(self, timestamps: List[float]) -> SimulationResult:
+        # Per limit: the index of the current window and the accepted counts of
+        # the current and previous windows.
+        windows = [[None, 0, 0] for _ in self.limit]
+        rejected = 0
+        first_rejected_at = None
+        for t in timestamps:
+            allowed = True
+            for state, limit, size in zip(windows, self.limit, self.window_size):
+                index = math.floor(t / size)
+                if index != state[0]:
+                    state[2] = state[1] if state[0] == index - 1 else 0
+                    state[0], state[1] = index, 0
+                count = state[1]
+                if self.window_type == SLIDING:
+                    weight = (size - (t - index * size)) / size
+                    count += state[2] * weight
+                if count >= limit:
+                    allowed = False
+            if allowed:
+                for state in windows:
+                    state[1] += 1
+            else:
+                rejected += 1
+                if first_rejected_at is None:
+                    first_rejected_at = t
+        return SimulationResult(len(timestamps), rejected, first_rejected_at)
+
+    def _simulate_numpy(self, timestamps: Any) -> SimulationResult:
+        limit, size = self.limit[0], self.window_size[0]
+        total = len(timestamps)
+        if not total:
+            return SimulationResult(0, 0)
+        indexes = np.floor(timestamps / size).astype(np.int64)
+        starts = np.flatnonzero(np.diff(indexes, prepend=indexes[0] - 1))
+        ends = np.append(starts[1:], total)
+        accepted = np.zeros(total, dtype=bool)
+
+        if self.window_type == FIXED:
+            # Only the first `limit` requests of each window are accepted.
+            ranks = np.arange(total) - np.repeat(starts, ends - starts)
+            accepted = ranks < limit
+        else:
+            previous_index, previous_count = None, 0
+            for start, end in zip(starts, ends):
+                index = indexes[start]
+                if previous_index != index - 1:
+                    previous_count = 0
+                weight = (size - (timestamps[start:end] - index * size)) / size
+                # The highest current count at which each request is still
+                # accepted. It never decreases within a window, so the running
+                # count is a running minimum rather than a sequential loop.
+                thresholds = np.maximum(np.ceil(limit - previous_count * weight), 0)
+                steps = np.arange(end - start)
+                counts = steps + 1 + np.minimum(
+                    np.minimum.accumulate(thresholds - steps - 1), 0
+                )
+                accepted[start:end] = np.diff(counts, prepend=0) > 0
+                previous_index, previous_count = index, counts[-1]
+
+        rejections = np.flatnonzero(~accepted)
+        first_rejected_at = (
+            float(timestamps[rejections[0]]) if len(rejections) else None
+        )
+        return SimulationResult(total, len(rejections), first_rejected_at)
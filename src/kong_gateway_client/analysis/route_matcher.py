@@ -0,0 +1,345 @@
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.state.snapshot import WorkspaceSnapshot
+
+# Host index bucket kinds, in the order Kong prefers them.
+PLAIN_HOST = 0
+WILDCARD_HOST = 1
+ANY_HOST = 2
+
+REGEX_PATH = 0
+PREFIX_PATH = 1
+ANY_PATH = 2
+
+
+def _as_dict(entity: Any) -> Dict[str, Any]:
+    """Accept raw entity data as well as model objects such as KongRoute."""
+    return entity if isinstance(entity, dict) else vars(entity)
+
+
+class RouteMatch:
+    """The route, and its service, that a request would be proxied through."""
+
+    def __init__(
+        self,
+        route: Dict[str, Any],
+        service: Optional[Dict[str, Any]],
+        path: Optional[str],
+        host: Optional[str],
+    ) -> None:
+        """Initializes the RouteMatch object.
+
+        Args:
+            route (Dict[str, Any]): The matching route.
+            service (Optional[Dict[str, Any]]): The route's service, if known.
+            path (Optional[str]): The route path that matched, if any.
+            host (Optional[str]): The route host that matched, if any.
+        """
+        self.route = route
+        self.service = service
+        self.path = path
+        self.host = host
+
+    def __repr__(self) -> str:
+        service = self.service.get("name") if self.service else None
+        return (
+            f"<RouteMatch(route={self.route.get('name') or self.route['id']}, "
+            f"service={service}, path={self.path}, host={self.host})>"
+        )
+
+
+class Candidate:
+    """One way a route can match: a route with one host bucket and one path."""
+
+    __slots__ = ("route", "index", "host", "path", "regex", "priority")
+
+    def __init__(
+        self,
+        route: Dict[str, Any],
+        index: int,
+        host: Tuple[int, Optional[str]],
+        path: Optional[str],
+    ) -> None:
+        """Initializes the Candidate object.
+
+        Args:
+            route (Dict[str, Any]): The route.
+            index (int): The position of the route in the route table.
+            host (Tuple[int, Optional[str]]): The host bucket kind and host.
+            path (Optional[str]): One of the route's paths, or None.
+        """
+        self.route = route
+        self.index = index
+        self.host = host
+        self.path = path
+        self.regex: Optional[Pattern] = None
+        if path is None:
+            path_rank, length = ANY_PATH, 0
+        elif path.startswith("~"):
+            self.regex = re.compile(path[1:])
+            path_rank, length = REGEX_PATH, 0
+        else:
+            path_rank, length = PREFIX_PATH, len(path)
+        categories = sum(
+            1
+            for field in ("hosts", "paths", "methods", "headers", "snis")
+            if route.get(field)
+        )
+        # Lower sorts first: more matching attributes, plain hosts before
+        # wildcards, regex paths by regex_priority, then longer prefixes.
+        self.priority: Tuple[Any, ...] = (
+            -categories,
+            host[0],
+            path_rank,
+            -(route.get("regex_priority") or 0) if self.regex else 0,
+            -length,
+            route.get("created_at") or 0,
+            index,
+        )
+
+    def matches_path(self, path: str) -> bool:
+        if self.regex is not None:
+            return self.regex.match(path) is not None
+        return self.path is None or path.startswith(self.path)
+
+    def __repr__(self) -> str:
+        return f"<Candidate(route={self.route['id']}, path={self.path})>"
+
+
+class _TrieNode:
+    __slots__ = ("children", "candidates")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.candidates: List[Candidate] = []
+
+
+class HostBucket:
+    """The candidates of one host, with prefix paths in a character trie."""
+
+    def __init__(self) -> None:
+        self.trie = _TrieNode()
+        self.regexes: List[Candidate] = []
+        self.pathless: List[Candidate] = []
+
+    def add(self, candidate: Candidate) -> None:
+        if candidate.regex is not None:
+            self.regexes.append(candidate)
+        elif candidate.path is None:
+            self.pathless.append(candidate)
+        else:
+            node = self.trie
+            for char in candidate.path:
+                node = node.children.setdefault(char, _TrieNode())
+            node.candidates.append(candidate)
+
+    def finalize(self) -> None:
+        self.regexes.sort(key=lambda candidate: candidate.priority)
+
+    def prefix_candidates(self, path: str) -> Iterator[Candidate]:
+        """Yield the prefix-path candidates whose path is a prefix of `path`."""
+        node = self.trie
+        yield from node.candidates
+        for char in path:
+            node = node.children.get(char)
+            if node is None:
+                return
+            yield from node.candidates
+
+    def candidates(
+        self, path: str, bound: Optional[Tuple[Any, ...]] = None
+    ) -> Iterator[Candidate]:
+        """Yield the candidates matching a path.
+
+        Regexes are sorted by priority, so they stop being evaluated once none
+        can rank ahead of `bound`.
+        """
+        for candidate in self.regexes:
+            if bound is not None and candidate.priority >= bound:
+                break
+            if candidate.regex.match(path):
+                yield candidate
+        yield from self.prefix_candidates(path)
+        yield from self.pathless
+
+
+class RouteMatcher:
+    """
+    Find the route Kong would select for a request, without a gateway.
+
+    Routes are indexed by host, with exact hosts in a dictionary and wildcard
+    hosts by their fixed part, and within each host by a character trie of
+    prefix paths and a list of regex paths precompiled and ordered by
+    `regex_priority`. A lookup only visits the host buckets of the request's
+    host and the trie nodes along its path.
+
+    When several routes match, the one with the most configured attributes
+    (hosts, paths, methods, headers and snis) wins, then plain hosts over
+    wildcards, regex paths by `regex_priority` over prefix paths, and longer
+    prefixes over shorter ones. This follows Kong's traditional router and
+    does not model every detail of it, such as path normalization.
+    """
+
+    def __init__(
+        self, routes: Iterable[Any], services: Optional[Iterable[Any]] = None
+    ) -> None:
+        """Initializes the RouteMatcher object.
+
+        Args:
+            routes (Iterable[Any]): Raw route data or KongRoute objects.
+            services (Optional[Iterable[Any]], optional): Raw service data or
+                KongService objects, used to resolve each route's service.
+        """
+        self.routes: List[Dict[str, Any]] = [_as_dict(route) for route in routes]
+        self.services: Dict[str, Dict[str, Any]] = {
+            service["id"]: service
+            for service in (_as_dict(service) for service in services or [])
+        }
+        self.candidates: List[Candidate] = []
+        self.exact: Dict[str, HostBucket] = {}
+        self.suffixes: Dict[str, HostBucket] = {}
+        self.prefixes: Dict[str, HostBucket] = {}
+        self.any_host = HostBucket()
+
+        for index, route in enumerate(self.routes):
+            hosts = route.get("hosts") or [None]
+            paths = route.get("paths") or [None]
+            for host in hosts:
+                bucket, kind = self._bucket(host)
+                for path in paths:
+                    candidate = Candidate(route, index, (kind, host), path)
+                    bucket.add(candidate)
+                    self.candidates.append(candidate)
+        for bucket in self.buckets():
+            bucket.finalize()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: WorkspaceSnapshot) -> "RouteMatcher":
+        """Build a matcher from the routes and services of a snapshot."""
+        return cls(snapshot.entities["routes"], snapshot.entities["services"])
+
+    @classmethod
+    def fetch(cls, client: KongClient) -> "RouteMatcher":
+        """Build a matcher from the routes and services of a workspace."""
+        snapshot = WorkspaceSnapshot.fetch(client, ("services", "routes"))
+        return cls.from_snapshot(snapshot)
+
+    def _bucket(self, host: Optional[str]) -> Tuple[HostBucket, int]:
+        if host is None:
+            return self.any_host, ANY_HOST
+        host = host.lower()
+        if host.startswith("*"):
+            return self.suffixes.setdefault(host[1:], HostBucket()), WILDCARD_HOST
+        if host.endswith("*"):
+            return self.prefixes.setdefault(host[:-1], HostBucket()), WILDCARD_HOST
+        return self.exact.setdefault(host, HostBucket()), PLAIN_HOST
+
+    def buckets(self) -> Iterator[HostBucket]:
+        """Yield every host bucket of the index."""
+        yield from self.exact.values()
+        yield from self.suffixes.values()
+        yield from self.prefixes.values()
+        yield self.any_host
+
+    def host_buckets(self, host: Optional[str]) -> Iterator[HostBucket]:
+        """Yield the buckets whose hosts match a request host."""
+        if host:
+            host = host.lower()
+            name = host.rsplit(":", 1)[0] if ":" in host else host
+            for key in {host, name}:
+                if key in self.exact:
+                    yield self.exact[key]
+            for key in {host, name}:
+                for position, char in enumerate(key):
+                    if char == "." and key[position:] in self.suffixes:
+                        yield self.suffixes[key[position:]]
+                    if char == "." and key[: position + 1] in self.prefixes:
+                        yield self.prefixes[key[: position + 1]]
+        yield self.any_host
+
+    def match(
+        self,
+        path: str = "/",
+        host: Optional[str] = None,
+        method: str = "GET",
+        headers: Optional[Dict[str, str]] = None,
+        protocol: str = "http",
+        sni: Optional[str] = None,
+    ) -> Optional[RouteMatch]:
+        """
+        Return the route a request would match.
+
+        Args:
+            path (str, optional): The request path. Defaults to "/".
+            host (Optional[str], optional): The Host header, optionally with a
+                                            port.
+            method (str, optional): The request method. Defaults to "GET".
+            headers (Optional[Dict[str, str]], optional): Other request headers.
+            protocol (str, optional): The request protocol. Defaults to "http".
+            sni (Optional[str], optional): The TLS server name, for https.
+
+        Returns:
+            Optional[RouteMatch]: The match, or None if no route matches.
+        """
+        headers = {k.lower(): v.lower() for k, v in (headers or {}).items()}
+        method = method.upper()
+        best: Optional[Candidate] = None
+        for bucket in self.host_buckets(host):
+            bound = best.priority if best is not None else None
+            for candidate in bucket.candidates(path, bound):
+                if best is not None and candidate.priority >= best.priority:
+                    continue
+                if self._matches_request(
+                    candidate.route, method, headers, protocol, sni
+                ):
+                    best = candidate
+        if best is None:
+            return None
+        service_id = (best.route.get("service") or {}).get("id")
+        return RouteMatch(
+            best.route, self.services.get(service_id), best.path, best.host[1]
+        )
+
+    @staticmethod
+    def _matches_request(
+        route: Dict[str, Any],
+        method: str,
+        headers: Dict[str, str],
+        protocol: str,
+        sni: Optional[str],
+    ) -> bool:
+        protocols = route.get("protocols")
+        if protocols and protocol not in protocols:
+            return False
+        methods = route.get("methods")
+        if methods and method not in methods:
+            return False
+        snis = route.get("snis")
+        if snis and sni not in snis:
+            return False
+        for name, values in (route.get("headers") or {}).items():
+            value = headers.get(name.lower())
+            if value is None or value not in (v.lower() for v in values):
+                return False
+        return True
+
+    def match_many(
+        self, requests: Iterable[Dict[str, Any]]
+    ) -> List[Optional[RouteMatch]]:
+        """
+        Match many requests, e.g. a synthetic test suite.
+
+        Args:
+            requests (Iterable[Dict[str, Any]]): Keyword arguments for `match`.
+
+        Returns:
+            List[Optional[RouteMatch]]: The match of each request, in order.
+        """
+        return [self.match(**request) for request in requests]
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def __repr__(self) -> str:
+        return f"<RouteMatcher(routes={len(self.routes)})>"
@@ -0,0 +1,227 @@
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from kong_gateway_client.analysis.route_matcher import (
+    ANY_HOST,
+    PLAIN_HOST,
+    Candidate,
+    HostBucket,
+    RouteMatcher,
+)
+
+SHADOWED = "shadowed"
+CONFLICT = "conflict"
+
+DEFAULT_PROTOCOLS = ("http", "https")
+
+
+class RouteFinding:
+    """A route that can never match, or that conflicts with other routes."""
+
+    def __init__(
+        self,
+        kind: str,
+        route: Dict[str, Any],
+        others: List[Dict[str, Any]],
+        host: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        """Initializes the RouteFinding object.
+
+        Args:
+            kind (str): "shadowed" or "conflict".
+            route (Dict[str, Any]): The route the finding is about.
+            others (List[Dict[str, Any]]): The routes that shadow it, or that
+                                           it conflicts with.
+            host (Optional[str], optional): The host of a conflict.
+            path (Optional[str], optional): The path of a conflict.
+        """
+        self.kind = kind
+        self.route = route
+        self.others = others
+        self.host = host
+        self.path = path
+
+    def __repr__(self) -> str:
+        others = [route.get("name") or route["id"] for route in self.others]
+        return (
+            f"<RouteFinding(kind={self.kind}, "
+            f"route={self.route.get('name') or self.route['id']}, others={others})>"
+        )
+
+
+class RouteOverlapReport:
+    """The findings of `analyze_routes`."""
+
+    def __init__(self) -> None:
+        """Initializes an empty RouteOverlapReport."""
+        self.shadowed: List[RouteFinding] = []
+        self.conflicts: List[RouteFinding] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.shadowed and not self.conflicts
+
+    def __iter__(self) -> Iterator[RouteFinding]:
+        yield from self.shadowed
+        yield from self.conflicts
+
+    def __len__(self) -> int:
+        return len(self.shadowed) + len(self.conflicts)
+
+    def __repr__(self) -> str:
+        return (
+            f"<RouteOverlapReport(shadowed={len(self.shadowed)}, "
+            f"conflicts={len(self.conflicts)})>"
+        )
+
+
+def _values(route: Dict[str, Any], field: str) -> FrozenSet[str]:
+    return frozenset(value.lower() for value in route.get(field) or [])
+
+
+def _headers(route: Dict[str, Any]) -> Dict[str, FrozenSet[str]]:
+    return {
+        name.lower(): frozenset(value.lower() for value in values)
+        for name, values in (route.get("headers") or {}).items()
+    }
+
+
+def _covers(wider: Dict[str, Any], narrower: Dict[str, Any]) -> bool:
+    """Whether `wider` accepts every request `narrower` accepts.
+
+    Hosts and paths are not compared, as they are matched through the index.
+    """
+    for field in ("methods", "snis"):
+        values = _values(wider, field)
+        narrower_values = _values(narrower, field)
+        if values and not (narrower_values and narrower_values <= values):
+            return False
+    protocols = frozenset(wider.get("protocols") or DEFAULT_PROTOCOLS)
+    if not frozenset(narrower.get("protocols") or DEFAULT_PROTOCOLS) <= protocols:
+        return False
+    headers = _headers(narrower)
+    return all(
+        name in headers and headers[name] <= values
+        for name, values in _headers(wider).items()
+    )
+
+
+def _covering_buckets(
+    matcher: RouteMatcher, candidate: Candidate
+) -> Iterator[HostBucket]:
+    """Yield the buckets whose hosts accept every host `candidate` accepts."""
+    kind, host = candidate.host
+    if kind == PLAIN_HOST:
+        yield from matcher.host_buckets(host)
+        return
+    if kind != ANY_HOST:
+        host = host.lower()
+        if host.startswith("*") and host[1:] in matcher.suffixes:
+            yield matcher.suffixes[host[1:]]
+        elif host.endswith("*") and host[:-1] in matcher.prefixes:
+            yield matcher.prefixes[host[:-1]]
+    yield matcher.any_host
+
+
+def _path_dominators(
+    bucket: HostBucket, candidate: Candidate
+) -> Iterator[Candidate]:
+    """Yield the bucket's candidates accepting every path `candidate` accepts."""
+    if candidate.regex is not None:
+        yield from (c for c in bucket.regexes if c.path == candidate.path)
+    elif candidate.path is not None:
+        yield from bucket.prefix_candidates(candidate.path)
+    yield from bucket.pathless
+
+
+def _conflict_key(candidate: Candidate) -> Tuple[Any, ...]:
+    route = candidate.route
+    host = candidate.host[1].lower() if candidate.host[1] else None
+    return (
+        host,
+        candidate.path,
+        _values(route, "methods"),
+        _values(route, "snis"),
+        frozenset(route.get("protocols") or DEFAULT_PROTOCOLS),
+        frozenset(_headers(route).items()),
+    )
+
+
+def analyze_matcher(matcher: RouteMatcher) -> RouteOverlapReport:
+    """
+    Find shadowed and conflicting routes in a compiled route table.
+
+    A route is shadowed when, for each of its hosts and paths, another route
+    ranks ahead of it and accepts every request it accepts. Two routes
+    conflict when they have exactly the same matching rules but different
+    services, so which one serves traffic only depends on creation order.
+
+    Dominating routes are looked up through the matcher's host index and path
+    tries rather than by comparing every pair of routes, so the analysis runs
+    in roughly linear time. Regex paths only shadow each other when they are
+    identical.
+
+    Args:
+        matcher (RouteMatcher): The compiled route table.
+
+    Returns:
+        RouteOverlapReport: The shadowed and conflicting routes.
+    """
+    report = RouteOverlapReport()
+    by_route: Dict[int, List[Candidate]] = {}
+    groups: Dict[Tuple[Any, ...], List[Candidate]] = {}
+    for candidate in matcher.candidates:
+        by_route.setdefault(candidate.index, []).append(candidate)
+        groups.setdefault(_conflict_key(candidate), []).append(candidate)
+
+    for index, candidates in by_route.items():
+        shadowing: Dict[int, Dict[str, Any]] = {}
+        for candidate in candidates:
+            found = {
+                dominator.index: dominator.route
+                for bucket in _covering_buckets(matcher, candidate)
+                for dominator in _path_dominators(bucket, candidate)
+                if dominator.index != index
+                and dominator.priority < candidate.priority
+                and _covers(dominator.route, candidate.route)
+            }
+            if not found:
+                break
+            shadowing.update(found)
+        else:
+            report.shadowed.append(
+                RouteFinding(
+                    SHADOWED, matcher.routes[index], list(shadowing.values())
+                )
+            )
+
+    for candidates in groups.values():
+        routes = {c.index: c for c in candidates}
+        services = {(c.route.get("service") or {}).get("id") for c in candidates}
+        if len(routes) < 2 or len(services) < 2:
+            continue
+        first, *rest = sorted(routes)
+        candidate = routes[first]
+        report.conflicts.append(
+            RouteFinding(
+                CONFLICT,
+                candidate.route,
+                [routes[index].route for index in rest],
+                candidate.host[1],
+                candidate.path,
+            )
+        )
+    return report
+
+
+def analyze_routes(routes: Iterable[Any]) -> RouteOverlapReport:
+    """
+    Find shadowed and conflicting routes.
+
+    Args:
+        routes (Iterable[Any]): Raw route data or KongRoute objects, e.g. from
+                                `Route.get_all`.
+
+    Returns:
+        RouteOverlapReport: The shadowed and conflicting routes.
+    """
+    return analyze_matcher(RouteMatcher(routes))
@@ -1,6 +1,15 @@
-from typing import Any, Dict, List, Optional
+import copy
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 import urllib3
 import requests
+from kong_gateway_client.instrumentation import (
+    RequestBudget,
+    RequestEvent,
+    RequestHooks,
+)
+from kong_gateway_client.profiling import ClientProfiler
+from kong_gateway_client.request_log import RequestLog
 
 
 class KongClient:
@@ -57,20 +66,111 @@ class KongClient:
             urllib3.disable_warnings()
 
         self.session = requests.Session()
+        # Shared with the clients returned by `for_workspace`.
+        self.hooks = RequestHooks()
+        self.request_log = RequestLog()
         if not admin_token:
             self.configure_auth()
         else:
             self.configure_token()
-        self.service = service(self)
-        self.consumer = consuemr(self)
-        self.consumer_group = consumer_gorup(self)
-        self.plugin_resource = plugin(self)
-        self.key_auth_plugin = key_auth_plugin(self.plugin_resource)
-        self.acl_plugin = acl_plugin(self.plugin_resource)
-        self.rla_plugin = rla_plugin(self.plugin_resource)
-        self.route = route(self)
+        self.resource_classes = {
+            "service": service,
+            "consumer": consuemr,
+            "consumer_group": consumer_gorup,
+            "plugin_resource": plugin,
+            "key_auth_plugin": key_auth_plugin,
+            "acl_plugin": acl_plugin,
+            "rla_plugin": rla_plugin,
+            "route": route,
+            "workspace": workspace,
+        }
+        self.configure_resources()
         self.response_object = response_object
-        self.workspace = workspace(self)
+
+    def configure_resources(self) -> None:
+        """
+        Create the resource handlers bound to this client.
+        """
+        classes = self.resource_classes
+        self.service = classes["service"](self)
+        self.consumer = classes["consumer"](self)
+        self.consumer_group = classes["consumer_group"](self)
+        self.plugin_resource = classes["plugin_resource"](self)
+        self.key_auth_plugin = classes["key_auth_plugin"](self.plugin_resource)
+        self.acl_plugin = classes["acl_plugin"](self.plugin_resource)
+        self.rla_plugin = classes["rla_plugin"](self.plugin_resource)
+        self.route = classes["route"](self)
+        self.workspace = classes["workspace"](self)
+
+    def for_workspace(self, target_workspace: str) -> "KongClient":
+        """
+        Return a client for another workspace that shares this client's session
+        and authentication.
+
+        Args:
+            target_workspace (str): The workspace the new client should target.
+
+        Returns:
+            KongClient: A client targeting the given workspace.
+        """
+        if not target_workspace:
+            raise ValueError("target_workspace should be provided and non-empty.")
+        workspace_client = copy.copy(self)
+        workspace_client.target_workspace = target_workspace
+        workspace_client.admin_ws_url = f"{self.admin_url}/{target_workspace}"
+        workspace_client.configure_resources()
+        return workspace_client
+
+    def request_budget(
+        self,
+        max_calls: Optional[int] = None,
+        by_endpoint: Optional[Dict[str, int]] = None,
+        strict: bool = True,
+    ) -> RequestBudget:
+        """
+        Limit the number of requests made within a `with` block.
+
+        Meant for tests that keep bulk code paths bulk, e.g.
+
+            with client.request_budget(max_calls=5):
+                client.consumer_group.build_membership_index()
+
+        Args:
+            max_calls (Optional[int], optional): The most requests allowed.
+            by_endpoint (Optional[Dict[str, int]], optional): The most requests
+                allowed per endpoint template, e.g. {"GET /consumers/{id}": 0}.
+            strict (bool, optional): Raise when the block exits over budget.
+                                     Otherwise check `exceeded` and `report()`.
+
+        Returns:
+            RequestBudget: The budget, which holds the counts by endpoint.
+
+        Raises:
+            RequestBudgetExceeded: On exit, if strict and over budget.
+        """
+        return RequestBudget(self.hooks, max_calls, by_endpoint, strict)
+
+    def profile(self, trace_memory: bool = False, top: int = 10) -> ClientProfiler:
+        """
+        Profile where the time of client calls within a `with` block goes.
+
+        Nothing is measured outside of the block, e.g.
+
+            with client.profile(trace_memory=True) as profiler:
+                with profiler.operation("get_all consumers"):
+                    client.consumer.get_all()
+            print(profiler.report())
+
+        Args:
+            trace_memory (bool, optional): Also record peak memory and the top
+                                           allocation sites with tracemalloc.
+            top (int, optional): The number of allocation sites to keep per
+                                 operation. Defaults to 10.
+
+        Returns:
+            ClientProfiler: The profiler, which holds the operations.
+        """
+        return ClientProfiler(self.hooks, trace_memory, top)
 
     def headers(self) -> Dict[str, str]:
         """
@@ -124,28 +224,50 @@ class KongClient:
         """
         self.session.headers.update(self.headers())
 
-    def fetch_all(self, endpoint: Optional[str]) -> List[Dict[str, Any]]:
+    def iter_all(
+        self, endpoint: Optional[str], size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
         """
-        Fetches all objects by paginating through the provided endpoint until no
-        more objects are left.
+        Lazily yield all objects by paginating through the provided endpoint.
+
+        Only one page is held in memory at a time.
 
         Args:
             endpoint (str): The API endpoint to start fetching from.
+            size (Optional[int]): The page size to request. Defaults to Kong's
+                                  own default.
 
-        Returns:
-            List[Dict[str, Any]]: A list of all objects retrieved from the
-                                  provided endpoint.
+        Yields:
+            Dict[str, Any]: Each object retrieved from the provided endpoint.
         """
-        all_data: List[Dict[str, Any]] = []
+        if endpoint and size:
+            separator = "&" if "?" in endpoint else "?"
+            endpoint = f"{endpoint}{separator}size={size}"
         while endpoint:  # Continue fetching as long as there's an endpoint
             response = self.request("GET", endpoint)
 
             if hasattr(response, "data"):
-                all_data.extend(response.data)
+                yield from response.data
 
             endpoint = getattr(response, "next", None)
 
-        return all_data
+    def fetch_all(
+        self, endpoint: Optional[str], size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches all objects by paginating through the provided endpoint until no
+        more objects are left.
+
+        Args:
+            endpoint (str): The API endpoint to start fetching from.
+            size (Optional[int]): The page size to request. Defaults to Kong's
+                                  own default.
+
+        Returns:
+            List[Dict[str, Any]]: A list of all objects retrieved from the
+                                  provided endpoint.
+        """
+        return list(self.iter_all(endpoint, size))
 
     def request(
         self,
@@ -175,27 +297,86 @@ class KongClient:
             admin_url = self.admin_ws_url
         else:
             admin_url = self.admin_url
+        url = f"{admin_url}{endpoint}"
+        workspace = self.target_workspace if workspace_endpoint else None
+        # Events are only built when a hook is registered, so uninstrumented
+        # clients pay nothing for instrumentation.
+        event = None
+        if self.hooks:
+            event = RequestEvent(method, endpoint, workspace, url)
+            self._dispatch_hooks(self.hooks.before_request, event)
         try:
-            url = f"{admin_url}{endpoint}"
-            if method == "GET" or method == "DELETE":
-                self.session.headers.update({"Content-Type": ""})
-            else:
-                self.session.headers.update(
-                    {"Content-Type": "application/json;charset=utf-8"}
-                )
-            response = self.session.request(method, url, verify=self.tls, **kwargs)
-            if not response.ok:
-                print(response.text)
-            response.raise_for_status()
-            response_data = response.json() if response.content else {}
-            result = self.response_object(response_data)
-            if hasattr(result, "is_empty") and result.is_empty:
-                return None
-            return result
-        except requests.ConnectionError:
-            raise ValueError(
-                (
-                    f"Failed to connect to {admin_url}{endpoint}."
-                    "Please ensure the URL is correct and reachable."
-                )
+            response_data = self._send(
+                method, url, endpoint, workspace, event, **kwargs
             )
+        except Exception as error:
+            if event is not None:
+                event.error = error
+                self._dispatch_hooks(self.hooks.on_error, event)
+            if isinstance(error, requests.ConnectionError):
+                raise ValueError(
+                    (
+                        f"Failed to connect to {admin_url}{endpoint}."
+                        "Please ensure the URL is correct and reachable."
+                    )
+                )
+            raise
+        started = time.perf_counter()
+        result = self.response_object(response_data)
+        if event is not None:
+            event.model_duration = time.perf_counter() - started
+            self._dispatch_hooks(self.hooks.after_response, event)
+        if hasattr(result, "is_empty") and result.is_empty:
+            return None
+        return result
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        workspace: Optional[str],
+        event: Optional[RequestEvent],
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Send a request, log the response and decode its JSON body.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+            endpoint (str): The endpoint passed to `request`.
+            workspace (Optional[str]): The workspace, if workspace scoped.
+            event (Optional[RequestEvent]): The event to record timings on.
+            **kwargs: Additional arguments passed to the requests session.
+
+        Returns:
+            Any: The decoded response body, or {} when it is empty.
+        """
+        # The content type is set per request rather than on the shared
+        # session so that concurrent requests cannot overwrite each other's
+        # headers. Requests without a body are sent without one.
+        if method != "GET" and method != "DELETE":
+            kwargs["headers"] = {
+                "Content-Type": "application/json;charset=utf-8",
+                **kwargs.get("headers", {}),
+            }
+        started = time.perf_counter()
+        response = self.session.request(method, url, verify=self.tls, **kwargs)
+        duration = time.perf_counter() - started
+        if event is not None:
+            event.record_response(response)
+        self.request_log.response(method, endpoint, workspace, response, duration)
+        response.raise_for_status()
+        started = time.perf_counter()
+        response_data = response.json() if response.content else {}
+        if event is not None:
+            event.decode_duration = time.perf_counter() - started
+        return response_data
+
+    @staticmethod
+    def _dispatch_hooks(
+        hooks: Iterable[Callable[[RequestEvent], None]], event: RequestEvent
+    ) -> None:
+        for hook in hooks:
+            hook(event)
@@ -0,0 +1,478 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Path segments naming a collection. The segment after one is an entity ID or
+# name and is replaced by "{id}" in endpoint templates.
+COLLECTIONS = frozenset(
+    (
+        "services",
+        "routes",
+        "consumers",
+        "consumer_groups",
+        "plugins",
+        "key-auth",
+        "key-auths",
+        "acls",
+        "workspaces",
+    )
+)
+
+# Histogram bucket upper bounds in seconds, as in the Prometheus client.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Hook = Callable[["RequestEvent"], None]
+
+
+@lru_cache(maxsize=4096)
+def endpoint_template(endpoint: str) -> str:
+    """
+    Replace the IDs and names in an endpoint with placeholders.
+
+    For example "/consumers/alice/acls?size=100" becomes "/consumers/{id}/acls",
+    so requests for different entities are counted together.
+
+    Args:
+        endpoint (str): The endpoint passed to `KongClient.request`.
+
+    Returns:
+        str: The endpoint template.
+    """
+    path = endpoint.split("?", 1)[0]
+    segments = path.split("/")
+    for index in range(1, len(segments)):
+        if segments[index - 1] in COLLECTIONS and segments[index]:
+            segments[index] = "{id}"
+    return "/".join(segments)
+
+
+class RequestEvent:
+    """What is known about one Admin API request, passed to hooks."""
+
+    def __init__(
+        self, method: str, endpoint: str, workspace: Optional[str], url: str
+    ) -> None:
+        """Initializes the RequestEvent object.
+
+        Args:
+            method (str): The HTTP method.
+            endpoint (str): The endpoint, relative to the workspace if any.
+            workspace (Optional[str]): The workspace, or None for requests
+                                       outside of workspaces.
+            url (str): The full request URL.
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.template = endpoint_template(endpoint)
+        self.workspace = workspace
+        self.url = url
+        self.status: Optional[int] = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.error: Optional[BaseException] = None
+        self.started = time.perf_counter()
+        # Seconds from sending the request to receiving the whole response.
+        self.duration: Optional[float] = None
+        # Seconds spent decoding the JSON body and building the ResponseObject.
+        self.decode_duration = 0.0
+        self.model_duration = 0.0
+        # Set by hooks to pass data from before_request to later hooks.
+        self.context: Dict[str, Any] = {}
+
+    def record_response(self, response: Any) -> None:
+        """Record the status, sizes and retries of a response."""
+        self.duration = time.perf_counter() - self.started
+        self.status = getattr(response, "status_code", None)
+        self.response_bytes = len(getattr(response, "content", b"") or b"")
+        body = getattr(getattr(response, "request", None), "body", None)
+        self.request_bytes = len(body) if body else 0
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        self.retries = len(getattr(retries, "history", None) or ())
+
+    def __repr__(self) -> str:
+        return (
+            f"<RequestEvent(method={self.method}, template={self.template}, "
+            f"status={self.status}, duration={self.duration})>"
+        )
+
+
+class RequestHooks:
+    """
+    The callbacks a KongClient calls around each request.
+
+    `before_request` callbacks run before the request is sent,
+    `after_response` callbacks after a successful response has been decoded
+    and wrapped in a ResponseObject, and `on_error` callbacks when the request
+    fails, with the status set if a response was received. Each is called
+    with the RequestEvent. Exceptions raised by callbacks propagate to the
+    caller.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty RequestHooks object."""
+        self.before_request: List[Hook] = []
+        self.after_response: List[Hook] = []
+        self.on_error: List[Hook] = []
+
+    def register(self, observer: Any) -> None:
+        """Add the before_request, after_response and on_error methods an
+        object has, e.g. a RequestMetrics."""
+        for name in ("before_request", "after_response", "on_error"):
+            callback = getattr(observer, name, None)
+            if callback is not None:
+                getattr(self, name).append(callback)
+
+    def unregister(self, observer: Any) -> None:
+        """Remove the methods added by `register`."""
+        for name in ("before_request", "after_response", "on_error"):
+            callback = getattr(observer, name, None)
+            callbacks = getattr(self, name)
+            if callback is not None and callback in callbacks:
+                callbacks.remove(callback)
+
+    def __bool__(self) -> bool:
+        return bool(self.before_request or self.after_response or self.on_error)
+
+
+class LatencyHistogram:
+    """Request durations counted into fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initializes the LatencyHistogram object.
+
+        Args:
+            buckets (Sequence[float], optional): Sorted bucket upper bounds in
+                                                 seconds.
+        """
+        self.buckets = tuple(buckets)
+        # One count per bucket, plus one for durations above the last bound.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in.
+
+        Durations above the last bucket are reported as the last bound.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def __repr__(self) -> str:
+        return f"<LatencyHistogram(count={self.count}, mean={self.mean:.4f})>"
+
+
+class EndpointStats:
+    """The counters of one method, endpoint template and workspace."""
+
+    def __init__(
+        self,
+        method: str,
+        template: str,
+        workspace: Optional[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initializes the EndpointStats object.
+
+        Args:
+            method (str): The HTTP method.
+            template (str): The endpoint template.
+            workspace (Optional[str]): The workspace.
+            buckets (Sequence[float], optional): The histogram buckets.
+        """
+        self.method = method
+        self.template = template
+        self.workspace = workspace
+        self.latency = LatencyHistogram(buckets)
+        self.statuses: Dict[str, int] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(
+            count
+            for status, count in self.statuses.items()
+            if not status.startswith(("1", "2", "3"))
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<EndpointStats(method={self.method}, template={self.template}, "
+            f"count={self.count}, errors={self.errors})>"
+        )
+
+
+def _label(value: Any) -> str:
+    text = str(value if value is not None else "")
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request counters and latency histograms.
+
+    Register it with `client.hooks.register(metrics)`. Requests are grouped by
+    method, endpoint template and workspace, so a loop issuing one request per
+    entity shows up as a single endpoint with a high count. Requests that fail
+    without a response are counted with the status "error".
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initializes the RequestMetrics object.
+
+        Args:
+            buckets (Sequence[float], optional): Histogram bucket upper bounds
+                                                 in seconds.
+        """
+        self.buckets = tuple(buckets)
+        self.stats: Dict[Tuple[str, str, Optional[str]], EndpointStats] = {}
+        self.lock = threading.Lock()
+
+    def after_response(self, event: RequestEvent) -> None:
+        self.observe(event)
+
+    def on_error(self, event: RequestEvent) -> None:
+        self.observe(event)
+
+    def observe(self, event: RequestEvent) -> None:
+        """Count a finished request."""
+        key = (event.method, event.template, event.workspace)
+        duration = event.duration
+        if duration is None:
+            duration = time.perf_counter() - event.started
+        status = str(event.status) if event.status is not None else "error"
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = EndpointStats(*key, self.buckets)
+            stats.latency.observe(duration)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            stats.retries += event.retries
+
+    def endpoints(self) -> List[EndpointStats]:
+        """Return the stats of every endpoint, most requested first."""
+        with self.lock:
+            stats = list(self.stats.values())
+        return sorted(stats, key=lambda s: s.count, reverse=True)
+
+    def get(
+        self, method: str, endpoint: str, workspace: Optional[str] = "default"
+    ) -> Optional[EndpointStats]:
+        """Return the stats of an endpoint or endpoint template, if any."""
+        return self.stats.get((method, endpoint_template(endpoint), workspace))
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats = {}
+
+    def to_prometheus(self, prefix: str = "kong_client") -> str:
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str, optional): The metric name prefix. Defaults to
+                                    "kong_client".
+
+        Returns:
+            str: The exposition text, ending with a newline.
+        """
+        requests_lines = [
+            f"# HELP {prefix}_requests_total Admin API requests by status.",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        duration_lines = [
+            f"# HELP {prefix}_request_duration_seconds Admin API request latency.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        bytes_lines = [
+            f"# HELP {prefix}_response_bytes_total Admin API response body bytes.",
+            f"# TYPE {prefix}_response_bytes_total counter",
+        ]
+        retries_lines = [
+            f"# HELP {prefix}_retries_total Admin API request retries.",
+            f"# TYPE {prefix}_retries_total counter",
+        ]
+        with self.lock:
+            for stats in self.stats.values():
+                labels = (
+                    f'method="{_label(stats.method)}",'
+                    f'endpoint="{_label(stats.template)}",'
+                    f'workspace="{_label(stats.workspace)}"'
+                )
+                for status, count in sorted(stats.statuses.items()):
+                    requests_lines.append(
+                        f'{prefix}_requests_total{{{labels},status="{status}"}} '
+                        f"{count}"
+                    )
+                histogram = stats.latency
+                cumulative = 0
+                bounds = [repr(b) for b in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    duration_lines.append(
+                        f"{prefix}_request_duration_seconds_bucket"
+                        f'{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                duration_lines.append(
+                    f"{prefix}_request_duration_seconds_sum{{{labels}}} "
+                    f"{histogram.sum!r}"
+                )
+                duration_lines.append(
+                    f"{prefix}_request_duration_seconds_count{{{labels}}} "
+                    f"{histogram.count}"
+                )
+                bytes_lines.append(
+                    f"{prefix}_response_bytes_total{{{labels}}} "
+                    f"{stats.response_bytes}"
+                )
+                retries_lines.append(
+                    f"{prefix}_retries_total{{{labels}}} {stats.retries}"
+                )
+        lines = requests_lines + duration_lines + bytes_lines + retries_lines
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        return f"<RequestMetrics(endpoints={len(self.stats)})>"
+
+
+class RequestBudgetExceeded(AssertionError):
+    """Raised when a block makes more requests than its budget allows."""
+
+
+class RequestBudget:
+    """
+    Count the requests made while it is active and compare them to a budget.
+
+    Use it through `KongClient.request_budget`. Requests are counted when they
+    are sent, from every thread using the client, and grouped by method and
+    endpoint template.
+    """
+
+    def __init__(
+        self,
+        hooks: RequestHooks,
+        max_calls: Optional[int] = None,
+        by_endpoint: Optional[Dict[str, int]] = None,
+        strict: bool = True,
+    ) -> None:
+        """Initializes the RequestBudget object.
+
+        Args:
+            hooks (RequestHooks): The hooks of the client to count.
+            max_calls (Optional[int], optional): The most requests allowed in
+                                                 total.
+            by_endpoint (Optional[Dict[str, int]], optional): The most requests
+                allowed per endpoint, keyed by template or by method and
+                template, e.g. "/consumers/{id}" or "GET /consumers/{id}".
+            strict (bool, optional): Raise RequestBudgetExceeded when the block
+                exits over budget, rather than only recording the violations.
+                Defaults to True.
+        """
+        self.hooks = hooks
+        self.max_calls = max_calls
+        self.by_endpoint: Dict[str, int] = {}
+        for key, limit in (by_endpoint or {}).items():
+            method, _, endpoint = key.rpartition(" ")
+            key = f"{method} {endpoint_template(endpoint)}".lstrip()
+            self.by_endpoint[key] = limit
+        self.strict = strict
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.violations: List[str] = []
+        self.lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def exceeded(self) -> bool:
+        return bool(self.violations)
+
+    def before_request(self, event: RequestEvent) -> None:
+        key = (event.method, event.template)
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def check(self) -> List[str]:
+        """Return a message for each limit the counted requests exceed."""
+        violations = []
+        if self.max_calls is not None and self.calls > self.max_calls:
+            violations.append(
+                f"{self.calls} requests, over the budget of {self.max_calls}"
+            )
+        for key, limit in self.by_endpoint.items():
+            count = sum(
+                n
+                for (method, template), n in self.counts.items()
+                if key in (template, f"{method} {template}")
+            )
+            if count > limit:
+                violations.append(
+                    f"{count} {key} requests, over the budget of {limit}"
+                )
+        return violations
+
+    def report(self) -> str:
+        """Describe the violations and the requests made per endpoint."""
+        lines = list(self.violations) or [f"{self.calls} requests, within budget"]
+        lines.append("Requests by endpoint:")
+        for (method, template), count in sorted(
+            self.counts.items(), key=lambda item: item[1], reverse=True
+        ):
+            lines.append(f"  {count:>6} {method} {template}")
+        return "\n".join(lines)
+
+    def __enter__(self) -> "RequestBudget":
+        self.hooks.register(self)
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        self.hooks.unregister(self)
+        self.violations = self.check()
+        if self.violations and self.strict and exc_type is None:
+            raise RequestBudgetExceeded(self.report())
+
+    def __repr__(self) -> str:
+        return (
+            f"<RequestBudget(calls={self.calls}, max_calls={self.max_calls}, "
+            f"exceeded={self.exceeded})>"
+        )
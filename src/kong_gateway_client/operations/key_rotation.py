@@ -0,0 +1,332 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+import requests
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.resources.consumers import Consumer
+from kong_gateway_client.utils.concurrency import run_concurrently
+from kong_gateway_client.utils.helpers import is_not_found
+
+PROVISIONED = "provisioned"
+VERIFIED = "verified"
+RETIRED = "retired"
+
+
+class RotationMetrics:
+    """Progress, throughput and error counters of a KeyRotation."""
+
+    def __init__(self) -> None:
+        """Initializes an empty RotationMetrics."""
+        self.started_at: float = time.time()
+        self.stage: Optional[str] = None
+        self.total: int = 0
+        self.provisioned: int = 0
+        self.verified: int = 0
+        self.retired: int = 0
+        self.failed: Dict[str, BaseException] = {}
+
+    @property
+    def errors(self) -> int:
+        return len(self.failed)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.time() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Consumers provisioned per second."""
+        elapsed = self.elapsed_seconds
+        return self.provisioned / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a dictionary, e.g. for logging."""
+        return {
+            "stage": self.stage,
+            "total": self.total,
+            "provisioned": self.provisioned,
+            "verified": self.verified,
+            "retired": self.retired,
+            "errors": self.errors,
+            "elapsed_seconds": self.elapsed_seconds,
+            "throughput": self.throughput,
+        }
+
+    def __repr__(self) -> str:
+        return f"<RotationMetrics({self.as_dict()})>"
+
+
+class RotationCheckpoint:
+    """
+    The persisted progress of a KeyRotation.
+
+    For each consumer the IDs of the keys to retire, the ID of the new key, the
+    last completed stage and when the new key was verified are recorded. Key
+    values are never written.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initializes the RotationCheckpoint object.
+
+        Args:
+            path (Optional[str], optional): The JSON file to persist to. When
+                                            omitted, progress is kept in memory.
+        """
+        self.path = path
+        self.consumers: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "RotationCheckpoint":
+        """Load a checkpoint, or start an empty one if the file does not exist."""
+        checkpoint = cls(path)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            checkpoint.consumers = data.get("consumers", {})
+        return checkpoint
+
+    def save(self) -> None:
+        """Write the checkpoint atomically, so a crash never leaves it truncated."""
+        if not self.path:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"consumers": self.consumers}, file)
+        os.replace(temporary, self.path)
+
+    def in_stage(self, stage: str) -> List[str]:
+        """Return the consumers whose last completed stage is `stage`."""
+        return [c for c, state in self.consumers.items() if state["stage"] == stage]
+
+
+class KeyRotation:
+    """
+    Rotate the key-auth credentials of many consumers.
+
+    The rotation runs in three stages, each in parallel:
+
+    1. Provision: a new key is added to every consumer and its existing keys are
+       recorded for retirement. When the rotation has tags, tagged keys added
+       by a run that stopped before checkpointing them are adopted rather than
+       added again.
+    2. Verify: a single paged read of `/key-auths` confirms that the new keys
+       exist.
+    3. Retire: the old keys are given a `ttl` equal to the overlap window, so
+       Kong expires them on its own, or are deleted once the overlap window has
+       passed since the consumer's new key was verified.
+
+    Progress is saved to the checkpoint after every batch, and running the same
+    rotation again with the same checkpoint resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        client: KongClient,
+        consumers: Optional[Iterable[str]] = None,
+        overlap: float = 0,
+        use_ttl: bool = True,
+        checkpoint: Optional[RotationCheckpoint] = None,
+        key_factory: Optional[Callable[[str], Optional[str]]] = None,
+        tags: Optional[List[str]] = None,
+        max_workers: int = 8,
+        batch_size: int = 500,
+        page_size: int = 1000,
+        on_progress: Optional[Callable[[RotationMetrics], None]] = None,
+    ) -> None:
+        """Initializes the KeyRotation object.
+
+        Args:
+            client (KongClient): The client to rotate keys with.
+            consumers (Optional[Iterable[str]], optional): The IDs or usernames
+                of the consumers to rotate. Defaults to every consumer.
+            overlap (float, optional): Seconds during which old and new keys are
+                both valid. Defaults to 0.
+            use_ttl (bool, optional): Retire old keys by setting their `ttl`
+                rather than waiting and deleting them. Only applies when the
+                overlap is at least one second. Defaults to True.
+            checkpoint (Optional[RotationCheckpoint], optional): Where progress
+                is recorded. Defaults to an in-memory checkpoint.
+            key_factory (Optional[Callable[[str], Optional[str]]], optional):
+                Returns the new key for a consumer ID. Defaults to letting Kong
+                generate the keys.
+            tags (Optional[List[str]], optional): Tags for the new keys. Use
+                tags unique to the rotation so an interrupted run can be
+                resumed without adding a second key.
+            max_workers (int, optional): The number of concurrent requests.
+            batch_size (int, optional): Consumers per checkpointed batch.
+            page_size (int, optional): The page size used for bulk reads.
+            on_progress (Optional[Callable[[RotationMetrics], None]], optional):
+                Called with the metrics after every batch.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size should be at least 1.")
+        self.client = client
+        self.consumers = list(consumers) if consumers is not None else None
+        self.overlap = overlap
+        self.use_ttl = use_ttl
+        self.checkpoint = checkpoint or RotationCheckpoint()
+        self.key_factory = key_factory
+        self.tags = tags
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.on_progress = on_progress
+        self.metrics = RotationMetrics()
+
+    def _key_auths(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return every key-auth credential, indexed by consumer ID."""
+        keys: Dict[str, List[Dict[str, Any]]] = {}
+        for item in self.client.iter_all("/key-auths", self.page_size):
+            keys.setdefault(item["consumer"]["id"], []).append(item)
+        return keys
+
+    def _run_batches(
+        self, stage: str, func: Callable[[str], Any], consumers: Sequence[str]
+    ) -> None:
+        self.metrics.stage = stage
+        for start in range(0, len(consumers), self.batch_size):
+            batch = consumers[start:start + self.batch_size]
+            for task in run_concurrently(func, batch, self.max_workers):
+                if task.ok:
+                    self.checkpoint.consumers[task.item]["stage"] = stage
+                    setattr(self.metrics, stage, getattr(self.metrics, stage) + 1)
+                else:
+                    self.metrics.failed[task.item] = task.error
+            self.checkpoint.save()
+            if self.on_progress:
+                self.on_progress(self.metrics)
+
+    def _consumer_ids(self) -> List[str]:
+        """
+        Return the IDs of the consumers to rotate.
+
+        Keys are indexed by consumer ID, so usernames are resolved to IDs with
+        a single paged read of `/consumers`. Consumers that do not exist are
+        recorded as failed.
+        """
+        ids: List[str] = []
+        by_username: Dict[str, str] = {}
+        for item in self.client.iter_all(Consumer.ENTITY_PATH, self.page_size):
+            ids.append(item["id"])
+            if item.get("username"):
+                by_username[item["username"]] = item["id"]
+        if self.consumers is None:
+            return ids
+        known = set(ids)
+        resolved: List[str] = []
+        for consumer in self.consumers:
+            consumer_id = consumer if consumer in known else by_username.get(consumer)
+            if consumer_id is None:
+                self.metrics.failed[consumer] = ValueError(
+                    f"Consumer {consumer} does not exist."
+                )
+            elif consumer_id not in resolved:
+                resolved.append(consumer_id)
+        return resolved
+
+    def provision(self) -> None:
+        """Add a new key to every consumer that does not have one yet."""
+        existing = self._key_auths()
+        consumers = self._consumer_ids()
+        self.metrics.total = len(consumers) + len(self.metrics.failed)
+        for consumer_id in consumers:
+            keys = existing.get(consumer_id, [])
+            state = self.checkpoint.consumers.setdefault(
+                consumer_id,
+                {"old": [key["id"] for key in keys], "new": None, "stage": None},
+            )
+            if state["stage"] is None:
+                self._adopt(state, keys)
+        self.checkpoint.save()
+
+        def add(consumer_id: str) -> None:
+            state = self.checkpoint.consumers[consumer_id]
+            key = self.key_factory(consumer_id) if self.key_factory else None
+            response = self.client.consumer.add_key_auth(
+                consumer_id, key=key, tags=self.tags
+            )
+            state["new"] = response.id
+
+        pending = [
+            c for c in consumers if self.checkpoint.consumers[c]["stage"] is None
+        ]
+        self._run_batches(PROVISIONED, add, pending)
+
+    def _adopt(self, state: Dict[str, Any], keys: List[Dict[str, Any]]) -> None:
+        """
+        Adopt a new key added by a run that stopped before checkpointing it.
+
+        Keys that are not recorded as old, and have the rotation's tags, can
+        only have been added by this rotation. The first becomes the new key
+        and any others are retired with the old keys, so none stay valid.
+        Without tags, such keys cannot be told apart from keys added by
+        others, so nothing is adopted.
+        """
+        if not self.tags:
+            return
+        added = [
+            key["id"]
+            for key in keys
+            if key["id"] not in state["old"]
+            and set(self.tags) <= set(key.get("tags") or [])
+        ]
+        if added:
+            state["new"] = added[0]
+            state["old"].extend(added[1:])
+            state["stage"] = PROVISIONED
+            self.metrics.provisioned += 1
+
+    def verify(self) -> None:
+        """Check that every provisioned key exists in Kong for its consumer."""
+        existing = self._key_auths()
+
+        def check(consumer_id: str) -> None:
+            state = self.checkpoint.consumers[consumer_id]
+            keys = existing.get(consumer_id, [])
+            if state["new"] not in {key["id"] for key in keys}:
+                raise ValueError(f"The new key of consumer {consumer_id} is missing.")
+            state["verified_at"] = time.time()
+
+        self._run_batches(VERIFIED, check, self.checkpoint.in_stage(PROVISIONED))
+
+    def retire(self) -> None:
+        """Expire or delete the old keys of every verified consumer."""
+        use_ttl = self.use_ttl and self.overlap >= 1
+
+        def retire_keys(consumer_id: str) -> None:
+            state = self.checkpoint.consumers[consumer_id]
+            if not use_ttl:
+                # Checkpoints without a verification time wait the full overlap.
+                verified_at = state.get("verified_at")
+                if verified_at is None:
+                    verified_at = time.time()
+                remaining = verified_at + self.overlap - time.time()
+                if remaining > 0:
+                    time.sleep(remaining)
+            for key_id in state["old"]:
+                endpoint = f"{Consumer.ENTITY_PATH}/{consumer_id}/key-auth/{key_id}"
+                try:
+                    if use_ttl:
+                        ttl = int(self.overlap)
+                        self.client.request("PATCH", endpoint, json={"ttl": ttl})
+                    else:
+                        self.client.request("DELETE", endpoint)
+                except requests.HTTPError as error:
+                    if not is_not_found(error):
+                        raise
+
+        self._run_batches(RETIRED, retire_keys, self.checkpoint.in_stage(VERIFIED))
+
+    def run(self) -> RotationMetrics:
+        """
+        Run, or resume, every stage of the rotation.
+
+        Returns:
+            RotationMetrics: The final metrics, including per-consumer failures.
+        """
+        self.provision()
+        self.verify()
+        self.retire()
+        self.metrics.stage = None
+        return self.metrics
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional, Tuple
+import requests
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.state.snapshot import (
+    DEPENDENCY_TIERS,
+    ENTITY_PATHS,
+    WorkspaceSnapshot,
+)
+from kong_gateway_client.utils.concurrency import run_concurrently
+from kong_gateway_client.utils.helpers import is_not_found
+
+
+class PurgeResult:
+    """The outcome of a purge."""
+
+    def __init__(self) -> None:
+        """Initializes an empty PurgeResult."""
+        self.deleted: Dict[str, int] = {}
+        self.already_gone: Dict[str, int] = {}
+        self.failed: List[Tuple[str, str, BaseException]] = []
+        self.workspace_deleted: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return (
+            f"<PurgeResult(deleted={self.deleted}, already_gone={self.already_gone}, "
+            f"failed={len(self.failed)}, workspace_deleted={self.workspace_deleted})>"
+        )
+
+
+def _delete(client: KongClient, item: Tuple[str, str]) -> bool:
+    """Delete an entity, returning False if it was already gone."""
+    entity_type, entity_id = item
+    try:
+        client.request("DELETE", f"{ENTITY_PATHS[entity_type]}/{entity_id}")
+    except requests.HTTPError as error:
+        if is_not_found(error):
+            return False
+        raise
+    return True
+
+
+def _delete_tier(
+    client: KongClient,
+    entities: List[Tuple[str, str]],
+    result: PurgeResult,
+    max_workers: int,
+) -> None:
+    """Delete one dependency tier concurrently and record the outcome."""
+    tasks = run_concurrently(lambda item: _delete(client, item), entities, max_workers)
+    for task in tasks:
+        entity_type, entity_id = task.item
+        if not task.ok:
+            result.failed.append((entity_type, entity_id, task.error))
+            continue
+        counts = result.deleted if task.result else result.already_gone
+        counts[entity_type] = counts.get(entity_type, 0) + 1
+
+
+def purge(
+    client: KongClient,
+    tags: Optional[List[str]] = None,
+    workspace: Optional[str] = None,
+    delete_workspace: bool = True,
+    max_workers: int = 8,
+) -> PurgeResult:
+    """
+    Delete every matching entity, concurrently and in reverse dependency order.
+
+    Plugins are deleted first, then routes, then services, consumers and
+    consumer groups. Entities within a tier are deleted in parallel and
+    entities that are already gone are counted rather than treated as errors.
+
+    Args:
+        client (KongClient): The client to delete with.
+        tags (Optional[List[str]], optional): Only delete entities that have all
+                                              of these tags.
+        workspace (Optional[str], optional): The workspace to purge. Defaults to
+                                             the client's target workspace.
+        delete_workspace (bool, optional): When a workspace is given without
+                                           tags, delete the workspace itself
+                                           once it is empty. Defaults to True.
+        max_workers (int, optional): The number of concurrent deletes.
+
+    Returns:
+        PurgeResult: Counts of deleted entities and any failures.
+
+    Raises:
+        ValueError: If neither tags nor a workspace are given.
+    """
+    if not tags and not workspace:
+        raise ValueError("Either tags or a workspace must be provided to purge.")
+
+    target = client.for_workspace(workspace) if workspace else client
+    snapshot = WorkspaceSnapshot.fetch(target, tags=tags)
+    result = PurgeResult()
+    for tier in reversed(DEPENDENCY_TIERS):
+        entities = [
+            (entity_type, entity["id"])
+            for entity_type in tier
+            for entity in snapshot.entities[entity_type]
+        ]
+        _delete_tier(target, entities, result, max_workers)
+
+    if workspace and not tags and delete_workspace and result.ok:
+        try:
+            client.workspace.delete(workspace)
+            result.workspace_deleted = True
+        except requests.HTTPError as error:
+            if not is_not_found(error):
+                result.failed.append(("workspaces", workspace, error))
+    return result
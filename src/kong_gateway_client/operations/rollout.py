@@ -0,0 +1,314 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import requests
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.state.snapshot import (
+    ENTITY_PATHS,
+    REFERENCES,
+    WorkspaceSnapshot,
+)
+from kong_gateway_client.utils.concurrency import run_concurrently
+from kong_gateway_client.utils.helpers import is_not_found
+
+# The plugin field that scopes a plugin to each kind of rollout target.
+TARGET_FIELDS: Dict[str, str] = {"services": "service", "routes": "route"}
+
+
+class TargetSelector:
+    """
+    Select the services or routes a plugin is rolled out to.
+
+    Every given criterion must match: an entity is selected when it has all of
+    `tags`, its name is in `names` and `predicate` returns True for it.
+    """
+
+    def __init__(
+        self,
+        entity_type: str = "services",
+        tags: Optional[List[str]] = None,
+        names: Optional[List[str]] = None,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> None:
+        """Initializes the TargetSelector object.
+
+        Args:
+            entity_type (str, optional): "services" or "routes". Defaults to
+                                         "services".
+            tags (Optional[List[str]], optional): Tags every target must have.
+            names (Optional[List[str]], optional): The names of the targets.
+            predicate (Optional[Callable[[Dict[str, Any]], bool]], optional):
+                Called with the raw entity data of each candidate.
+
+        Raises:
+            ValueError: If the entity type cannot be a plugin target.
+        """
+        if entity_type not in TARGET_FIELDS:
+            raise ValueError(
+                f"Plugins can only be rolled out to {', '.join(TARGET_FIELDS)}."
+            )
+        self.entity_type = entity_type
+        self.tags = tags
+        self.names = set(names) if names is not None else None
+        self.predicate = predicate
+
+    def select(self, snapshot: WorkspaceSnapshot) -> List[Dict[str, Any]]:
+        """Return the matching entities of a snapshot."""
+        return [
+            entity
+            for entity in snapshot.entities[self.entity_type]
+            if (not self.tags or set(self.tags) <= set(entity.get("tags") or []))
+            and (self.names is None or entity.get("name") in self.names)
+            and (self.predicate is None or self.predicate(entity))
+        ]
+
+
+class RolloutRecord:
+    """The plugins created by a rollout, which is all a rollback needs."""
+
+    def __init__(self, plugin_name: str) -> None:
+        """Initializes the RolloutRecord object.
+
+        Args:
+            plugin_name (str): The name of the plugin rolled out.
+        """
+        self.plugin_name = plugin_name
+        # Each entry holds the plugin ID, the target entity type and target ID.
+        self.created: List[Dict[str, str]] = []
+        self.existing: List[str] = []
+        self.failed: List[Tuple[str, BaseException]] = []
+        self.pending: List[str] = []
+        self.waves: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.pending
+
+    @property
+    def plugin_ids(self) -> List[str]:
+        return [entry["id"] for entry in self.created]
+
+    def save(self, path: str) -> None:
+        """Write the record as JSON. Errors are stored as their messages."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "plugin_name": self.plugin_name,
+                    "created": self.created,
+                    "existing": self.existing,
+                    "failed": [[t, str(error)] for t, error in self.failed],
+                    "pending": self.pending,
+                    "waves": self.waves,
+                },
+                file,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "RolloutRecord":
+        """Read a record written by `save`."""
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        record = cls(data["plugin_name"])
+        record.created = data.get("created", [])
+        record.existing = data.get("existing", [])
+        record.failed = [(t, Exception(m)) for t, m in data.get("failed", [])]
+        record.pending = data.get("pending", [])
+        record.waves = data.get("waves", 0)
+        return record
+
+    def __repr__(self) -> str:
+        return (
+            f"<RolloutRecord(plugin_name={self.plugin_name}, "
+            f"created={len(self.created)}, existing={len(self.existing)}, "
+            f"failed={len(self.failed)}, pending={len(self.pending)})>"
+        )
+
+
+class RollbackResult:
+    """The outcome of a rollback."""
+
+    def __init__(self) -> None:
+        """Initializes an empty RollbackResult."""
+        self.deleted: List[str] = []
+        self.already_gone: List[str] = []
+        self.failed: List[Tuple[str, BaseException]] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return (
+            f"<RollbackResult(deleted={len(self.deleted)}, "
+            f"already_gone={len(self.already_gone)}, failed={len(self.failed)})>"
+        )
+
+
+def _plan(
+    client: KongClient,
+    name: str,
+    selector: TargetSelector,
+    snapshot: WorkspaceSnapshot,
+    record: RolloutRecord,
+) -> List[str]:
+    """Record the targets a rollout already covers and return the others."""
+    field = TARGET_FIELDS[selector.entity_type]
+    # Plugins of this name scoped to a target alone, as a rollout creates them.
+    scoped = {
+        (plugin.get(field) or {}).get("id"): plugin["id"]
+        for plugin in snapshot.entities["plugins"]
+        if plugin.get("name") == name
+        and not any(plugin.get(f) for f in REFERENCES["plugins"] if f != field)
+    }
+    targets = []
+    for entity in selector.select(snapshot):
+        plugin_id = scoped.get(entity["id"])
+        if plugin_id is None:
+            targets.append(entity["id"])
+        elif plugin_id == client.plugin_resource.id_for(
+            name, **{f"{field}_id": entity["id"]}
+        ):
+            # Created by an earlier run of the same rollout.
+            record.created.append(
+                {
+                    "id": plugin_id,
+                    "entity_type": selector.entity_type,
+                    "target_id": entity["id"],
+                }
+            )
+        else:
+            record.existing.append(entity["id"])
+    return targets
+
+
+def _apply_wave(
+    apply: Callable[[str], Any],
+    wave: List[str],
+    entity_type: str,
+    record: RolloutRecord,
+    max_workers: int,
+) -> None:
+    """Apply one wave concurrently and record the outcome."""
+    for task in run_concurrently(apply, wave, max_workers):
+        if task.ok:
+            record.created.append(
+                {
+                    "id": task.result.id,
+                    "entity_type": entity_type,
+                    "target_id": task.item,
+                }
+            )
+        else:
+            record.failed.append((task.item, task.error))
+    record.waves += 1
+
+
+def rollout_plugin(
+    client: KongClient,
+    name: str,
+    selector: TargetSelector,
+    config: Optional[Dict[str, Any]] = None,
+    wave_size: int = 100,
+    max_workers: int = 8,
+    max_failures: int = 0,
+    pause: float = 0,
+    snapshot: Optional[WorkspaceSnapshot] = None,
+    on_wave: Optional[Callable[[RolloutRecord], None]] = None,
+    **kwargs,
+) -> RolloutRecord:
+    """
+    Enable a plugin on every selected service or route, in waves.
+
+    Each wave is applied concurrently with deterministic plugin IDs, so running
+    the same rollout again is safe: plugins created by an earlier run are
+    recorded again, while targets that already had a plugin of the same name
+    are left alone and are not part of the rollback. Once more than
+    `max_failures` targets have failed, the remaining waves are not started and
+    their targets are recorded as pending.
+
+    Args:
+        client (KongClient): The client to write with.
+        name (str): The plugin name, e.g. "key-auth".
+        selector (TargetSelector): Selects the services or routes.
+        config (Optional[Dict[str, Any]], optional): The plugin configuration.
+        wave_size (int, optional): The number of targets per wave.
+        max_workers (int, optional): The number of concurrent writes.
+        max_failures (int, optional): Failures tolerated before halting.
+        pause (float, optional): Seconds to wait between waves.
+        snapshot (Optional[WorkspaceSnapshot], optional): A snapshot to select
+            from. Defaults to fetching the targets and existing plugins.
+        on_wave (Optional[Callable[[RolloutRecord], None]], optional): Called
+            with the record after each wave, e.g. to save it or check health.
+        **kwargs: Other plugin fields, such as enabled, protocols or tags.
+
+    Returns:
+        RolloutRecord: The created plugins, failures and pending targets.
+    """
+    if wave_size < 1:
+        raise ValueError("wave_size should be at least 1.")
+    if snapshot is None:
+        snapshot = WorkspaceSnapshot.fetch(
+            client, entity_types=(selector.entity_type, "plugins")
+        )
+    record = RolloutRecord(name)
+    targets = _plan(client, name, selector, snapshot, record)
+
+    field = TARGET_FIELDS[selector.entity_type]
+    if config is not None:
+        kwargs["config"] = config
+
+    def apply(target_id: str) -> Any:
+        return client.plugin_resource.upsert(
+            name, **{f"{field}_id": target_id}, **kwargs
+        )
+
+    waves = [targets[i:i + wave_size] for i in range(0, len(targets), wave_size)]
+    for index, wave in enumerate(waves):
+        if len(record.failed) > max_failures:
+            record.pending.extend(t for w in waves[index:] for t in w)
+            break
+        if index and pause:
+            time.sleep(pause)
+        _apply_wave(apply, wave, selector.entity_type, record, max_workers)
+        if on_wave:
+            on_wave(record)
+    return record
+
+
+def rollback_plugin(
+    client: KongClient, record: RolloutRecord, max_workers: int = 8
+) -> RollbackResult:
+    """
+    Delete every plugin created by a rollout, in parallel.
+
+    Plugins that were already removed are listed separately rather than
+    treated as errors.
+
+    Args:
+        client (KongClient): The client to delete with.
+        record (RolloutRecord): The record returned by `rollout_plugin`.
+        max_workers (int, optional): The number of concurrent deletes.
+
+    Returns:
+        RollbackResult: The IDs of the deleted plugins and any failures.
+    """
+    result = RollbackResult()
+
+    def delete(plugin_id: str) -> bool:
+        try:
+            client.request("DELETE", f"{ENTITY_PATHS['plugins']}/{plugin_id}")
+        except requests.HTTPError as error:
+            if is_not_found(error):
+                return False
+            raise
+        return True
+
+    for task in run_concurrently(delete, record.plugin_ids, max_workers):
+        if not task.ok:
+            result.failed.append((task.item, task.error))
+        elif task.result:
+            result.deleted.append(task.item)
+        else:
+            result.already_gone.append(task.item)
+    return result
@@ -0,0 +1,307 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+
+class Ref:
+    """
+    A placeholder for the result of a scheduled operation.
+
+    Attribute access on a Ref returns a new Ref to that attribute, so
+    `service.id` refers to the `id` of the service once it has been created.
+    Item access does the same for any name, including `resolve`, e.g.
+    `credential["key"]`. Refs may appear anywhere in an operation's arguments,
+    including inside dictionaries and lists, and are resolved right before the
+    operation runs.
+    """
+
+    def __init__(self, key: str, path: Tuple[str, ...] = ()) -> None:
+        """Initializes the Ref object.
+
+        Args:
+            key (str): The key of the operation whose result is referenced.
+            path (Tuple[str, ...], optional): Attributes (or dictionary keys) to
+                                              follow on the result.
+        """
+        # Private, so that fields such as a credential's `key` can be
+        # referenced as attributes.
+        self._key = key
+        self._path = path
+
+    def __getattr__(self, name: str) -> "Ref":
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return Ref(self._key, self._path + (name,))
+
+    def __getitem__(self, name: str) -> "Ref":
+        return Ref(self._key, self._path + (name,))
+
+    def resolve(self, results: Dict[str, Any]) -> Any:
+        """Return the referenced value from the completed results."""
+        value = results[self._key]
+        for name in self._path:
+            value = value[name] if isinstance(value, dict) else getattr(value, name)
+        return value
+
+    def __repr__(self) -> str:
+        return f"<Ref({'.'.join((self._key,) + self._path)})>"
+
+
+def _find_refs(value: Any) -> Iterable[Ref]:
+    if isinstance(value, Ref):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _find_refs(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _find_refs(item)
+
+
+def _resolve(value: Any, results: Dict[str, Any]) -> Any:
+    if isinstance(value, Ref):
+        return value.resolve(results)
+    if isinstance(value, dict):
+        return {k: _resolve(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, results) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_resolve(v, results) for v in value)
+    return value
+
+
+class ScheduledOperation:
+    """A call waiting in a WriteScheduler."""
+
+    def __init__(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        depends_on: Set[str],
+    ) -> None:
+        """Initializes the ScheduledOperation object.
+
+        Args:
+            key (str): The unique name of the operation.
+            func (Callable[..., Any]): The function to call.
+            args (Tuple[Any, ...]): Positional arguments, possibly with Refs.
+            kwargs (Dict[str, Any]): Keyword arguments, possibly with Refs.
+            depends_on (Set[str]): Keys of the operations that must succeed first.
+        """
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.depends_on = depends_on
+
+    def __repr__(self) -> str:
+        return (
+            f"<ScheduledOperation(key={self.key}, "
+            f"depends_on={sorted(self.depends_on)})>"
+        )
+
+
+class ScheduleResult:
+    """The outcome of running a WriteScheduler."""
+
+    def __init__(self) -> None:
+        """Initializes an empty ScheduleResult."""
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.skipped: List[str] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.skipped
+
+    def __getitem__(self, key: str) -> Any:
+        return self.results[key]
+
+    def __repr__(self) -> str:
+        return (
+            f"<ScheduleResult(succeeded={len(self.results)}, "
+            f"failed={len(self.errors)}, skipped={len(self.skipped)})>"
+        )
+
+
+class WriteScheduler:
+    """
+    Run dependent admin API calls in parallel as soon as their inputs are ready.
+
+    Example::
+
+        scheduler = WriteScheduler()
+        service = scheduler.submit(
+            "service", client.service.create, "orders", url="http://orders"
+        )
+        route = scheduler.submit(
+            "route", client.route.create_for_service, "orders", service.id,
+            paths=["/orders"],
+        )
+        scheduler.submit("key-auth", client.key_auth_plugin.create, route_id=route.id)
+        result = scheduler.run()
+
+    Total run time is bounded by the depth of the dependency graph rather than
+    by the number of operations.
+    """
+
+    def __init__(self, max_workers: int = 8, fail_fast: bool = False) -> None:
+        """Initializes the WriteScheduler object.
+
+        Args:
+            max_workers (int, optional): The number of concurrent operations.
+                                         Defaults to 8.
+            fail_fast (bool, optional): Stop starting new operations after the
+                                        first failure. Defaults to False, in
+                                        which case only the dependents of a
+                                        failed operation are skipped.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers should be at least 1.")
+        self.max_workers = max_workers
+        self.fail_fast = fail_fast
+        self.operations: Dict[str, ScheduledOperation] = {}
+
+    def submit(
+        self,
+        key: str,
+        func: Callable[..., Any],
+        *args: Any,
+        depends_on: Iterable[str] = (),
+        **kwargs: Any,
+    ) -> Ref:
+        """
+        Add an operation to the schedule.
+
+        Dependencies are taken from any Ref found in the arguments, plus the
+        keys listed in `depends_on` for ordering without passing a result.
+
+        Args:
+            key (str): A unique name for the operation.
+            func (Callable[..., Any]): The function to call.
+            *args: Positional arguments, which may contain Refs.
+            depends_on (Iterable[str], optional): Extra operation keys that must
+                                                  complete first.
+            **kwargs: Keyword arguments, which may contain Refs.
+
+        Returns:
+            Ref: A reference to the operation's result.
+
+        Raises:
+            ValueError: If the key is already used.
+        """
+        if key in self.operations:
+            raise ValueError(f"An operation with the key {key} already exists.")
+        dependencies = set(depends_on)
+        dependencies.update(ref._key for ref in _find_refs((args, kwargs)))
+        self.operations[key] = ScheduledOperation(key, func, args, kwargs, dependencies)
+        return Ref(key)
+
+    def _dependents(self) -> Dict[str, List[str]]:
+        """Return the keys of the operations that depend on each operation."""
+        dependents: Dict[str, List[str]] = {key: [] for key in self.operations}
+        for key, operation in self.operations.items():
+            missing = [d for d in operation.depends_on if d not in self.operations]
+            if missing:
+                raise ValueError(
+                    f"Operation {key} depends on unknown operations {sorted(missing)}."
+                )
+            for dependency in operation.depends_on:
+                dependents[dependency].append(key)
+
+        remaining = {k: len(op.depends_on) for k, op in self.operations.items()}
+        ready = [k for k, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            key = ready.pop()
+            visited += 1
+            for dependent in dependents[key]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if visited != len(self.operations):
+            raise ValueError("The scheduled operations contain a dependency cycle.")
+        return dependents
+
+    def run(self) -> ScheduleResult:
+        """
+        Execute every operation, respecting dependencies.
+
+        Operations whose dependencies failed (or were skipped) are skipped.
+
+        Returns:
+            ScheduleResult: Results, errors and skipped keys.
+
+        Raises:
+            ValueError: If a dependency is unknown or the graph has a cycle.
+        """
+        return _ScheduleRun(self).run()
+
+
+class _ScheduleRun:
+    """The state of one WriteScheduler.run call."""
+
+    def __init__(self, scheduler: WriteScheduler) -> None:
+        self.scheduler = scheduler
+        self.operations = scheduler.operations
+        self.dependents = scheduler._dependents()
+        self.remaining = {k: len(op.depends_on) for k, op in self.operations.items()}
+        self.result = ScheduleResult()
+        self.skipped: Set[str] = set()
+        self.running: Dict[Future, str] = {}
+
+    def execute(self, operation: ScheduledOperation) -> Any:
+        args = _resolve(operation.args, self.result.results)
+        kwargs = _resolve(operation.kwargs, self.result.results)
+        return operation.func(*args, **kwargs)
+
+    def skip(self, key: str) -> None:
+        """Skip an operation and everything that depends on it."""
+        stack = [key]
+        while stack:
+            current = stack.pop()
+            if current in self.skipped:
+                continue
+            self.skipped.add(current)
+            self.result.skipped.append(current)
+            stack.extend(self.dependents[current])
+
+    def start(self, executor: ThreadPoolExecutor, key: str) -> None:
+        future = executor.submit(self.execute, self.operations[key])
+        self.running[future] = key
+
+    def finish(self, executor: ThreadPoolExecutor, future: Future) -> None:
+        """Record a completed operation and start the dependents now ready."""
+        key = self.running.pop(future)
+        error = future.exception()
+        if error is not None:
+            self.result.errors[key] = error
+            for dependent in self.dependents[key]:
+                self.skip(dependent)
+            return
+        self.result.results[key] = future.result()
+        for dependent in self.dependents[key]:
+            self.remaining[dependent] -= 1
+            if self.remaining[dependent] or dependent in self.skipped:
+                continue
+            if self.scheduler.fail_fast and self.result.errors:
+                self.skip(dependent)
+            else:
+                self.start(executor, dependent)
+
+    def run(self) -> ScheduleResult:
+        with ThreadPoolExecutor(max_workers=self.scheduler.max_workers) as executor:
+            for key, count in self.remaining.items():
+                if count == 0:
+                    self.start(executor, key)
+            while self.running:
+                done, _ = wait(self.running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.finish(executor, future)
+
+        result = self.result
+        if self.scheduler.fail_fast and result.errors:
+            finished = set(result.results) | set(result.errors) | self.skipped
+            result.skipped.extend(k for k in self.operations if k not in finished)
+        return result
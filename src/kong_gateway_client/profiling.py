@@ -0,0 +1,224 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from kong_gateway_client.instrumentation import RequestEvent, RequestHooks
+
+BUCKETS = ("network", "decode", "model", "caller")
+
+
+class OperationProfile:
+    """Where the wall time of one profiled operation went."""
+
+    def __init__(self, name: str) -> None:
+        """Initializes the OperationProfile object.
+
+        Args:
+            name (str): The operation name.
+        """
+        self.name = name
+        self.wall = 0.0
+        self.network = 0.0
+        self.decode = 0.0
+        self.model = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.response_bytes = 0
+        # Bytes allocated above the level at the start, and the allocation
+        # sites that grew the most, when memory is traced.
+        self.memory_peak: Optional[int] = None
+        self.top_allocations: List[str] = []
+        self._started = time.perf_counter()
+        self._memory_start = 0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def caller(self) -> float:
+        """The wall time spent outside of requests, e.g. in model classes.
+
+        Requests made in parallel threads add up, so this is clamped at zero
+        when they took longer in total than the operation itself.
+        """
+        return max(self.wall - self.network - self.decode - self.model, 0.0)
+
+    def add(self, event: RequestEvent) -> None:
+        self.requests += 1
+        self.network += event.duration or 0.0
+        self.decode += event.decode_duration
+        self.model += event.model_duration
+        self.response_bytes += event.response_bytes
+        if event.error is not None:
+            self.errors += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "wall": self.wall,
+            **{bucket: getattr(self, bucket) for bucket in BUCKETS},
+            "requests": self.requests,
+            "errors": self.errors,
+            "response_bytes": self.response_bytes,
+            "memory_peak": self.memory_peak,
+            "top_allocations": self.top_allocations,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"<OperationProfile(name={self.name}, wall={self.wall:.3f}, "
+            f"requests={self.requests})>"
+        )
+
+
+class ClientProfiler:
+    """
+    Attribute the wall time of client operations to where it was spent.
+
+    Use it through `KongClient.profile`. Each operation's time is split into
+    network (sending requests and reading responses), decode (parsing JSON),
+    model (building ResponseObjects) and caller (everything else, including
+    resource model classes and your own code). The whole `with` block is the
+    "total" operation, and `operation` marks named operations within it.
+    Requests made by any thread count towards every operation open at the
+    time.
+
+    With `trace_memory`, tracemalloc also records the peak memory and the
+    largest allocation sites of each operation. Tracing slows Python down
+    considerably, so the times are then only useful relative to each other.
+    """
+
+    def __init__(
+        self, hooks: RequestHooks, trace_memory: bool = False, top: int = 10
+    ) -> None:
+        """Initializes the ClientProfiler object.
+
+        Args:
+            hooks (RequestHooks): The hooks of the client to profile.
+            trace_memory (bool, optional): Trace allocations with tracemalloc.
+            top (int, optional): The number of allocation sites to keep per
+                                 operation. Defaults to 10.
+        """
+        self.hooks = hooks
+        self.trace_memory = trace_memory
+        self.top = top
+        self.operations: List[OperationProfile] = []
+        self._open: List[OperationProfile] = []
+        self._started_tracing = False
+        self.lock = threading.Lock()
+
+    def after_response(self, event: RequestEvent) -> None:
+        with self.lock:
+            for operation in self._open:
+                operation.add(event)
+
+    on_error = after_response
+
+    def _start(self, name: str) -> OperationProfile:
+        operation = OperationProfile(name)
+        if self.trace_memory:
+            # Fold the peak so far into the open operations before resetting
+            # it for the new one.
+            current, peak = tracemalloc.get_traced_memory()
+            for parent in self._open:
+                parent.memory_peak = max(
+                    parent.memory_peak or 0, peak - parent._memory_start
+                )
+            tracemalloc.reset_peak()
+            operation._memory_start = current
+            operation._snapshot = tracemalloc.take_snapshot()
+        with self.lock:
+            self._open.append(operation)
+            self.operations.append(operation)
+        operation._started = time.perf_counter()
+        return operation
+
+    def _finish(self, operation: OperationProfile) -> None:
+        operation.wall = time.perf_counter() - operation._started
+        with self.lock:
+            self._open.remove(operation)
+        if self.trace_memory and operation._snapshot is not None:
+            _, peak = tracemalloc.get_traced_memory()
+            operation.memory_peak = max(
+                operation.memory_peak or 0, peak - operation._memory_start
+            )
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            stats = snapshot.compare_to(operation._snapshot, "lineno")
+            operation.top_allocations = [str(stat) for stat in stats[: self.top]]
+            operation._snapshot = None
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[OperationProfile]:
+        """
+        Profile a named operation, e.g. one bulk call.
+
+        Args:
+            name (str): The name shown in the report.
+
+        Yields:
+            OperationProfile: The operation's profile, complete on exit.
+        """
+        operation = self._start(name)
+        try:
+            yield operation
+        finally:
+            self._finish(operation)
+
+    def __enter__(self) -> "ClientProfiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.hooks.register(self)
+        self._total = self._start("total")
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._finish(self._total)
+        self.hooks.unregister(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"operations": [operation.as_dict() for operation in self.operations]}
+
+    def report(self) -> str:
+        """Return a text table of the operations, with their allocation sites."""
+        lines = [
+            f"{'operation':<30} {'wall s':>9} "
+            + " ".join(f"{bucket + ' %':>9}" for bucket in BUCKETS)
+            + f" {'requests':>9} {'peak MB':>9}"
+        ]
+        for operation in self.operations:
+            wall = operation.wall or 1e-12
+            shares = " ".join(
+                f"{getattr(operation, bucket) / wall:>9.1%}" for bucket in BUCKETS
+            )
+            peak = (
+                f"{operation.memory_peak / 2**20:>9.2f}"
+                if operation.memory_peak is not None
+                else f"{'-':>9}"
+            )
+            lines.append(
+                f"{operation.name:<30} {operation.wall:>9.3f} {shares} "
+                f"{operation.requests:>9} {peak}"
+            )
+        for operation in self.operations:
+            if operation.top_allocations:
+                lines.append("")
+                lines.append(f"Top allocations in {operation.name}:")
+                lines.extend(f"  {line}" for line in operation.top_allocations)
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write the report to a file, as JSON if the path ends with .json."""
+        with open(path, "w", encoding="utf-8") as file:
+            if path.endswith(".json"):
+                json.dump(self.as_dict(), file, indent=2)
+            else:
+                file.write(self.report() + "\n")
+
+    def __repr__(self) -> str:
+        return f"<ClientProfiler(operations={len(self.operations)})>"
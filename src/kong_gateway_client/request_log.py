@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import requests
+from kong_gateway_client.instrumentation import endpoint_template
+
+logger = logging.getLogger(__name__)
+
+
+class RequestLog:
+    """
+    Log failed and slow Admin API requests.
+
+    Every KongClient has one as `request_log`. Failed requests are logged at
+    WARNING, except for `quiet_statuses` (by default 404, which existence
+    checks expect), which are logged at DEBUG. Successful requests that took at
+    least `slow_threshold` seconds are logged at WARNING as well.
+
+    Each record has a short message and a `kong_request` attribute with the
+    method, endpoint template, workspace, status, duration and the body,
+    truncated to `body_limit` characters, for structured log handlers.
+
+    To keep error bursts from flooding the logs, at most `burst` records are
+    logged per method, endpoint template and status within each `window` of
+    seconds. The next record logged after the window notes how many were
+    suppressed.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: Optional[float] = None,
+        body_limit: int = 500,
+        quiet_statuses: Iterable[int] = (404,),
+        burst: int = 10,
+        window: float = 60.0,
+        log: Optional[logging.Logger] = None,
+    ) -> None:
+        """Initializes the RequestLog object.
+
+        Args:
+            slow_threshold (Optional[float], optional): Seconds after which a
+                successful request is logged. Defaults to None, which logs none.
+            body_limit (int, optional): The most characters of the response
+                                        body to log. Defaults to 500.
+            quiet_statuses (Iterable[int], optional): Statuses to log at DEBUG.
+                                                      Defaults to (404,).
+            burst (int, optional): The most records per key and window.
+                                   Defaults to 10.
+            window (float, optional): The sampling window in seconds.
+                                      Defaults to 60.
+            log (Optional[logging.Logger], optional): The logger to use.
+                Defaults to the "kong_gateway_client.request_log" logger.
+        """
+        if burst < 1 or window <= 0:
+            raise ValueError("The burst and window must be positive.")
+        self.slow_threshold = slow_threshold
+        self.body_limit = body_limit
+        self.quiet_statuses = frozenset(quiet_statuses)
+        self.burst = burst
+        self.window = window
+        self.logger = log or logger
+        # Per key, the window start, records logged and records suppressed.
+        self._windows: Dict[Tuple[str, str, int], List[float]] = {}
+        self.lock = threading.Lock()
+
+    def response(
+        self,
+        method: str,
+        endpoint: str,
+        workspace: Optional[str],
+        response: requests.Response,
+        duration: float,
+    ) -> None:
+        """
+        Log a response if it failed or was slow.
+
+        Called by `KongClient.request` for every response received. Responses
+        that are not logged cost a comparison or two.
+
+        Args:
+            method (str): The HTTP method.
+            endpoint (str): The endpoint passed to `KongClient.request`.
+            workspace (Optional[str]): The workspace, if workspace scoped.
+            response (requests.Response): The response received.
+            duration (float): Seconds from sending the request to receiving
+                              the whole response.
+        """
+        if response.ok:
+            if self.slow_threshold is None or duration < self.slow_threshold:
+                return
+            level = logging.WARNING
+            message = "Slow request %s %s: %s in %.3fs"
+        else:
+            level = (
+                logging.DEBUG
+                if response.status_code in self.quiet_statuses
+                else logging.WARNING
+            )
+            message = "Request %s %s failed: %s in %.3fs"
+        if not self.logger.isEnabledFor(level):
+            return
+        template = endpoint_template(endpoint)
+        suppressed = self._sample((method, template, response.status_code))
+        if suppressed is None:
+            return
+        if suppressed:
+            message += f" ({suppressed} similar suppressed)"
+        self.logger.log(
+            level,
+            message,
+            method,
+            template,
+            response.status_code,
+            duration,
+            extra={
+                "kong_request": {
+                    "method": method,
+                    "endpoint": template,
+                    "workspace": workspace,
+                    "status": response.status_code,
+                    "duration": duration,
+                    "body": self._body(response),
+                    "suppressed": suppressed,
+                }
+            },
+        )
+
+    def _body(self, response: requests.Response) -> str:
+        text = response.text
+        if len(text) > self.body_limit:
+            return f"{text[: self.body_limit]}... ({len(text)} characters)"
+        return text
+
+    def _sample(self, key: Tuple[str, str, int]) -> Optional[int]:
+        """
+        Count a record against its key's window.
+
+        Returns:
+            Optional[int]: None to suppress the record, otherwise the number of
+                           records suppressed since the last one logged.
+        """
+        now = time.monotonic()
+        with self.lock:
+            state = self._windows.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state is not None else 0
+                self._windows[key] = [now, 1, 0]
+                return suppressed
+            if state[1] >= self.burst:
+                state[2] += 1
+                return None
+            state[1] += 1
+            return 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<RequestLog(slow_threshold={self.slow_threshold}, "
+            f"burst={self.burst}, window={self.window})>"
+        )
@@ -1,7 +1,25 @@
-from typing import Optional, List, Dict, Any
+from array import array
+from bisect import bisect_left
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
+import requests
 from kong_gateway_client.client import KongClient
 from kong_gateway_client.common import ResponseObject
-from kong_gateway_client.utils.helpers import validate_id_or_name, validate_name
+from kong_gateway_client.utils.concurrency import run_concurrently
+from kong_gateway_client.utils.helpers import (
+    is_conflict,
+    is_not_found,
+    validate_id_or_name,
+    validate_name,
+)
+from kong_gateway_client.utils.ids import deterministic_id
+
+RATE_LIMIT_PLUGIN = "rate-limiting-advanced"
+
+# The defaults `configure_rate_limit` applies to the optional override fields.
+RATE_LIMIT_DEFAULTS: Dict[str, Any] = {
+    "window_type": "sliding",
+    "retry_after_jitter_max": 0,
+}
 
 
 class KongConsumers:
@@ -105,6 +123,166 @@ class KongConsumerGroupRateLimit:
         )
 
 
+class KongMembershipChanges:
+    def __init__(self) -> None:
+        """Initialize an empty KongMembershipChanges object.
+
+        Records the result of a bulk consumer group membership operation.
+        """
+        self.added: List[str] = []
+        self.removed: List[str] = []
+        self.unchanged: int = 0
+        self.failed: List[Tuple[str, BaseException]] = []
+
+    @property
+    def ok(self) -> bool:
+        """Whether every membership change succeeded."""
+        return not self.failed
+
+    def __repr__(self) -> str:
+        """String representation of the KongMembershipChanges object."""
+        return (
+            f"<KongMembershipChanges(added={len(self.added)}, "
+            f"removed={len(self.removed)}, unchanged={self.unchanged}, "
+            f"failed={len(self.failed)})>"
+        )
+
+
+class KongRateLimitChanges:
+    def __init__(self) -> None:
+        """Initialize an empty KongRateLimitChanges object.
+
+        Records the result of a bulk rate limit override update.
+        """
+        self.updated: List[str] = []
+        self.unchanged: List[str] = []
+        self.failed: List[Tuple[str, BaseException]] = []
+
+    @property
+    def ok(self) -> bool:
+        """Whether every override was read and written successfully."""
+        return not self.failed
+
+    def __repr__(self) -> str:
+        """String representation of the KongRateLimitChanges object."""
+        return (
+            f"<KongRateLimitChanges(updated={self.updated}, "
+            f"unchanged={len(self.unchanged)}, failed={len(self.failed)})>"
+        )
+
+
+class KongConsumerGroupIndex:
+    def __init__(
+        self,
+        groups: Iterable[KongConsumerGroup],
+        members: Dict[str, Iterable[Dict[str, Any]]],
+    ):
+        """Initialize the KongConsumerGroupIndex object.
+
+        A two-way index of consumer group membership. Consumers and groups are
+        numbered, and the members of each group and the groups of each
+        consumer are stored as sorted integer arrays in compressed sparse row
+        form, so the index takes a few bytes per membership.
+
+        Args:
+            groups (Iterable[KongConsumerGroup]): Every consumer group.
+            members (Dict[str, Iterable[Dict[str, Any]]]): The raw consumer data
+            of each group's members, indexed by group ID.
+        """
+        self.group_ids: List[str] = []
+        self.consumer_ids: List[str] = []
+        self._groups: Dict[str, int] = {}
+        self._consumers: Dict[str, int] = {}
+        rows = [self._number_members(group, members) for group in groups]
+
+        self._member_offsets = array("L", [0])
+        self._members = array("L")
+        for row in rows:
+            self._members.extend(row)
+            self._member_offsets.append(len(self._members))
+        self._index_memberships(rows)
+
+    def _number_members(
+        self, group: KongConsumerGroup, members: Dict[str, Iterable[Dict[str, Any]]]
+    ) -> array:
+        """Number a group and its members, returning the sorted member row."""
+        self._groups[group.id] = len(self.group_ids)
+        if group.name:
+            self._groups[group.name] = len(self.group_ids)
+        self.group_ids.append(group.id)
+        row = set()
+        for consumer in members.get(group.id, []):
+            index = self._consumers.get(consumer["id"])
+            if index is None:
+                index = len(self.consumer_ids)
+                self.consumer_ids.append(consumer["id"])
+                self._consumers[consumer["id"]] = index
+                if consumer.get("username"):
+                    self._consumers[consumer["username"]] = index
+            row.add(index)
+        return array("L", sorted(row))
+
+    def _index_memberships(self, rows: List[array]) -> None:
+        """Build the reverse rows, the groups of each consumer."""
+        counts = [0] * len(self.consumer_ids)
+        for row in rows:
+            for consumer in row:
+                counts[consumer] += 1
+        # Filling the reverse rows in group order keeps each of them sorted.
+        self._group_offsets = array("L", [0])
+        for count in counts:
+            self._group_offsets.append(self._group_offsets[-1] + count)
+        self._memberships = array("L", [0]) * len(self._members)
+        cursor = array("L", self._group_offsets[:-1])
+        for group, row in enumerate(rows):
+            for consumer in row:
+                self._memberships[cursor[consumer]] = group
+                cursor[consumer] += 1
+
+    def _members_row(self, group: int) -> array:
+        start, end = self._member_offsets[group], self._member_offsets[group + 1]
+        return self._members[start:end]
+
+    def _groups_row(self, consumer: int) -> array:
+        start, end = self._group_offsets[consumer], self._group_offsets[consumer + 1]
+        return self._memberships[start:end]
+
+    def groups_of(self, consumer_id_or_name: str) -> List[str]:
+        """Return the IDs of the groups a consumer belongs to."""
+        consumer = self._consumers.get(consumer_id_or_name)
+        if consumer is None:
+            return []
+        return [self.group_ids[group] for group in self._groups_row(consumer)]
+
+    def members_of(self, group_id_or_name: str) -> List[str]:
+        """Return the IDs of the consumers in a group."""
+        group = self._groups.get(group_id_or_name)
+        if group is None:
+            return []
+        return [self.consumer_ids[consumer] for consumer in self._members_row(group)]
+
+    def is_member(self, consumer_id_or_name: str, group_id_or_name: str) -> bool:
+        """Return whether a consumer belongs to a group."""
+        consumer = self._consumers.get(consumer_id_or_name)
+        group = self._groups.get(group_id_or_name)
+        if consumer is None or group is None:
+            return False
+        row = self._groups_row(consumer)
+        position = bisect_left(row, group)
+        return position < len(row) and row[position] == group
+
+    def __len__(self) -> int:
+        """Return the number of memberships in the index."""
+        return len(self._members)
+
+    def __repr__(self) -> str:
+        """String representation of the KongConsumerGroupIndex object."""
+        return (
+            f"<KongConsumerGroupIndex(groups={len(self.group_ids)}, "
+            f"consumers={len(self.consumer_ids)}, memberships={len(self)})>"
+        )
+
+
 class ConsumerGroup:
     """
     Consumer group class to interact with Kong's Consumer group entities.
@@ -171,6 +349,63 @@ class ConsumerGroup:
         response_data = self.client.request("GET", endpoint)
         return KongConsumerGroupConsumers(response_data)
 
+    def _iter_member_pages(
+        self, id_or_name: str, size: Optional[int]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the raw consumer data of a group one page at a time.
+
+        Recent Kong versions paginate members with `data` and `next`, while
+        older versions return every member at once under `consumers`.
+        """
+        endpoint = f"{self.ENTITY_PATH}/{id_or_name}/consumers"
+        if size:
+            endpoint = f"{endpoint}?size={size}"
+        while endpoint:
+            # KongClient.request returns None for an empty body.
+            response = self.client.request("GET", endpoint)
+            if response is None:
+                return
+            if response.get("consumers") is not None:
+                yield response.consumers
+            elif isinstance(response.get("data"), list):
+                yield response.data
+            endpoint = response.get("next")
+
+    @validate_id_or_name
+    def iter_consumers(
+        self, id_or_name: str, size: Optional[int] = 1000
+    ) -> Iterator[KongConsumers]:
+        """
+        Lazily iterate over the consumers of a group, one page at a time.
+
+        Args:
+        - id_or_name (str): The ID or name of the consumer group.
+        - size (int, optional): The page size to request. Defaults to 1000.
+
+        Returns:
+        - Iterator[KongConsumers]: The members of the group.
+        """
+        for page in self._iter_member_pages(id_or_name, size):
+            for consumer_data in page:
+                yield KongConsumers(consumer_data)
+
+    @validate_id_or_name
+    def count_consumers(self, id_or_name: str, size: Optional[int] = 1000) -> int:
+        """
+        Count the consumers of a group.
+
+        Kong has no count endpoint for group members, so the member pages are
+        read, but only their lengths are kept and no models are built.
+
+        Args:
+        - id_or_name (str): The ID or name of the consumer group.
+        - size (int, optional): The page size to request. Defaults to 1000.
+
+        Returns:
+        - int: The number of consumers in the group.
+        """
+        return sum(len(page) for page in self._iter_member_pages(id_or_name, size))
+
     def add_consumer(
         self,
         group_id_or_name: str,
@@ -202,6 +437,152 @@ class ConsumerGroup:
                 )
             )
 
+    def add_consumers(
+        self,
+        group_id_or_name: str,
+        consumers: Iterable[str],
+        batch_size: int = 100,
+        max_workers: int = 8,
+    ) -> KongMembershipChanges:
+        """
+        Add many consumers to a group.
+
+        Kong accepts a list of consumers per request, so consumers are sent in
+        batches and the batches are posted in parallel. Kong rejects a whole
+        batch with 409 if any consumer in it is already a member, so the
+        consumers of such a batch are retried one at a time, and those that
+        are already members are counted as unchanged.
+
+        Args:
+        - group_id_or_name (str): The ID or name of the consumer group.
+        - consumers (Iterable[str]): The IDs or usernames of the consumers to add.
+        - batch_size (int, optional): The number of consumers per request.
+        - max_workers (int, optional): The number of concurrent requests.
+
+        Returns:
+        - KongMembershipChanges: The consumers added and any failures.
+        """
+        if not group_id_or_name:
+            raise ValueError("Either the consumer group id or name must be provided.")
+        if batch_size < 1:
+            raise ValueError("batch_size should be at least 1.")
+
+        consumers = list(consumers)
+        batches = [
+            consumers[i:i + batch_size] for i in range(0, len(consumers), batch_size)
+        ]
+        endpoint = f"{self.ENTITY_PATH}/{group_id_or_name}/consumers"
+
+        def add(consumer: Any) -> Any:
+            return self.client.request("POST", endpoint, json={"consumer": consumer})
+
+        changes = KongMembershipChanges()
+        retry: List[str] = []
+        for task in run_concurrently(add, batches, max_workers):
+            if task.ok:
+                changes.added.extend(task.item)
+            elif is_conflict(task.error):
+                retry.extend(task.item)
+            else:
+                changes.failed.extend((consumer, task.error) for consumer in task.item)
+        for task in run_concurrently(add, retry, max_workers):
+            if task.ok:
+                changes.added.append(task.item)
+            elif is_conflict(task.error):
+                changes.unchanged += 1
+            else:
+                changes.failed.append((task.item, task.error))
+        return changes
+
+    def remove_consumers(
+        self,
+        group_id_or_name: str,
+        consumers: Iterable[str],
+        max_workers: int = 8,
+    ) -> KongMembershipChanges:
+        """
+        Remove many consumers from a group with parallel requests.
+
+        Consumers that are not members are treated as already removed.
+
+        Args:
+        - group_id_or_name (str): The ID or name of the consumer group.
+        - consumers (Iterable[str]): The IDs or usernames of the consumers to
+          remove.
+        - max_workers (int, optional): The number of concurrent requests.
+
+        Returns:
+        - KongMembershipChanges: The consumers removed and any failures.
+        """
+        if not group_id_or_name:
+            raise ValueError("Either the consumer group id or name must be provided.")
+
+        def remove(consumer: str) -> None:
+            try:
+                self.delete_consumer(group_id_or_name, consumer)
+            except requests.HTTPError as error:
+                if not is_not_found(error):
+                    raise
+
+        changes = KongMembershipChanges()
+        for task in run_concurrently(remove, consumers, max_workers):
+            if task.ok:
+                changes.removed.append(task.item)
+            else:
+                changes.failed.append((task.item, task.error))
+        return changes
+
+    def sync_members(
+        self,
+        group_id_or_name: str,
+        desired: Iterable[str],
+        batch_size: int = 100,
+        max_workers: int = 8,
+    ) -> KongMembershipChanges:
+        """
+        Make a group's membership match a desired set of consumers.
+
+        The current members are read once and only the missing consumers are
+        added and the extra consumers removed.
+
+        Args:
+        - group_id_or_name (str): The ID or name of the consumer group.
+        - desired (Iterable[str]): The IDs or usernames of the consumers that
+          should be members.
+        - batch_size (int, optional): The number of consumers per add request.
+        - max_workers (int, optional): The number of concurrent requests.
+
+        Returns:
+        - KongMembershipChanges: The consumers added and removed.
+        """
+        desired = set(desired)
+        matched = set()
+        extra = []
+        current = 0
+        for consumer in self.iter_consumers(group_id_or_name):
+            current += 1
+            identifiers = {consumer.id, consumer.username} & desired
+            if identifiers:
+                matched.update(identifiers)
+            else:
+                extra.append(consumer.id)
+        missing = [consumer for consumer in desired if consumer not in matched]
+
+        changes = KongMembershipChanges()
+        if missing:
+            added = self.add_consumers(
+                group_id_or_name, sorted(missing), batch_size, max_workers
+            )
+            changes.added, changes.failed = added.added, added.failed
+            # Consumers that became members after the listing.
+            changes.unchanged = added.unchanged
+        if extra:
+            removed = self.remove_consumers(group_id_or_name, extra, max_workers)
+            changes.removed = removed.removed
+            changes.failed.extend(removed.failed)
+        changes.unchanged += current - len(extra)
+        return changes
+
     def get_all(self) -> List[KongConsumerGroup]:
         """
         Retrieve all consumer groups
@@ -213,6 +594,38 @@ class ConsumerGroup:
         response_data = self.client.fetch_all(self.ENTITY_PATH)
         return [KongConsumerGroup(item) for item in response_data]
 
+    def build_membership_index(
+        self, max_workers: int = 8, size: Optional[int] = 1000
+    ) -> KongConsumerGroupIndex:
+        """
+        Build a two-way index of every consumer group's members.
+
+        Each group's member list is paged once, with the groups read
+        concurrently, instead of asking for the groups of every consumer.
+
+        Args:
+        - max_workers (int, optional): The number of groups read concurrently.
+        - size (int, optional): The page size to request. Defaults to 1000.
+
+        Returns:
+        - KongConsumerGroupIndex: The membership index.
+        """
+        groups = self.get_all()
+
+        def read_members(group: KongConsumerGroup) -> List[Dict[str, Any]]:
+            return [
+                {"id": consumer["id"], "username": consumer.get("username")}
+                for page in self._iter_member_pages(group.id, size)
+                for consumer in page
+            ]
+
+        members = {}
+        for task in run_concurrently(read_members, groups, max_workers):
+            if not task.ok:
+                raise task.error
+            members[task.item.id] = task.result
+        return KongConsumerGroupIndex(groups, members)
+
     @validate_id_or_name
     def put(
         self,
@@ -234,6 +647,34 @@ class ConsumerGroup:
         response_data = self.client.request("PUT", endpoint, json=kwargs)
         return KongConsumerGroup(response_data)
 
+    @validate_name
+    def id_for(self, name: str) -> str:
+        """
+        Return the deterministic ID used by `upsert` for a consumer group name.
+
+        Args:
+        - name (str): The name of the consumer group.
+
+        Returns:
+        - str: The ID the consumer group has (or will have) in the target workspace.
+        """
+        return deterministic_id("consumer_groups", name, self.client.target_workspace)
+
+    @validate_name
+    def upsert(self, name: str, **kwargs) -> KongConsumerGroup:
+        """
+        Create or replace a consumer group with a single PUT, without looking it
+        up first.
+
+        Args:
+        - name (str): The name of the consumer group.
+        - **kwargs: Parameters for the consumer group.
+
+        Returns:
+        - KongConsumerGroup: The Kong consumer group object.
+        """
+        return self.put(self.id_for(name), name=name, **kwargs)
+
     @validate_id_or_name
     def delete(self, id_or_name: str) -> None:
         """
@@ -335,6 +776,109 @@ class ConsumerGroup:
 
         return KongConsumerGroupRateLimit(response_data)
 
+    @validate_id_or_name
+    def get_rate_limit(
+        self, id_or_name: str
+    ) -> Optional[KongConsumerGroupRateLimit]:
+        """
+        Retrieve the rate limit override of a consumer group.
+
+        Reads the override endpoint rather than the group itself, which would
+        also return every member of the group.
+
+        Args:
+        - id_or_name (str): The ID or name of the consumer group.
+
+        Returns:
+        - Optional[KongConsumerGroupRateLimit]: The override, or None if the
+          group has none.
+        """
+        endpoint = (
+            f"{self.ENTITY_PATH}/{id_or_name}/overrides/plugins/{RATE_LIMIT_PLUGIN}"
+        )
+        try:
+            response_data = self.client.request("GET", endpoint)
+        except requests.HTTPError as error:
+            if is_not_found(error):
+                return None
+            raise
+        return KongConsumerGroupRateLimit(response_data)
+
+    def get_rate_limits(
+        self, groups: Optional[Iterable[str]] = None, max_workers: int = 8
+    ) -> Dict[str, Optional[KongConsumerGroupRateLimit]]:
+        """
+        Retrieve the rate limit overrides of many consumer groups in parallel.
+
+        Args:
+        - groups (Iterable[str], optional): The IDs or names of the groups.
+          Defaults to every consumer group, indexed by name.
+        - max_workers (int, optional): The number of concurrent requests.
+
+        Returns:
+        - Dict[str, Optional[KongConsumerGroupRateLimit]]: The override of each
+          group, or None for groups without one.
+        """
+        if groups is None:
+            groups = [group.name or group.id for group in self.get_all()]
+
+        overrides = {}
+        for task in run_concurrently(self.get_rate_limit, groups, max_workers):
+            if not task.ok:
+                raise task.error
+            overrides[task.item] = task.result
+        return overrides
+
+    def sync_rate_limits(
+        self, tiers: Dict[str, Dict[str, Any]], max_workers: int = 8
+    ) -> KongRateLimitChanges:
+        """
+        Make the rate limit overrides of many groups match a tier table.
+
+        The current overrides are read in parallel and only the groups whose
+        override differs are written, also in parallel.
+
+        Args:
+        - tiers (Dict[str, Dict[str, Any]]): The desired override config of each
+          group, indexed by group ID or name. Each config takes `limit` and
+          `window_size`, and optionally `window_type` and
+          `retry_after_jitter_max`, as in `configure_rate_limit`.
+        - max_workers (int, optional): The number of concurrent requests.
+
+        Returns:
+        - KongRateLimitChanges: The groups updated, unchanged or failed.
+        """
+        changes = KongRateLimitChanges()
+        changed = []
+        current = run_concurrently(self.get_rate_limit, tiers, max_workers)
+        for task in current:
+            desired = {**RATE_LIMIT_DEFAULTS, **tiers[task.item]}
+            if not task.ok:
+                changes.failed.append((task.item, task.error))
+            elif task.result is not None and all(
+                task.result.config.get(k) == v for k, v in desired.items()
+            ):
+                changes.unchanged.append(task.item)
+            else:
+                changed.append(task.item)
+
+        def configure(group: str) -> KongConsumerGroupRateLimit:
+            config = {**RATE_LIMIT_DEFAULTS, **tiers[group]}
+            return self.configure_rate_limit(
+                group,
+                config["limit"],
+                config["window_size"],
+                config["window_type"],
+                config["retry_after_jitter_max"],
+            )
+
+        for task in run_concurrently(configure, changed, max_workers):
+            if task.ok:
+                changes.updated.append(task.item)
+            else:
+                changes.failed.append((task.item, task.error))
+        return changes
+
     @validate_id_or_name
     def get_consumer_groups_for_consumer(
         self, id_or_name: str
@@ -383,6 +927,30 @@ class ConsumerGroup:
                 )
             )
 
+    def add_consumer_groups_for_consumer(
+        self,
+        consumer_id_or_name: str,
+        groups: List[str],
+    ) -> KongConsumerConsumerGroups:
+        """
+        Add a consumer to several consumer groups in a single request.
+
+        Args:
+        - consumer_id_or_name (str): The ID or name of the consumer.
+        - groups (List[str]): The IDs or names of the consumer groups.
+
+        Returns:
+        - KongConsumerConsumerGroups: Response from Kong.
+        """
+        if not consumer_id_or_name or not groups:
+            raise ValueError(
+                "The consumer id or name and at least one group must be provided."
+            )
+
+        endpoint = f"/consumers/{consumer_id_or_name}/consumer_groups"
+        response_data = self.client.request("POST", endpoint, json={"group": groups})
+        return KongConsumerConsumerGroups(response_data)
+
     @validate_id_or_name
     def delete_consumer_groups_for_consumer(self, id_or_name: str) -> None:
         """
@@ -1,7 +1,25 @@
-from typing import Any, Dict, List, Optional
+import json
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+import requests
 from kong_gateway_client.client import KongClient
 from kong_gateway_client.common import ResponseObject
-from kong_gateway_client.utils.helpers import validate_id_or_name
+from kong_gateway_client.utils.concurrency import run_concurrently
+from kong_gateway_client.utils.helpers import (
+    is_not_found,
+    validate_id_or_name,
+    validate_username,
+)
+from kong_gateway_client.utils.ids import deterministic_id
 
 
 class ConsumerACL:
@@ -32,6 +50,65 @@ class KongConsumer:
         )
 
 
+class ConsumerCredentials:
+    def __init__(
+        self,
+        consumer: KongConsumer,
+        acls: List[ConsumerACL],
+        key_auths: List[Dict[str, Any]],
+    ):
+        self.consumer = consumer
+        self.acls = acls
+        self.key_auths = key_auths
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record in the form written by `export_credentials`."""
+        return {
+            "consumer": vars(self.consumer),
+            "acls": [
+                {"id": acl.id, "group": acl.group, "created_at": acl.created_at}
+                for acl in self.acls
+            ],
+            "key_auths": [
+                {k: v for k, v in key_auth.items() if k != "consumer"}
+                for key_auth in self.key_auths
+            ],
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"<ConsumerCredentials(consumer={self.consumer.id}, "
+            f"acls={len(self.acls)}, key_auths={len(self.key_auths)})>"
+        )
+
+
+class ConsumerACLSyncResult:
+    def __init__(self) -> None:
+        """Initialize an empty ConsumerACLSyncResult object.
+
+        Records the (consumer ID, group) pairs added and removed by
+        `Consumer.sync_acls`, the number of groups already in place, and the
+        (consumer, group, error) of every change that failed.
+        """
+        self.added: List[Tuple[str, str]] = []
+        self.removed: List[Tuple[str, str]] = []
+        self.unchanged: int = 0
+        self.failed: List[Tuple[str, str, BaseException]] = []
+
+    @property
+    def ok(self) -> bool:
+        """Whether every ACL change succeeded."""
+        return not self.failed
+
+    def __repr__(self) -> str:
+        """String representation of the ConsumerACLSyncResult object."""
+        return (
+            f"<ConsumerACLSyncResult(added={len(self.added)}, "
+            f"removed={len(self.removed)}, unchanged={self.unchanged}, "
+            f"failed={len(self.failed)})>"
+        )
+
+
 class Consumer:
     """
     Consumer class to interact with Kong's Consumer entities.
@@ -144,6 +221,39 @@ class Consumer:
         response_data = self.client.request("PUT", endpoint, json=kwargs)
         return KongConsumer(response_data)
 
+    @validate_username
+    def id_for(self, username: str) -> str:
+        """
+        Return the deterministic ID used by `upsert` for a consumer username.
+
+        Args:
+        - username (str): The username of the consumer.
+
+        Returns:
+        - str: The ID the consumer has (or will have) in the target workspace.
+        """
+        return deterministic_id("consumers", username, self.client.target_workspace)
+
+    @validate_username
+    def upsert(self, username: str, **kwargs) -> KongConsumer:
+        """
+        Create or replace a consumer with a single PUT, without looking it up first.
+
+        The consumer ID is derived from the workspace and the username, so
+        repeated or concurrent calls for the same username always target the
+        same entity. A consumer created with the same username by other means,
+        and so with a random ID, is not replaced: Kong rejects the PUT with 409
+        because the username is already taken.
+
+        Args:
+        - username (str): The username of the consumer.
+        - **kwargs: Parameters for the consumer, e.g. custom_id or tags.
+
+        Returns:
+        - KongConsumer: The Kong consumer object.
+        """
+        return self.put(self.id_for(username), username=username, **kwargs)
+
     @validate_id_or_name
     def delete(self, id_or_name: str) -> None:
         """
@@ -234,3 +344,165 @@ class Consumer:
         # The identifier can be either the ID or the GROUP name
         endpoint = f"/consumers/{consumer}/acls/{identifier}"
         self.client.request("DELETE", endpoint)
+
+    def _group_by_consumer(
+        self, endpoint: str, size: Optional[int]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Page a top-level credential collection and group it by consumer ID."""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for item in self.client.iter_all(endpoint, size):
+            consumer = (item.get("consumer") or {}).get("id")
+            grouped.setdefault(consumer, []).append(item)
+        return grouped
+
+    def iter_credentials(
+        self, size: Optional[int] = 1000
+    ) -> Iterator[ConsumerCredentials]:
+        """
+        Yield every consumer together with its ACL groups and key-auth keys.
+
+        The top-level `/acls` and `/key-auths` collections are each paged once,
+        concurrently, and joined to the consumers in memory, so the cost is a
+        few requests per thousand consumers rather than two per consumer.
+        Consumers are then streamed page by page.
+
+        Args:
+        - size (int, optional): The page size to request. Defaults to 1000.
+
+        Returns:
+        - Iterator[ConsumerCredentials]: The joined record of each consumer.
+        """
+        tasks = run_concurrently(
+            lambda endpoint: self._group_by_consumer(endpoint, size),
+            ["/acls", "/key-auths"],
+        )
+        for task in tasks:
+            if not task.ok:
+                raise task.error
+        acls, key_auths = (task.result for task in tasks)
+
+        for item in self.client.iter_all(self.ENTITY_PATH, size):
+            yield ConsumerCredentials(
+                KongConsumer(item),
+                [ConsumerACL(acl) for acl in acls.get(item["id"], [])],
+                key_auths.get(item["id"], []),
+            )
+
+    def export_credentials(self, stream: TextIO, size: Optional[int] = 1000) -> int:
+        """
+        Write every consumer's ACL groups and key-auth keys as NDJSON.
+
+        One JSON object per line is written for each consumer, in the form of
+        `ConsumerCredentials.as_dict`.
+
+        Args:
+        - stream (TextIO): The file-like object to write to.
+        - size (int, optional): The page size to request. Defaults to 1000.
+
+        Returns:
+        - int: The number of consumers written.
+        """
+        count = 0
+        for credentials in self.iter_credentials(size):
+            stream.write(json.dumps(credentials.as_dict(), default=str))
+            stream.write("\n")
+            count += 1
+        return count
+
+    def sync_acls(
+        self,
+        mapping: Dict[str, Iterable[str]],
+        max_workers: int = 8,
+        size: Optional[int] = 1000,
+    ) -> ConsumerACLSyncResult:
+        """
+        Make the ACL groups of many consumers match a desired mapping.
+
+        Current ACLs are read with a single paged pass over `/acls`, and only
+        the missing groups are added and the extra groups removed, with the
+        changes applied in parallel. Consumers missing from the mapping are left
+        untouched. The `/consumers` collection is only read when the mapping
+        refers to consumers by username or custom_id, and keys that name the
+        same consumer have their groups merged.
+
+        Args:
+        - mapping (Dict[str, Iterable[str]]): The desired ACL groups, indexed by
+          consumer ID, username or custom_id.
+        - max_workers (int, optional): The number of concurrent changes.
+        - size (int, optional): The page size to request. Defaults to 1000.
+
+        Returns:
+        - ConsumerACLSyncResult: The groups added and removed per consumer.
+        """
+        current = self._group_by_consumer("/acls", size)
+        ids = self._consumer_ids(mapping, current, size)
+
+        # Keys naming the same consumer, e.g. by ID and by username, are merged.
+        result = ConsumerACLSyncResult()
+        desired: Dict[str, Set[str]] = {}
+        for key, groups in mapping.items():
+            consumer_id = ids.get(key)
+            if consumer_id is None:
+                error = ValueError(f"Consumer {key} does not exist.")
+                result.failed.extend((key, group, error) for group in groups)
+            else:
+                desired.setdefault(consumer_id, set()).update(groups)
+
+        additions: List[Tuple[str, str]] = []
+        removals: List[Tuple[str, str, str]] = []
+        for consumer_id, groups in desired.items():
+            existing = {acl["group"]: acl["id"] for acl in current.get(consumer_id, [])}
+            additions.extend((consumer_id, g) for g in sorted(groups - set(existing)))
+            removals.extend(
+                (consumer_id, g, existing[g]) for g in sorted(set(existing) - groups)
+            )
+            result.unchanged += len(groups & set(existing))
+        self._apply_acl_changes(additions, removals, result, max_workers)
+        return result
+
+    def _consumer_ids(
+        self,
+        mapping: Dict[str, Iterable[str]],
+        current: Dict[str, List[Dict[str, Any]]],
+        size: Optional[int],
+    ) -> Dict[str, str]:
+        """Resolve the keys of an ACL mapping to consumer IDs."""
+        ids = {key: key for key in mapping if key in current}
+        if len(ids) < len(mapping):
+            for item in self.client.iter_all(self.ENTITY_PATH, size):
+                for field in ("id", "username", "custom_id"):
+                    if item.get(field) in mapping:
+                        ids.setdefault(item[field], item["id"])
+        return ids
+
+    def _apply_acl_changes(
+        self,
+        additions: List[Tuple[str, str]],
+        removals: List[Tuple[str, str, str]],
+        result: ConsumerACLSyncResult,
+        max_workers: int,
+    ) -> None:
+        """Add and remove ACL groups in parallel and record the outcome."""
+
+        def add(item: Tuple[str, str]) -> ConsumerACL:
+            return self.update_acl_group(*item)
+
+        def remove(item: Tuple[str, str, str]) -> None:
+            consumer_id, _, acl_id = item
+            try:
+                self.delete_acl(consumer_id, acl_id)
+            except requests.HTTPError as error:
+                if not is_not_found(error):
+                    raise
+
+        for task in run_concurrently(add, additions, max_workers):
+            if task.ok:
+                result.added.append(task.item)
+            else:
+                result.failed.append(task.item + (task.error,))
+        for task in run_concurrently(remove, removals, max_workers):
+            consumer_id, group, _ = task.item
+            if task.ok:
+                result.removed.append((consumer_id, group))
+            else:
+                result.failed.append((consumer_id, group, task.error))
@@ -1,6 +1,7 @@
 from kong_gateway_client.client import KongClient
 from kong_gateway_client.common import ResponseObject
 from kong_gateway_client.utils.helpers import validate_id_or_name, validate_id
+from kong_gateway_client.utils.ids import deterministic_id
 from typing import Optional, List, Dict, Any
 
 
@@ -330,6 +331,62 @@ class PluginResource:
         response_data = self.client.request("PUT", endpoint, json=kwargs)
         return KongPlugin(response_data)
 
+    def id_for(
+        self,
+        name: str,
+        service_id: Optional[str] = None,
+        route_id: Optional[str] = None,
+        consumer_id: Optional[str] = None,
+    ) -> str:
+        """Return the deterministic ID used by `upsert` for a plugin.
+
+        A plugin is identified by its name together with the entities it is
+        scoped to, mirroring Kong's own uniqueness rule for plugins.
+
+        Args:
+            name (str): Name of the plugin.
+            service_id (Optional[str]): ID of the service the plugin applies to.
+            route_id (Optional[str]): ID of the route the plugin applies to.
+            consumer_id (Optional[str]): ID of the consumer the plugin applies to.
+
+        Returns:
+            str: The ID the plugin has (or will have) in the target workspace.
+        """
+        if not name:
+            raise ValueError("The plugin name must be provided.")
+        scope = [service_id or "", route_id or "", consumer_id or ""]
+        natural_key = "|".join([name, *scope])
+        return deterministic_id("plugins", natural_key, self.client.target_workspace)
+
+    def upsert(
+        self,
+        name: str,
+        service_id: Optional[str] = None,
+        route_id: Optional[str] = None,
+        consumer_id: Optional[str] = None,
+        **kwargs,
+    ) -> KongPlugin:
+        """Create or replace a plugin with a single PUT, without looking it up first.
+
+        Args:
+            name (str): Name of the plugin.
+            service_id (Optional[str]): ID of the service the plugin applies to.
+            route_id (Optional[str]): ID of the route the plugin applies to.
+            consumer_id (Optional[str]): ID of the consumer the plugin applies to.
+            **kwargs: Additional keyword arguments to configure the plugin.
+
+        Returns:
+            KongPlugin: An object representing the created or updated plugin.
+        """
+        plugin_id = self.id_for(name, service_id, route_id, consumer_id)
+        scope = {"service": service_id, "route": route_id, "consumer": consumer_id}
+        data = {
+            "name": name,
+            **{k: {"id": v} for k, v in scope.items() if v is not None},
+            **kwargs,
+        }
+        return self.create_or_update(plugin_id, **data)
+
     @validate_id_or_name
     def create_or_update_for_route(
         self, route_id_or_name: str, plugin_id: str, **kwargs
@@ -2,6 +2,7 @@ from typing import List, Optional, Dict
 from kong_gateway_client.client import KongClient
 from kong_gateway_client.common import ResponseObject
 from kong_gateway_client.utils.helpers import validate_id_or_name, validate_name
+from kong_gateway_client.utils.ids import deterministic_id
 
 
 class KongRoute:
@@ -184,6 +185,37 @@ class Route:
         response_data = self.client.request("PUT", endpoint, json=kwargs)
         return KongRoute(response_data)
 
+    @validate_name
+    def id_for(self, name: str) -> str:
+        """
+        Return the deterministic ID used by `upsert` for a route name.
+
+        Args:
+        - name (str): The name of the route.
+
+        Returns:
+        - str: The ID the route has (or will have) in the target workspace.
+        """
+        return deterministic_id("routes", name, self.client.target_workspace)
+
+    @validate_name
+    def upsert(self, name: str, **kwargs) -> KongRoute:
+        """
+        Create or replace a route with a single PUT, without looking it up first.
+
+        The route ID is derived from the workspace and the route name. Combine
+        with `Service.id_for` to reference a service that is being upserted in
+        parallel, e.g. `service={"id": client.service.id_for("orders")}`.
+
+        Args:
+        - name (str): The name of the route.
+        - **kwargs: Parameters for the route.
+
+        Returns:
+        - KongRoute: The Kong route object.
+        """
+        return self.put(self.id_for(name), name=name, **kwargs)
+
     @validate_id_or_name
     def delete(self, id_or_name: str):
         """
@@ -2,6 +2,7 @@ from typing import List, Optional
 from kong_gateway_client.client import KongClient
 from kong_gateway_client.common import ResponseObject
 from kong_gateway_client.utils.helpers import validate_id_or_name, validate_name
+from kong_gateway_client.utils.ids import deterministic_id
 
 
 class KongService:
@@ -145,6 +146,37 @@ class Service:
         response_data = self.client.request("PUT", endpoint, json=kwargs)
         return KongService(response_data)
 
+    @validate_name
+    def id_for(self, name: str) -> str:
+        """
+        Return the deterministic ID used by `upsert` for a service name.
+
+        Args:
+        - name (str): The name of the service.
+
+        Returns:
+        - str: The ID the service has (or will have) in the target workspace.
+        """
+        return deterministic_id("services", name, self.client.target_workspace)
+
+    @validate_name
+    def upsert(self, name: str, **kwargs) -> KongService:
+        """
+        Create or replace a service with a single PUT, without looking it up first.
+
+        The service ID is derived from the workspace and the service name, so
+        repeated or concurrent calls for the same name always target the same
+        entity.
+
+        Args:
+        - name (str): The name of the service.
+        - **kwargs: Parameters for the service.
+
+        Returns:
+        - KongService: The Kong service object.
+        """
+        return self.put(self.id_for(name), name=name, **kwargs)
+
     @validate_id_or_name
     def delete(self, id_or_name: str):
         """
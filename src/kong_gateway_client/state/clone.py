@@ -0,0 +1,197 @@
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.state.hashing import SERVER_MANAGED_FIELDS
+from kong_gateway_client.state.snapshot import (
+    DEPENDENCY_TIERS,
+    ENTITY_PATHS,
+    ENTITY_TYPES,
+    REFERENCES,
+    reference_value,
+)
+from kong_gateway_client.utils.ids import deterministic_id
+
+_DONE = object()
+
+
+class CopyResult:
+    """The outcome of a workspace copy."""
+
+    def __init__(self) -> None:
+        """Initializes an empty CopyResult."""
+        self.copied: Dict[str, int] = {}
+        self.failed: List[Tuple[str, str, BaseException]] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return f"<CopyResult(copied={self.copied}, failed={len(self.failed)})>"
+
+
+class _IdMapper:
+    """Translate source IDs into target IDs without keeping a mapping table."""
+
+    def __init__(self, workspace: str, remap: bool) -> None:
+        """Initializes the _IdMapper object.
+
+        Args:
+            workspace (str): The target workspace, used to derive new IDs.
+            remap (bool): Whether IDs are remapped at all.
+        """
+        self.workspace = workspace
+        self.remap = remap
+
+    def __call__(self, entity_type: str, source_id: str) -> str:
+        if not self.remap:
+            return source_id
+        return deterministic_id(entity_type, source_id, self.workspace)
+
+    def payload(self, entity_type: str, entity: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the PUT body for a copy, with server fields removed."""
+        payload = {
+            k: v
+            for k, v in entity.items()
+            if k != "id" and k not in SERVER_MANAGED_FIELDS
+        }
+        for field, ref_type in REFERENCES.get(entity_type, {}).items():
+            ref_id = reference_value(payload.get(field))
+            if ref_id:
+                payload[field] = {"id": self(ref_type, ref_id)}
+        return payload
+
+
+def _write(
+    target: KongClient,
+    work: "queue.Queue[Any]",
+    map_id: _IdMapper,
+    result: CopyResult,
+    lock: threading.Lock,
+) -> None:
+    """Write queued entities to the target until the queue is closed."""
+    while True:
+        item = work.get()
+        if item is _DONE:
+            return
+        entity_type, entity = item
+        target_id = map_id(entity_type, entity["id"])
+        payload = map_id.payload(entity_type, entity)
+        try:
+            target.request(
+                "PUT", f"{ENTITY_PATHS[entity_type]}/{target_id}", json=payload
+            )
+        except Exception as error:
+            with lock:
+                result.failed.append((entity_type, entity["id"], error))
+            continue
+        with lock:
+            result.copied[entity_type] = result.copied.get(entity_type, 0) + 1
+
+
+def _copy_tier(
+    source: KongClient,
+    target: KongClient,
+    types: List[str],
+    map_id: _IdMapper,
+    result: CopyResult,
+    queue_size: int,
+    page_size: int,
+    max_workers: int,
+) -> None:
+    """Stream the entities of one dependency tier through a bounded queue."""
+    work: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    lock = threading.Lock()
+    writers = [
+        threading.Thread(
+            target=_write, args=(target, work, map_id, result, lock), daemon=True
+        )
+        for _ in range(max_workers)
+    ]
+    for writer in writers:
+        writer.start()
+    try:
+        for entity_type in types:
+            for entity in source.iter_all(ENTITY_PATHS[entity_type], page_size):
+                work.put((entity_type, entity))
+    finally:
+        for _ in writers:
+            work.put(_DONE)
+        for writer in writers:
+            writer.join()
+
+
+def copy_workspace(
+    source_client: KongClient,
+    target_client: KongClient,
+    source_workspace: Optional[str] = None,
+    target_workspace: Optional[str] = None,
+    entity_types: Sequence[str] = ENTITY_TYPES,
+    remap_ids: Optional[bool] = None,
+    create_workspace: bool = False,
+    queue_size: int = 1000,
+    page_size: int = 1000,
+    max_workers: int = 8,
+) -> CopyResult:
+    """
+    Copy the entities of one workspace into another, on the same or another
+    cluster.
+
+    Entities are streamed page by page from the source into a bounded queue
+    and written to the target with parallel PUTs, one dependency tier at a
+    time, so memory use is bounded by the queue and page sizes rather than the
+    size of the workspace. Credentials and consumer group membership are not
+    copied.
+
+    Args:
+        source_client (KongClient): The client to read from.
+        target_client (KongClient): The client to write to.
+        source_workspace (Optional[str], optional): The workspace to read.
+                                                    Defaults to the source
+                                                    client's target workspace.
+        target_workspace (Optional[str], optional): The workspace to write.
+                                                    Defaults to the target
+                                                    client's target workspace.
+        entity_types (Sequence[str], optional): The entity types to copy.
+        remap_ids (Optional[bool], optional): Give copies new IDs (derived
+                                              deterministically from the source
+                                              ID and target workspace) and
+                                              rewrite foreign keys to match.
+                                              Defaults to True when both
+                                              clients point at the same cluster,
+                                              where IDs must be unique.
+        create_workspace (bool, optional): Create the target workspace first.
+        queue_size (int, optional): The maximum number of entities in flight.
+        page_size (int, optional): The page size used to read the source.
+        max_workers (int, optional): The number of concurrent writes.
+
+    Returns:
+        CopyResult: Counts of copied entities and any failures.
+    """
+    source, target = source_client, target_client
+    if source_workspace:
+        source = source_client.for_workspace(source_workspace)
+    if target_workspace:
+        target = target_client.for_workspace(target_workspace)
+    if remap_ids is None:
+        remap_ids = source.admin_url == target.admin_url
+    if create_workspace:
+        target.workspace.put(target.target_workspace, target.target_workspace)
+
+    map_id = _IdMapper(target.target_workspace, remap_ids)
+    result = CopyResult()
+    for tier in DEPENDENCY_TIERS:
+        types = [entity_type for entity_type in tier if entity_type in entity_types]
+        if types:
+            _copy_tier(
+                source,
+                target,
+                types,
+                map_id,
+                result,
+                queue_size,
+                page_size,
+                max_workers,
+            )
+    return result
@@ -0,0 +1,350 @@
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+from kong_gateway_client.state.snapshot import (
+    ENTITY_TYPES,
+    REFERENCES,
+    WorkspaceSnapshot,
+    expand_service_url,
+    natural_key,
+    reference_value,
+)
+
+# Fields Kong sets on its own and that never represent configuration drift.
+SERVER_MANAGED_FIELDS: FrozenSet[str] = frozenset({"created_at", "updated_at", "ws_id"})
+
+BUCKET_COUNT = 256
+
+
+def _as_dict(entity: Any) -> Dict[str, Any]:
+    """Accept raw entity data as well as model objects such as KongService."""
+    return entity if isinstance(entity, dict) else vars(entity)
+
+
+def normalize_entity(
+    entity: Any,
+    exclude: FrozenSet[str] = SERVER_MANAGED_FIELDS,
+) -> Dict[str, Any]:
+    """
+    Strip server-managed fields and unset values from an entity.
+
+    Keys with a None value are dropped at every level so that an entity
+    returned by Kong, which lists every field, hashes the same as one that
+    omits the unset fields.
+
+    Args:
+        entity (Any): Raw entity data or a model object such as KongRoute.
+        exclude (FrozenSet[str], optional): Top-level fields to drop.
+
+    Returns:
+        Dict[str, Any]: The normalized entity.
+    """
+
+    def clean(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: clean(v) for k, v in value.items() if v is not None}
+        if isinstance(value, list):
+            return [clean(v) for v in value]
+        return value
+
+    return {
+        k: clean(v)
+        for k, v in _as_dict(entity).items()
+        if k not in exclude and v is not None
+    }
+
+
+def entity_hash(entity: Any, exclude: FrozenSet[str] = SERVER_MANAGED_FIELDS) -> str:
+    """
+    Hash an entity's normalized content with its keys in canonical order.
+
+    Args:
+        entity (Any): Raw entity data or a model object.
+        exclude (FrozenSet[str], optional): Top-level fields to ignore.
+
+    Returns:
+        str: The hex SHA-256 digest of the entity.
+    """
+    canonical = json.dumps(
+        normalize_entity(entity, exclude),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _hash_lines(lines: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for line in lines:
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def _portable_bodies(
+    entities: Dict[str, List[Dict[str, Any]]],
+    keys_by_id: Dict[str, Dict[str, str]],
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Index entities by natural key, with IDs replaced by natural keys."""
+    bodies: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for entity_type, items in entities.items():
+        bodies[entity_type] = {}
+        for entity in items:
+            body = {k: v for k, v in entity.items() if k != "id"}
+            if entity_type == "services":
+                body = expand_service_url(body)
+            for field, ref_type in REFERENCES.get(entity_type, {}).items():
+                value = reference_value(body.get(field))
+                body[field] = keys_by_id[ref_type].get(value, value)
+            key = natural_key(entity_type, entity, keys_by_id)
+            bodies[entity_type][key] = normalize_entity(body)
+    return bodies
+
+
+def _document_bodies(
+    document: Dict[str, Iterable[Any]]
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    entities = {
+        entity_type: [_as_dict(entity) for entity in document.get(entity_type, [])]
+        for entity_type in ENTITY_TYPES
+    }
+    keys_by_id: Dict[str, Dict[str, str]] = {}
+    for entity_type in ENTITY_TYPES:
+        keys_by_id[entity_type] = {
+            entity["id"]: natural_key(entity_type, entity, keys_by_id)
+            for entity in entities[entity_type]
+            if entity.get("id")
+        }
+    return _portable_bodies(entities, keys_by_id)
+
+
+def _project(current: Any, desired: Any) -> Any:
+    """Keep the parts of `current` that `desired` declares, recursively."""
+    if isinstance(current, dict) and isinstance(desired, dict):
+        return {k: _project(current.get(k), v) for k, v in desired.items()}
+    return current
+
+
+class DigestDiff:
+    """The entities that differ between two digests of one entity type."""
+
+    def __init__(
+        self,
+        added: Optional[List[str]] = None,
+        removed: Optional[List[str]] = None,
+        changed: Optional[List[str]] = None,
+    ) -> None:
+        """Initializes the DigestDiff object.
+
+        Args:
+            added (Optional[List[str]]): Keys only present in the other digest.
+            removed (Optional[List[str]]): Keys only present in this digest.
+            changed (Optional[List[str]]): Keys present in both with new content.
+        """
+        self.added = added or []
+        self.removed = removed or []
+        self.changed = changed or []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (
+            f"<DigestDiff(added={self.added}, removed={self.removed}, "
+            f"changed={self.changed})>"
+        )
+
+
+class TypeDigest:
+    """A two-level Merkle summary of every entity of one type."""
+
+    def __init__(self, leaves: Dict[str, str]) -> None:
+        """Initializes the TypeDigest object.
+
+        Leaves are spread over a fixed number of buckets by key, each bucket is
+        hashed, and the bucket hashes are hashed into the root.
+
+        Args:
+            leaves (Dict[str, str]): Entity hashes indexed by entity key.
+        """
+        self.leaves = leaves
+        self.buckets: List[Dict[str, str]] = [{} for _ in range(BUCKET_COUNT)]
+        for key, value in leaves.items():
+            self.buckets[self.bucket_of(key)][key] = value
+        self.bucket_hashes: List[str] = [
+            _hash_lines(f"{k}:{bucket[k]}" for k in sorted(bucket))
+            for bucket in self.buckets
+        ]
+        self.root: str = _hash_lines(self.bucket_hashes)
+
+    @staticmethod
+    def bucket_of(key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % BUCKET_COUNT
+
+    def diff(self, other: "TypeDigest") -> DigestDiff:
+        """
+        Compare with another digest, only descending into buckets that differ.
+
+        Args:
+            other (TypeDigest): The digest to compare against.
+
+        Returns:
+            DigestDiff: The keys added, removed or changed in `other`.
+        """
+        result = DigestDiff()
+        if self.root == other.root:
+            return result
+        for index, bucket_hash in enumerate(self.bucket_hashes):
+            if bucket_hash == other.bucket_hashes[index]:
+                continue
+            mine, theirs = self.buckets[index], other.buckets[index]
+            result.added.extend(k for k in theirs if k not in mine)
+            result.removed.extend(k for k in mine if k not in theirs)
+            result.changed.extend(
+                k for k in mine if k in theirs and mine[k] != theirs[k]
+            )
+        return result
+
+    def __len__(self) -> int:
+        return len(self.leaves)
+
+    def __repr__(self) -> str:
+        return f"<TypeDigest(entities={len(self.leaves)}, root={self.root[:12]})>"
+
+
+class WorkspaceDigest:
+    """
+    A Merkle summary of a workspace, rolled up per entity type.
+
+    Two digests with the same `root` describe identical workspaces. When they
+    differ, `diff` only inspects the entity types and buckets that changed.
+    """
+
+    def __init__(self, types: Dict[str, TypeDigest]) -> None:
+        """Initializes the WorkspaceDigest object.
+
+        Args:
+            types (Dict[str, TypeDigest]): Digests indexed by entity type.
+        """
+        self.types = types
+        self.root: str = _hash_lines(
+            f"{entity_type}:{types[entity_type].root}" for entity_type in sorted(types)
+        )
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: WorkspaceSnapshot,
+        portable: bool = True,
+        declared: Optional[Dict[str, Iterable[Any]]] = None,
+    ) -> "WorkspaceDigest":
+        """
+        Build a digest from a WorkspaceSnapshot.
+
+        Kong returns every field of an entity, including the defaults it fills
+        in, such as a service's `retries` or a plugin's full config. To compare
+        a workspace with a desired-state document, pass the document as
+        `declared`: the entities it declares are then hashed over the declared
+        fields only, as `StateSync` compares them, and the digest matches
+        `from_document(declared)` when the workspace is in sync.
+
+        Args:
+            snapshot (WorkspaceSnapshot): The snapshot to summarize.
+            portable (bool, optional): Key entities by natural key and replace
+                                       IDs and foreign key IDs with natural keys,
+                                       so workspaces on different clusters can
+                                       be compared. When False, entities are
+                                       keyed and hashed with their IDs.
+                                       Defaults to True.
+            declared (Optional[Dict[str, Iterable[Any]]], optional): A desired-
+                state document whose fields to hash. Requires `portable`.
+
+        Returns:
+            WorkspaceDigest: The digest.
+        """
+        if not portable:
+            if declared is not None:
+                raise ValueError("Declared fields require a portable digest.")
+            return cls(
+                {
+                    entity_type: TypeDigest(
+                        {entity["id"]: entity_hash(entity) for entity in entities}
+                    )
+                    for entity_type, entities in snapshot.entities.items()
+                }
+            )
+        bodies = _portable_bodies(snapshot.entities, snapshot.keys_by_id)
+        if declared is not None:
+            for entity_type, desired in _document_bodies(declared).items():
+                current = bodies.get(entity_type, {})
+                for key, body in desired.items():
+                    if key in current:
+                        current[key] = _project(current[key], body)
+        return cls._from_bodies(bodies)
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Iterable[Any]]) -> "WorkspaceDigest":
+        """
+        Build a portable digest from a desired-state document or model lists.
+
+        The entries may be raw dictionaries in the `StateSync` document format
+        or model objects such as KongService, KongRoute and KongPlugin. As a
+        document leaves out the defaults Kong fills in, compare it with
+        `from_snapshot(snapshot, declared=document)`.
+
+        Args:
+            document (Dict[str, Iterable[Any]]): Entities indexed by entity type.
+
+        Returns:
+            WorkspaceDigest: The digest.
+        """
+        return cls._from_bodies(_document_bodies(document))
+
+    @classmethod
+    def _from_bodies(
+        cls, bodies: Dict[str, Dict[str, Dict[str, Any]]]
+    ) -> "WorkspaceDigest":
+        return cls(
+            {
+                entity_type: TypeDigest(
+                    {key: entity_hash(body) for key, body in items.items()}
+                )
+                for entity_type, items in bodies.items()
+            }
+        )
+
+    def diff(self, other: "WorkspaceDigest") -> Dict[str, DigestDiff]:
+        """
+        Compare with another digest.
+
+        Args:
+            other (WorkspaceDigest): The digest to compare against.
+
+        Returns:
+            Dict[str, DigestDiff]: The differences of every entity type that
+                                   changed. Empty when the workspaces match.
+        """
+        if self.root == other.root:
+            return {}
+        empty = TypeDigest({})
+        result = {}
+        for entity_type in sorted(set(self.types) | set(other.types)):
+            changes = self.types.get(entity_type, empty).diff(
+                other.types.get(entity_type, empty)
+            )
+            if changes:
+                result[entity_type] = changes
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, WorkspaceDigest):
+            return NotImplemented
+        return self.root == other.root
+
+    def __hash__(self) -> int:
+        return hash(self.root)
+
+    def __repr__(self) -> str:
+        return f"<WorkspaceDigest(root={self.root[:12]}, types={self.types})>"
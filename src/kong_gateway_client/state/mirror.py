@@ -0,0 +1,313 @@
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.state.hashing import (
+    SERVER_MANAGED_FIELDS,
+    DigestDiff,
+    TypeDigest,
+    entity_hash,
+)
+from kong_gateway_client.state.snapshot import (
+    DEPENDENCY_TIERS,
+    ENTITY_PATHS,
+    ENTITY_TYPES,
+)
+from kong_gateway_client.utils.concurrency import run_concurrently
+from kong_gateway_client.utils.helpers import is_not_found
+
+
+def _newest(entities: Iterable[Dict[str, Any]]) -> Optional[int]:
+    """Return the newest `updated_at` of some entities, if any has one."""
+    stamps = [e["updated_at"] for e in entities if e.get("updated_at") is not None]
+    return max(stamps) if stamps else None
+
+
+class MirrorMetrics:
+    """Counters and timings reported by a WorkspaceMirror."""
+
+    def __init__(self) -> None:
+        """Initializes an empty MirrorMetrics."""
+        self.cycles: int = 0
+        self.upserts_total: int = 0
+        self.deletes_total: int = 0
+        self.errors_total: int = 0
+        self.last_cycle_seconds: float = 0.0
+        self.last_changed_types: List[str] = []
+        self.last_error: Optional[BaseException] = None
+        # When the primary state that the secondary last fully matched was read.
+        # Only cycles that refetch every entity type establish this, as neither
+        # counts nor `updated_at` probes are guaranteed to catch every change.
+        self.last_consistent_at: Optional[float] = None
+
+    @property
+    def replication_lag_seconds(self) -> Optional[float]:
+        """Seconds since the primary state the secondary is known to match."""
+        if self.last_consistent_at is None:
+            return None
+        return time.time() - self.last_consistent_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a dictionary, e.g. for exporting."""
+        return {
+            "cycles": self.cycles,
+            "upserts_total": self.upserts_total,
+            "deletes_total": self.deletes_total,
+            "errors_total": self.errors_total,
+            "last_cycle_seconds": self.last_cycle_seconds,
+            "last_changed_types": list(self.last_changed_types),
+            "replication_lag_seconds": self.replication_lag_seconds,
+        }
+
+    def __repr__(self) -> str:
+        return f"<MirrorMetrics({self.as_dict()})>"
+
+
+class WorkspaceMirror:
+    """
+    Keep a secondary cluster's workspace in step with a primary's.
+
+    Each cycle reads the primary workspace's entity counts, which costs a single
+    request, and probes each entity type whose count did not change for its most
+    recently updated entity, which costs one single-entity request per type.
+    Only entity types whose counts changed, or that have an entity updated
+    since they were last fetched, are refetched, so in-place updates are
+    mirrored within a cycle or two. Every type is also refetched on every
+    `full_check_every`-th cycle, in case the gateway does not sort by
+    `updated_at`. The refetched entities are hashed and compared with the last
+    state applied to the secondary, and only the added, changed or removed
+    entities are written. The secondary is only known to be consistent after a
+    cycle that refetched every type, which is what `replication_lag_seconds`
+    measures from.
+    Entity IDs are preserved, so the secondary must not be written to by
+    anything else.
+    """
+
+    def __init__(
+        self,
+        primary: KongClient,
+        secondary: KongClient,
+        interval: float = 5.0,
+        full_check_every: int = 12,
+        entity_types: Sequence[str] = ENTITY_TYPES,
+        max_workers: int = 8,
+        page_size: int = 1000,
+        on_cycle: Optional[Callable[[MirrorMetrics], None]] = None,
+    ) -> None:
+        """Initializes the WorkspaceMirror object.
+
+        Args:
+            primary (KongClient): The client for the workspace to follow.
+            secondary (KongClient): The client for the standby workspace.
+            interval (float, optional): Seconds between cycles. Defaults to 5.
+            full_check_every (int, optional): Refetch every entity type on every
+                                              Nth cycle. Defaults to 12.
+            entity_types (Sequence[str], optional): The entity types to mirror.
+            max_workers (int, optional): The number of concurrent writes.
+            page_size (int, optional): The page size used to read entities.
+            on_cycle (Optional[Callable[[MirrorMetrics], None]], optional):
+                Called with the metrics after every cycle.
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.interval = interval
+        self.full_check_every = full_check_every
+        self.entity_types = [t for t in ENTITY_TYPES if t in entity_types]
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.on_cycle = on_cycle
+        self.metrics = MirrorMetrics()
+        self._counts: Dict[str, int] = {}
+        # Per type, the newest `updated_at` seen and the second it was fetched.
+        self._updated: Dict[str, Tuple[Optional[int], int]] = {}
+        self._digests: Dict[str, TypeDigest] = {}
+        self._stale: Set[str] = set(self.entity_types)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _changed_types(self) -> List[str]:
+        counts = self.primary.workspace.get_metadata(
+            self.primary.target_workspace
+        ).counts
+        full_check = self.metrics.cycles % self.full_check_every == 0
+        changed = [
+            entity_type
+            for entity_type in self.entity_types
+            if full_check
+            or entity_type in self._stale
+            or entity_type not in self._updated
+            or counts.get(entity_type) != self._counts.get(entity_type)
+        ]
+        self._counts = counts
+        unchanged = [t for t in self.entity_types if t not in changed]
+        for task in run_concurrently(self._probe, unchanged, self.max_workers):
+            if not task.ok or self._updated_since(task.item, task.result):
+                changed.append(task.item)
+        return [t for t in self.entity_types if t in changed]
+
+    def _probe(self, entity_type: str) -> Optional[int]:
+        """Return the newest `updated_at` of an entity type on the primary."""
+        endpoint = (
+            f"{ENTITY_PATHS[entity_type]}?size=1&sort_by=updated_at&sort_desc=true"
+        )
+        response = self.primary.request("GET", endpoint)
+        return _newest(getattr(response, "data", None) or [])
+
+    def _updated_since(self, entity_type: str, newest: Optional[int]) -> bool:
+        """
+        Whether an entity was updated since the type was last fetched.
+
+        `updated_at` has a resolution of one second, so an entity updated in
+        the second of the last fetch may have been missed by it and is also
+        treated as updated.
+        """
+        if newest is None:
+            return False
+        seen, fetched_at = self._updated[entity_type]
+        return seen is None or newest > seen or newest >= fetched_at
+
+    def _fetch(
+        self, client: KongClient, entity_type: str
+    ) -> Dict[str, Dict[str, Any]]:
+        return {
+            entity["id"]: entity
+            for entity in client.iter_all(ENTITY_PATHS[entity_type], self.page_size)
+        }
+
+    def sync_once(self) -> Dict[str, DigestDiff]:
+        """
+        Run a single mirroring cycle.
+
+        Returns:
+            Dict[str, DigestDiff]: The changes applied, indexed by entity type.
+        """
+        started = time.time()
+        changes: Dict[str, DigestDiff] = {}
+        entities: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        digests: Dict[str, TypeDigest] = {}
+
+        refetched = self._changed_types()
+        for entity_type in refetched:
+            if entity_type not in self._digests:
+                secondary = self._fetch(self.secondary, entity_type)
+                self._digests[entity_type] = TypeDigest(
+                    {k: entity_hash(v) for k, v in secondary.items()}
+                )
+            fetched_at = int(time.time())
+            entities[entity_type] = self._fetch(self.primary, entity_type)
+            newest = _newest(entities[entity_type].values())
+            self._updated[entity_type] = (newest, fetched_at)
+            digests[entity_type] = TypeDigest(
+                {k: entity_hash(v) for k, v in entities[entity_type].items()}
+            )
+            diff = self._digests[entity_type].diff(digests[entity_type])
+            if diff:
+                changes[entity_type] = diff
+
+        failed = self._apply(changes, entities)
+        for entity_type, digest in digests.items():
+            if entity_type in failed:
+                # Re-read the secondary next cycle rather than trust this digest.
+                self._digests.pop(entity_type, None)
+                self._stale.add(entity_type)
+            else:
+                self._digests[entity_type] = digest
+                self._stale.discard(entity_type)
+
+        self.metrics.cycles += 1
+        self.metrics.last_cycle_seconds = time.time() - started
+        self.metrics.last_changed_types = sorted(changes)
+        if not failed and len(refetched) == len(self.entity_types):
+            self.metrics.last_consistent_at = started
+        if self.on_cycle:
+            self.on_cycle(self.metrics)
+        return changes
+
+    def _apply(
+        self,
+        changes: Dict[str, DigestDiff],
+        entities: Dict[str, Dict[str, Dict[str, Any]]],
+    ) -> Set[str]:
+        """Write the changes to the secondary and return the types that failed."""
+        failed: Set[str] = set()
+
+        def upsert(item: Any) -> Any:
+            entity_type, entity_id = item
+            payload = {
+                k: v
+                for k, v in entities[entity_type][entity_id].items()
+                if k not in SERVER_MANAGED_FIELDS
+            }
+            endpoint = f"{ENTITY_PATHS[entity_type]}/{entity_id}"
+            return self.secondary.request("PUT", endpoint, json=payload)
+
+        def delete(item: Any) -> Any:
+            entity_type, entity_id = item
+            try:
+                endpoint = f"{ENTITY_PATHS[entity_type]}/{entity_id}"
+                return self.secondary.request("DELETE", endpoint)
+            except Exception as error:
+                if is_not_found(error):
+                    return None
+                raise
+
+        upserts = {t: diff.added + diff.changed for t, diff in changes.items()}
+        deletes = {t: diff.removed for t, diff in changes.items()}
+        stages = [
+            (upsert, [(t, k) for t in tier for k in upserts.get(t, [])])
+            for tier in DEPENDENCY_TIERS
+        ] + [
+            (delete, [(t, k) for t in tier for k in deletes.get(t, [])])
+            for tier in reversed(DEPENDENCY_TIERS)
+        ]
+        for func, items in stages:
+            for task in run_concurrently(func, items, self.max_workers):
+                if task.ok:
+                    if func is upsert:
+                        self.metrics.upserts_total += 1
+                    else:
+                        self.metrics.deletes_total += 1
+                else:
+                    failed.add(task.item[0])
+                    self.metrics.errors_total += 1
+                    self.metrics.last_error = task.error
+        return failed
+
+    def run(self) -> None:
+        """
+        Mirror continuously until `stop` is called.
+
+        Errors in a cycle are recorded on the metrics and the next cycle is
+        attempted after the usual interval.
+        """
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as error:
+                self.metrics.errors_total += 1
+                self.metrics.last_error = error
+            self._stop.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Run the mirror in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the mirror and wait for the current cycle to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
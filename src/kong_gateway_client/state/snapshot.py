@@ -0,0 +1,196 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlparse
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.resources.consumer_groups import ConsumerGroup
+from kong_gateway_client.resources.consumers import Consumer
+from kong_gateway_client.resources.plugins import PluginResource
+from kong_gateway_client.resources.routes import Route
+from kong_gateway_client.resources.services import Service
+from kong_gateway_client.utils.concurrency import run_concurrently
+
+ENTITY_PATHS: Dict[str, str] = {
+    "services": Service.ENTITY_PATH,
+    "routes": Route.ENTITY_PATH,
+    "consumers": Consumer.ENTITY_PATH,
+    "consumer_groups": ConsumerGroup.ENTITY_PATH,
+    "plugins": PluginResource.ENTITY_PATH,
+}
+
+ENTITY_TYPES: Sequence[str] = tuple(ENTITY_PATHS)
+
+# Entities in a tier only reference entities in earlier tiers, so creates run
+# tier by tier and deletes run in the reverse order.
+DEPENDENCY_TIERS: Sequence[Sequence[str]] = (
+    ("services", "consumers", "consumer_groups"),
+    ("routes",),
+    ("plugins",),
+)
+
+# Foreign key fields of each entity type, and the type each one points to.
+REFERENCES: Dict[str, Dict[str, str]] = {
+    "routes": {"service": "services"},
+    "plugins": {
+        "service": "services",
+        "route": "routes",
+        "consumer": "consumers",
+        "consumer_group": "consumer_groups",
+    },
+}
+
+DEFAULT_PORTS: Dict[str, int] = {"https": 443, "grpcs": 443, "tls": 443}
+
+
+def reference_value(ref: Any) -> Optional[str]:
+    """
+    Extract the raw identifier from a foreign key value.
+
+    Kong returns foreign keys as `{"id": ...}`, while desired-state documents
+    may also use `{"name": ...}`, `{"username": ...}` or a plain string.
+
+    Args:
+        ref (Any): The foreign key value.
+
+    Returns:
+        Optional[str]: The referenced ID or natural key, or None if unset.
+    """
+    if not ref:
+        return None
+    if isinstance(ref, str):
+        return ref
+    return ref.get("id") or ref.get("name") or ref.get("username")
+
+
+def natural_key(
+    entity_type: str,
+    entity: Dict[str, Any],
+    keys_by_id: Optional[Dict[str, Dict[str, str]]] = None,
+) -> str:
+    """
+    Return the value that identifies an entity independently of its ID.
+
+    Services, routes and consumer groups are keyed by name and consumers by
+    username (or custom_id). Plugins are keyed by name plus the natural keys of
+    the entities they are scoped to, with foreign key IDs translated through
+    `keys_by_id`.
+
+    Args:
+        entity_type (str): The entity type, e.g. "services".
+        entity (Dict[str, Any]): The entity data.
+        keys_by_id (Optional[Dict[str, Dict[str, str]]]): Natural keys indexed by
+                                                          entity type and ID.
+
+    Returns:
+        str: The natural key of the entity.
+    """
+    if entity_type == "consumers":
+        if entity.get("username"):
+            return entity["username"]
+        if entity.get("custom_id"):
+            return f"custom_id:{entity['custom_id']}"
+        return entity["id"]
+    if entity_type == "plugins":
+        keys_by_id = keys_by_id or {}
+        parts = [entity.get("name") or ""]
+        for field, ref_type in REFERENCES["plugins"].items():
+            value = reference_value(entity.get(field))
+            parts.append(keys_by_id.get(ref_type, {}).get(value, value) or "")
+        return "|".join(parts)
+    return entity.get("name") or entity["id"]
+
+
+def expand_service_url(entity: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Split a service `url` into the protocol, host, port and path Kong stores.
+
+    Args:
+        entity (Dict[str, Any]): The service data.
+
+    Returns:
+        Dict[str, Any]: The service data without `url`.
+    """
+    if "url" not in entity:
+        return entity
+    parsed = urlparse(entity["url"])
+    expanded = {k: v for k, v in entity.items() if k != "url"}
+    expanded.setdefault("protocol", parsed.scheme)
+    expanded.setdefault("host", parsed.hostname)
+    expanded.setdefault("port", parsed.port or DEFAULT_PORTS.get(parsed.scheme, 80))
+    expanded.setdefault("path", parsed.path or None)
+    return expanded
+
+
+class WorkspaceSnapshot:
+    """A point-in-time copy of the entities in a workspace."""
+
+    def __init__(self, entities: Dict[str, Iterable[Dict[str, Any]]]) -> None:
+        """Initializes the WorkspaceSnapshot object.
+
+        Args:
+            entities (Dict[str, Iterable[Dict[str, Any]]]): Raw entity data indexed
+                                                            by entity type.
+        """
+        self.entities: Dict[str, List[Dict[str, Any]]] = {
+            entity_type: list(entities.get(entity_type, []))
+            for entity_type in ENTITY_TYPES
+        }
+        self.by_id: Dict[str, Dict[str, Dict[str, Any]]] = {
+            entity_type: {entity["id"]: entity for entity in items}
+            for entity_type, items in self.entities.items()
+        }
+        self.keys_by_id: Dict[str, Dict[str, str]] = {}
+        for entity_type in ENTITY_TYPES:
+            self.keys_by_id[entity_type] = {
+                entity["id"]: natural_key(entity_type, entity, self.keys_by_id)
+                for entity in self.entities[entity_type]
+            }
+
+    @classmethod
+    def fetch(
+        cls,
+        client: KongClient,
+        entity_types: Sequence[str] = ENTITY_TYPES,
+        tags: Optional[List[str]] = None,
+        max_workers: int = 5,
+    ) -> "WorkspaceSnapshot":
+        """
+        Fetch a snapshot of the client's target workspace.
+
+        Each entity type is paginated independently and the types are fetched
+        concurrently.
+
+        Args:
+            client (KongClient): The client to fetch with.
+            entity_types (Sequence[str], optional): The entity types to fetch.
+                                                    Defaults to all known types.
+            tags (Optional[List[str]], optional): Only fetch entities that have
+                                                  all of these tags.
+            max_workers (int, optional): The number of concurrent fetches.
+
+        Returns:
+            WorkspaceSnapshot: The fetched snapshot.
+        """
+        query = f"?tags={','.join(tags)}" if tags else ""
+
+        def fetch_type(entity_type: str) -> List[Dict[str, Any]]:
+            return client.fetch_all(f"{ENTITY_PATHS[entity_type]}{query}")
+
+        results = run_concurrently(fetch_type, entity_types, max_workers)
+        for result in results:
+            if not result.ok:
+                raise result.error
+        return cls({result.item: result.result for result in results})
+
+    def get(self, entity_type: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        """Return an entity by type and ID, or None if it is not present."""
+        return self.by_id[entity_type].get(entity_id)
+
+    def key_of(self, entity_type: str, entity: Dict[str, Any]) -> str:
+        """Return the natural key of an entity in this snapshot."""
+        return natural_key(entity_type, entity, self.keys_by_id)
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.entities.values())
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{t}={len(e)}" for t, e in self.entities.items())
+        return f"<WorkspaceSnapshot({counts})>"
@@ -0,0 +1,375 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import requests
+from kong_gateway_client.client import KongClient
+from kong_gateway_client.state.snapshot import (
+    DEPENDENCY_TIERS,
+    ENTITY_PATHS,
+    REFERENCES,
+    WorkspaceSnapshot,
+    expand_service_url,
+    natural_key,
+    reference_value,
+)
+from kong_gateway_client.utils.concurrency import run_concurrently
+from kong_gateway_client.utils.helpers import is_not_found
+from kong_gateway_client.utils.ids import deterministic_id
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+
+class SyncOperation:
+    """A single write needed to move a workspace towards its desired state."""
+
+    def __init__(
+        self,
+        action: str,
+        entity_type: str,
+        key: str,
+        entity_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+        changes: Optional[List[str]] = None,
+    ) -> None:
+        """Initializes the SyncOperation object.
+
+        Args:
+            action (str): One of "create", "update" or "delete".
+            entity_type (str): The entity type, e.g. "services".
+            key (str): The natural key of the entity.
+            entity_id (str): The ID of the entity being written.
+            payload (Optional[Dict[str, Any]]): The body sent with the PUT for
+                                                creates and updates.
+            changes (Optional[List[str]]): The fields that differ, for updates.
+        """
+        self.action = action
+        self.entity_type = entity_type
+        self.key = key
+        self.entity_id = entity_id
+        self.payload = payload
+        self.changes = changes or []
+
+    def __repr__(self) -> str:
+        return (
+            f"<SyncOperation(action={self.action}, entity_type={self.entity_type}, "
+            f"key={self.key}, entity_id={self.entity_id})>"
+        )
+
+
+class SyncPlan:
+    """The minimal set of operations that reconcile a workspace."""
+
+    def __init__(self, operations: List[SyncOperation]) -> None:
+        """Initializes the SyncPlan object.
+
+        Args:
+            operations (List[SyncOperation]): The operations in the plan.
+        """
+        self.operations = operations
+
+    @property
+    def creates(self) -> List[SyncOperation]:
+        return [op for op in self.operations if op.action == CREATE]
+
+    @property
+    def updates(self) -> List[SyncOperation]:
+        return [op for op in self.operations if op.action == UPDATE]
+
+    @property
+    def deletes(self) -> List[SyncOperation]:
+        return [op for op in self.operations if op.action == DELETE]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.operations
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __iter__(self) -> Iterator[SyncOperation]:
+        return iter(self.operations)
+
+    def __repr__(self) -> str:
+        return (
+            f"<SyncPlan(creates={len(self.creates)}, updates={len(self.updates)}, "
+            f"deletes={len(self.deletes)})>"
+        )
+
+
+class SyncResult:
+    """The outcome of applying a SyncPlan."""
+
+    def __init__(self, plan: SyncPlan) -> None:
+        """Initializes the SyncResult object.
+
+        Args:
+            plan (SyncPlan): The plan that was applied.
+        """
+        self.plan = plan
+        self.succeeded: List[SyncOperation] = []
+        self.failed: List[Tuple[SyncOperation, BaseException]] = []
+        self.skipped: List[SyncOperation] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.skipped
+
+    def __repr__(self) -> str:
+        return (
+            f"<SyncResult(succeeded={len(self.succeeded)}, "
+            f"failed={len(self.failed)}, skipped={len(self.skipped)})>"
+        )
+
+
+def _matches(desired: Any, current: Any) -> bool:
+    """
+    Check whether a desired value is already satisfied by the current value.
+
+    Dictionaries are compared as subsets, so defaults that Kong fills in (for
+    example the rest of a plugin's config) do not count as differences.
+    """
+    if isinstance(desired, dict) and isinstance(current, dict):
+        return all(_matches(v, current.get(k)) for k, v in desired.items())
+    return desired == current
+
+
+class StateSync:
+    """
+    Reconcile a workspace with a declarative desired-state document.
+
+    The desired state is a dictionary of entity lists indexed by entity type,
+    for example::
+
+        {
+            "services": [{"name": "orders", "url": "http://orders:8080"}],
+            "routes": [{"name": "orders", "service": "orders", "paths": ["/o"]}],
+            "plugins": [{"name": "key-auth", "route": "orders"}],
+            "consumers": [{"username": "alice"}],
+        }
+
+    Foreign keys may be given as a natural key string, `{"name": ...}` or
+    `{"id": ...}`. Entities are matched to the current workspace by natural key
+    and only the creates, updates and deletes that are needed are emitted.
+    Consumer credentials and consumer group membership are not managed.
+    """
+
+    def __init__(
+        self,
+        client: KongClient,
+        max_workers: int = 8,
+        delete_missing: bool = True,
+        select_tags: Optional[List[str]] = None,
+    ) -> None:
+        """Initializes the StateSync object.
+
+        Args:
+            client (KongClient): The client for the workspace to reconcile.
+            max_workers (int, optional): The number of concurrent writes.
+            delete_missing (bool, optional): Whether entities absent from the
+                                             desired state are deleted.
+                                             Defaults to True.
+            select_tags (Optional[List[str]], optional): Only manage entities
+                                                         that have all of these
+                                                         tags.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.delete_missing = delete_missing
+        self.select_tags = select_tags
+
+    def fetch(self) -> WorkspaceSnapshot:
+        """Fetch the current state of the managed entities."""
+        return WorkspaceSnapshot.fetch(self.client, tags=self.select_tags)
+
+    def diff(
+        self,
+        desired: Dict[str, List[Dict[str, Any]]],
+        snapshot: Optional[WorkspaceSnapshot] = None,
+    ) -> SyncPlan:
+        """
+        Compute the operations needed to reach the desired state.
+
+        Args:
+            desired (Dict[str, List[Dict[str, Any]]]): The desired-state document.
+            snapshot (Optional[WorkspaceSnapshot], optional): The current state.
+                                                              Fetched if omitted.
+
+        Returns:
+            SyncPlan: The operations to apply.
+
+        Raises:
+            ValueError: If the desired state contains duplicate entities or
+                        references an entity that does not exist.
+        """
+        snapshot = snapshot or self.fetch()
+        keys_by_id = {t: dict(keys) for t, keys in snapshot.keys_by_id.items()}
+        ids_by_key = {
+            t: {key: entity_id for entity_id, key in keys.items()}
+            for t, keys in keys_by_id.items()
+        }
+
+        operations: List[SyncOperation] = []
+        for tier in DEPENDENCY_TIERS:
+            for entity_type in tier:
+                operations.extend(
+                    self._diff_type(
+                        entity_type,
+                        desired.get(entity_type, []),
+                        snapshot,
+                        keys_by_id,
+                        ids_by_key,
+                    )
+                )
+
+        return SyncPlan(operations)
+
+    def apply(self, plan: SyncPlan) -> SyncResult:
+        """
+        Execute a plan against the workspace.
+
+        Creates and updates run first, tier by tier in dependency order, then
+        deletes run in the reverse order. Operations within a tier run
+        concurrently. If any operation in a tier fails, later tiers are skipped.
+
+        Args:
+            plan (SyncPlan): The plan to apply.
+
+        Returns:
+            SyncResult: The outcome of each operation.
+        """
+        result = SyncResult(plan)
+        upserts = [op for op in plan if op.action != DELETE]
+        deletes = plan.deletes
+        stages = [
+            [op for op in upserts if op.entity_type in t] for t in DEPENDENCY_TIERS
+        ]
+        stages += [
+            [op for op in deletes if op.entity_type in t]
+            for t in reversed(DEPENDENCY_TIERS)
+        ]
+
+        for stage in stages:
+            if result.failed:
+                result.skipped.extend(stage)
+                continue
+            for task in run_concurrently(self._execute, stage, self.max_workers):
+                if task.ok:
+                    result.succeeded.append(task.item)
+                else:
+                    result.failed.append((task.item, task.error))
+        return result
+
+    def sync(self, desired: Dict[str, List[Dict[str, Any]]]) -> SyncResult:
+        """
+        Diff the workspace against the desired state and apply the result.
+
+        When nothing has changed this costs only the reads of the snapshot.
+
+        Args:
+            desired (Dict[str, List[Dict[str, Any]]]): The desired-state document.
+
+        Returns:
+            SyncResult: The outcome of each operation.
+        """
+        return self.apply(self.diff(desired))
+
+    def _diff_type(
+        self,
+        entity_type: str,
+        desired: List[Dict[str, Any]],
+        snapshot: WorkspaceSnapshot,
+        keys_by_id: Dict[str, Dict[str, str]],
+        ids_by_key: Dict[str, Dict[str, str]],
+    ) -> List[SyncOperation]:
+        """Diff the desired entities of one type against the snapshot."""
+        operations: List[SyncOperation] = []
+        seen = set()
+        for entity in desired:
+            if entity_type == "services":
+                entity = expand_service_url(entity)
+            key = natural_key(entity_type, entity, keys_by_id)
+            if key in seen:
+                raise ValueError(f"Duplicate {entity_type} entry: {key}")
+            seen.add(key)
+
+            payload = self._payload(entity_type, key, entity, keys_by_id, ids_by_key)
+            current_id = ids_by_key[entity_type].get(key)
+            if current_id is None:
+                entity_id = entity.get("id") or self._new_id(entity_type, key, payload)
+                ids_by_key[entity_type][key] = entity_id
+                keys_by_id[entity_type][entity_id] = key
+                operations.append(
+                    SyncOperation(CREATE, entity_type, key, entity_id, payload)
+                )
+                continue
+
+            current = snapshot.get(entity_type, current_id)
+            changes = [
+                field
+                for field, value in payload.items()
+                if not _matches(value, current.get(field))
+            ]
+            if changes:
+                operations.append(
+                    SyncOperation(
+                        UPDATE, entity_type, key, current_id, payload, changes
+                    )
+                )
+
+        if self.delete_missing:
+            for entity in snapshot.entities[entity_type]:
+                key = snapshot.key_of(entity_type, entity)
+                if key not in seen:
+                    operations.append(
+                        SyncOperation(DELETE, entity_type, key, entity["id"])
+                    )
+        return operations
+
+    def _payload(
+        self,
+        entity_type: str,
+        key: str,
+        entity: Dict[str, Any],
+        keys_by_id: Dict[str, Dict[str, str]],
+        ids_by_key: Dict[str, Dict[str, str]],
+    ) -> Dict[str, Any]:
+        """Build the PUT body for an entity with foreign keys resolved to IDs."""
+        payload = {k: v for k, v in entity.items() if k != "id"}
+        for field, ref_type in REFERENCES.get(entity_type, {}).items():
+            value = reference_value(entity.get(field))
+            if value is None:
+                continue
+            ref_key = keys_by_id[ref_type].get(value, value)
+            ref_id = ids_by_key[ref_type].get(ref_key)
+            if ref_id is None:
+                raise ValueError(
+                    f"{entity_type} {key} references unknown {ref_type} {value}"
+                )
+            payload[field] = {"id": ref_id}
+        return payload
+
+    def _new_id(self, entity_type: str, key: str, payload: Dict[str, Any]) -> str:
+        """Return the ID for a new entity, matching the resources' `id_for`."""
+        workspace = self.client.target_workspace
+        if entity_type == "plugins" and not payload.get("consumer_group"):
+            scope = [
+                reference_value(payload.get(field))
+                for field in ("service", "route", "consumer")
+            ]
+            return self.client.plugin_resource.id_for(payload["name"], *scope)
+        if entity_type == "consumers" and payload.get("username"):
+            return deterministic_id(entity_type, payload["username"], workspace)
+        return deterministic_id(entity_type, key, workspace)
+
+    def _execute(self, operation: SyncOperation) -> Any:
+        endpoint = f"{ENTITY_PATHS[operation.entity_type]}/{operation.entity_id}"
+        if operation.action != DELETE:
+            return self.client.request("PUT", endpoint, json=operation.payload)
+        try:
+            return self.client.request("DELETE", endpoint)
+        except requests.HTTPError as error:
+            # Entities may already be gone, e.g. plugins removed together with
+            # their route.
+            if is_not_found(error):
+                return None
+            raise
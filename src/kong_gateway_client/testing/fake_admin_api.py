@@ -0,0 +1,1125 @@
+import base64
+import copy
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+DEFAULT_WORKSPACE = "default"
+RATE_LIMIT_PLUGIN = "rate-limiting-advanced"
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# The fields every entity of a type has, with the values Kong gives them.
+DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "services": {
+        "name": None,
+        "protocol": "http",
+        "host": None,
+        "port": 80,
+        "path": None,
+        "retries": 5,
+        "connect_timeout": 60000,
+        "write_timeout": 60000,
+        "read_timeout": 60000,
+        "enabled": True,
+        "tags": None,
+    },
+    "routes": {
+        "name": None,
+        "protocols": ["http", "https"],
+        "methods": None,
+        "hosts": None,
+        "paths": None,
+        "headers": None,
+        "snis": None,
+        "strip_path": True,
+        "preserve_host": False,
+        "regex_priority": 0,
+        "path_handling": "v0",
+        "https_redirect_status_code": 426,
+        "service": None,
+        "tags": None,
+    },
+    "consumers": {"username": None, "custom_id": None, "tags": None},
+    "consumer_groups": {"name": None, "tags": None},
+    "plugins": {
+        "name": None,
+        "config": {},
+        "enabled": True,
+        "protocols": ["grpc", "grpcs", "http", "https"],
+        "service": None,
+        "route": None,
+        "consumer": None,
+        "consumer_group": None,
+        "tags": None,
+    },
+    "key-auths": {"key": None, "ttl": None, "consumer": None, "tags": None},
+    "acls": {"group": None, "consumer": None, "tags": None},
+}
+
+ENTITY_TYPES = tuple(DEFAULTS)
+
+# Foreign key fields of each entity type, and the type each one points to.
+FOREIGN_KEYS: Dict[str, Dict[str, str]] = {
+    "routes": {"service": "services"},
+    "plugins": {
+        "service": "services",
+        "route": "routes",
+        "consumer": "consumers",
+        "consumer_group": "consumer_groups",
+    },
+    "key-auths": {"consumer": "consumers"},
+    "acls": {"consumer": "consumers"},
+}
+
+# The fields besides the ID an entity can be addressed by in a URL.
+ENDPOINT_KEYS: Dict[str, Tuple[str, ...]] = {
+    "services": ("name",),
+    "routes": ("name",),
+    "consumers": ("username",),
+    "consumer_groups": ("name",),
+    "key-auths": ("key",),
+}
+
+# At least one of these fields must be set.
+REQUIRED: Dict[str, Tuple[str, ...]] = {
+    "services": ("host",),
+    "routes": ("methods", "hosts", "headers", "paths", "snis"),
+    "consumers": ("username", "custom_id"),
+    "consumer_groups": ("name",),
+    "plugins": ("name",),
+    "acls": ("group",),
+}
+
+# Collections nested under an entity, e.g. /services/{service}/routes, with the
+# entity type they hold and the field pointing back at the parent.
+NESTED: Dict[Tuple[str, str], Tuple[str, str]] = {
+    ("services", "routes"): ("routes", "service"),
+    ("services", "plugins"): ("plugins", "service"),
+    ("routes", "plugins"): ("plugins", "route"),
+    ("consumers", "plugins"): ("plugins", "consumer"),
+    ("consumers", "key-auth"): ("key-auths", "consumer"),
+    ("consumers", "acls"): ("acls", "consumer"),
+}
+
+UUID_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I
+)
+
+_sequence = itertools.count(1)
+
+
+class APIError(Exception):
+    """An error response of the fake Admin API."""
+
+    def __init__(
+        self, status: int, message: str, fields: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Initializes the APIError object.
+
+        Args:
+            status (int): The HTTP status code.
+            message (str): The error message.
+            fields (Optional[Dict[str, Any]], optional): Per-field errors.
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.fields = fields
+
+    @property
+    def body(self) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"message": self.message}
+        if self.fields:
+            body["fields"] = self.fields
+        return body
+
+
+class ErrorRule:
+    """Fail matching requests with an error status instead of handling them."""
+
+    def __init__(
+        self,
+        status: int = 500,
+        rate: float = 1.0,
+        times: Optional[int] = None,
+        method: Optional[str] = None,
+        path: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Initializes the ErrorRule object.
+
+        Args:
+            status (int, optional): The status to respond with. Defaults to 500.
+            rate (float, optional): The share of matching requests to fail,
+                                    between 0 and 1. Defaults to 1.
+            times (Optional[int], optional): Stop failing after this many errors.
+                                             Defaults to no limit.
+            method (Optional[str], optional): Only fail this HTTP method.
+            path (Optional[str], optional): Only fail request paths, including
+                                            any workspace, that this regular
+                                            expression is found in.
+            headers (Optional[Dict[str, str]], optional): Response headers, e.g.
+                                                          Retry-After for 429s.
+        """
+        if not 0 <= rate <= 1:
+            raise ValueError("rate should be between 0 and 1.")
+        self.status = status
+        self.rate = rate
+        self.times = times
+        self.method = method.upper() if method else None
+        self.path: Optional[Pattern] = re.compile(path) if path else None
+        self.headers = headers or {}
+        self.triggered = 0
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.times is not None and self.triggered >= self.times:
+            return False
+        if self.method and method != self.method:
+            return False
+        return self.path is None or self.path.search(path) is not None
+
+    def __repr__(self) -> str:
+        return (
+            f"<ErrorRule(status={self.status}, rate={self.rate}, "
+            f"triggered={self.triggered})>"
+        )
+
+
+class _Ordered:
+    """Keys in insertion order, paginated by a sequence number.
+
+    Removed keys are left behind in the order until more than half of it is
+    stale, so removal does not shift the list on every call.
+    """
+
+    def __init__(self) -> None:
+        self.seqs: Dict[str, int] = {}
+        self.order: List[int] = []
+        self.keys: List[str] = []
+
+    def add(self, key: str) -> None:
+        if key not in self.seqs:
+            seq = next(_sequence)
+            self.seqs[key] = seq
+            self.order.append(seq)
+            self.keys.append(key)
+
+    def discard(self, key: str) -> None:
+        if self.seqs.pop(key, None) is None:
+            return
+        if len(self.order) > 2 * len(self.seqs):
+            live = [
+                (seq, key)
+                for seq, key in zip(self.order, self.keys)
+                if self.seqs.get(key) == seq
+            ]
+            self.order = [seq for seq, _ in live]
+            self.keys = [key for _, key in live]
+
+    def page(
+        self,
+        after: int,
+        size: int,
+        predicate: Optional[Callable[[str], bool]] = None,
+    ) -> Tuple[List[str], Optional[int]]:
+        """Return up to `size` keys added after `after`, and the next offset."""
+        keys: List[str] = []
+        last = after
+        for index in range(bisect_right(self.order, after), len(self.order)):
+            key, seq = self.keys[index], self.order[index]
+            if self.seqs.get(key) != seq or (predicate and not predicate(key)):
+                continue
+            if len(keys) == size:
+                return keys, last
+            keys.append(key)
+            last = seq
+        return keys, None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.seqs
+
+    def __iter__(self):
+        return iter(list(self.seqs))
+
+    def __len__(self) -> int:
+        return len(self.seqs)
+
+
+class _Table:
+    """The entities of one type in one workspace."""
+
+    def __init__(self, entity_type: str) -> None:
+        self.entity_type = entity_type
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.ordered = _Ordered()
+        self.unique: Dict[Tuple[str, Any], str] = {}
+        # Children by foreign key, e.g. ("service", service_id) for routes.
+        self.refs: Dict[Tuple[str, str], _Ordered] = {}
+
+    def unique_keys(self, entity: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        if self.entity_type == "plugins":
+            scope = tuple(
+                (entity.get(field) or {}).get("id")
+                for field in FOREIGN_KEYS["plugins"]
+            )
+            return [("scope", (entity["name"],) + scope)]
+        if self.entity_type == "acls":
+            return [("group", (entity["consumer"]["id"], entity["group"]))]
+        fields = ENDPOINT_KEYS.get(self.entity_type, ())
+        if self.entity_type == "consumers":
+            fields += ("custom_id",)
+        return [(field, entity[field]) for field in fields if entity.get(field)]
+
+    def find(
+        self, key: str, scope: Optional[Tuple[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        entity = self.rows.get(key)
+        if entity is None:
+            for field in ENDPOINT_KEYS.get(self.entity_type, ()):
+                entity_id = self.unique.get((field, key))
+                if entity_id is not None:
+                    entity = self.rows[entity_id]
+                    break
+        if entity is None and self.entity_type == "acls" and scope:
+            entity_id = self.unique.get(("group", (scope[1], key)))
+            entity = self.rows.get(entity_id) if entity_id else None
+        if entity is not None and scope:
+            if (entity.get(scope[0]) or {}).get("id") != scope[1]:
+                return None
+        return entity
+
+    def check_unique(self, entity: Dict[str, Any]) -> None:
+        for unique_key in self.unique_keys(entity):
+            owner = self.unique.get(unique_key)
+            if owner is not None and owner != entity["id"]:
+                raise APIError(
+                    409,
+                    f"UNIQUE violation detected on '{unique_key[0]}'",
+                    {unique_key[0]: "already exists"},
+                )
+
+    def save(self, entity: Dict[str, Any]) -> None:
+        previous = self.rows.get(entity["id"])
+        if previous is not None:
+            self._unlink(previous)
+        self.rows[entity["id"]] = entity
+        self.ordered.add(entity["id"])
+        for unique_key in self.unique_keys(entity):
+            self.unique[unique_key] = entity["id"]
+        for field in FOREIGN_KEYS.get(self.entity_type, {}):
+            if entity.get(field):
+                ref = (field, entity[field]["id"])
+                self.refs.setdefault(ref, _Ordered()).add(entity["id"])
+
+    def remove(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        entity = self.rows.pop(entity_id, None)
+        if entity is not None:
+            self._unlink(entity)
+            self.ordered.discard(entity_id)
+        return entity
+
+    def _unlink(self, entity: Dict[str, Any]) -> None:
+        for unique_key in self.unique_keys(entity):
+            if self.unique.get(unique_key) == entity["id"]:
+                del self.unique[unique_key]
+        for field in FOREIGN_KEYS.get(self.entity_type, {}):
+            if entity.get(field):
+                ref = (field, entity[field]["id"])
+                if ref in self.refs:
+                    self.refs[ref].discard(entity["id"])
+
+    def children(self, field: str, parent_id: str) -> List[str]:
+        return list(self.refs.get((field, parent_id)) or [])
+
+
+class _Workspace:
+    """A workspace and everything stored in it."""
+
+    def __init__(self, entity: Dict[str, Any]) -> None:
+        self.entity = entity
+        self.tables: Dict[str, _Table] = {t: _Table(t) for t in ENTITY_TYPES}
+        self.members: Dict[str, _Ordered] = {}
+        self.groups_of: Dict[str, Dict[str, None]] = {}
+        self.overrides: Dict[str, Dict[str, Any]] = {}
+
+    def get(
+        self, entity_type: str, key: str, scope: Optional[Tuple[str, str]] = None
+    ) -> Dict[str, Any]:
+        entity = self.tables[entity_type].find(key, scope)
+        if entity is None:
+            raise APIError(404, "Not found")
+        return entity
+
+    def is_empty(self) -> bool:
+        return not any(table.rows for table in self.tables.values())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which Nagle's algorithm would
+    # otherwise delay by tens of milliseconds on keep-alive connections.
+    disable_nagle_algorithm = True
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        status, payload, headers = self.server.api.handle(self.command, self.path, raw)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if body:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _merge(entity: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a PATCH body, merging nested objects such as a plugin's config."""
+    merged = copy.deepcopy(entity)
+    for field, value in body.items():
+        if isinstance(value, dict) and isinstance(merged.get(field), dict):
+            merged[field] = {**merged[field], **value}
+        else:
+            merged[field] = value
+    return merged
+
+
+class FakeAdminAPI:
+    """
+    An in-memory stand-in for the Kong Admin API, served over local HTTP.
+
+    It keeps services, routes, consumers, consumer groups, plugins, key-auth
+    credentials and ACLs per workspace, and serves the endpoints this client
+    uses: entity collections with `size`, `offset`/`next` pagination, `tags`
+    filters and `sort_by`/`sort_desc` ordering, the nested collections such as
+    /services/{service}/routes and /consumers/{consumer}/acls, consumer group
+    membership and rate limit overrides, and /workspaces. Like Kong, `next`
+    links are relative to the workspace, deletes of missing entities succeed,
+    and unique fields and foreign keys are enforced.
+
+    Latency and errors can be injected, so retry, concurrency and performance
+    code can be exercised against a real HTTP server without a gateway. It is
+    not a complete emulation: plugin configs are not validated and entities
+    only get the most common defaults.
+
+    Example:
+        with FakeAdminAPI() as api:
+            client = KongAPIClient(api.url, admin_token="test")
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initializes the FakeAdminAPI object.
+
+        Args:
+            host (str, optional): The address to listen on. Defaults to
+                                  "127.0.0.1".
+            port (int, optional): The port to listen on. Defaults to a free port.
+            latency (float, optional): Seconds to wait before each response.
+            jitter (float, optional): Up to this many more seconds, at random.
+            seed (Optional[int], optional): Seed for jitter and error rates.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.errors: List[ErrorRule] = []
+        self.calls: List[Tuple[str, str]] = []
+        self.workspaces: Dict[str, _Workspace] = {}
+        self.workspace_order = _Ordered()
+        self.lock = threading.RLock()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+        self.create_workspace(DEFAULT_WORKSPACE)
+
+    @property
+    def url(self) -> str:
+        """The admin URL to give to `KongAPIClient`."""
+        if self.server is None:
+            raise ValueError("The server has not been started.")
+        return f"http://{self.host}:{self.server.server_address[1]}"
+
+    def start(self) -> "FakeAdminAPI":
+        """Start serving in a background thread."""
+        if self.server is None:
+            self.server = ThreadingHTTPServer((self.host, self.port), _Handler)
+            self.server.daemon_threads = True
+            self.server.api = self
+            self.thread = threading.Thread(
+                target=self.server.serve_forever, args=(0.05,), daemon=True
+            )
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            self.thread = None
+
+    def __enter__(self) -> "FakeAdminAPI":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def inject_error(self, status: int = 500, **kwargs: Any) -> ErrorRule:
+        """
+        Fail matching requests until the rule is removed or exhausted.
+
+        Args:
+            status (int, optional): The status to respond with. Defaults to 500.
+            **kwargs: Other ErrorRule arguments: rate, times, method, path and
+                      headers.
+
+        Returns:
+            ErrorRule: The rule, which counts the errors it triggered.
+        """
+        rule = ErrorRule(status, **kwargs)
+        with self.lock:
+            self.errors.append(rule)
+        return rule
+
+    def clear_errors(self) -> None:
+        """Remove every injected error rule."""
+        with self.lock:
+            self.errors = []
+
+    def reset_calls(self) -> None:
+        """Forget the requests recorded in `calls`."""
+        with self.lock:
+            self.calls = []
+
+    def create_workspace(self, name: str, **fields: Any) -> Dict[str, Any]:
+        """Create a workspace directly, without a request."""
+        with self.lock:
+            if name in self.workspaces:
+                raise APIError(409, f"UNIQUE violation detected on '{{name={name}}}'")
+            now = int(time.time())
+            entity = {
+                "id": str(uuid.uuid4()),
+                "name": name,
+                "comment": None,
+                "config": {},
+                "meta": {},
+                "created_at": now,
+                **fields,
+            }
+            self.workspaces[name] = _Workspace(entity)
+            self.workspace_order.add(name)
+            return entity
+
+    def load(
+        self,
+        entity_type: str,
+        entities: Iterable[Dict[str, Any]],
+        workspace: str = DEFAULT_WORKSPACE,
+    ) -> List[Dict[str, Any]]:
+        """
+        Store entities directly, without a request per entity.
+
+        Entities are validated and given defaults as if they were posted, so
+        large data sets for tests and benchmarks can be set up quickly.
+
+        Args:
+            entity_type (str): The entity type, e.g. "consumers".
+            entities (Iterable[Dict[str, Any]]): The entity fields.
+            workspace (str, optional): The workspace. Defaults to "default".
+
+        Returns:
+            List[Dict[str, Any]]: The stored entities.
+        """
+        with self.lock:
+            store = self.workspaces[workspace]
+            return [self._create(store, entity_type, body) for body in entities]
+
+    def add_members(
+        self,
+        group: str,
+        consumers: Iterable[str],
+        workspace: str = DEFAULT_WORKSPACE,
+    ) -> None:
+        """Add consumers to a consumer group directly, without a request."""
+        with self.lock:
+            store = self.workspaces[workspace]
+            self._add_members(store, store.get("consumer_groups", group), consumers)
+
+    def entities(
+        self, entity_type: str, workspace: str = DEFAULT_WORKSPACE
+    ) -> List[Dict[str, Any]]:
+        """Return copies of the stored entities of a type, in creation order."""
+        with self.lock:
+            table = self.workspaces[workspace].tables[entity_type]
+            return [copy.deepcopy(table.rows[key]) for key in table.ordered]
+
+    def handle(
+        self, method: str, target: str, raw: bytes = b""
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """
+        Handle one request.
+
+        Args:
+            method (str): The HTTP method.
+            target (str): The request path and query string.
+            raw (bytes, optional): The request body.
+
+        Returns:
+            Tuple[int, Any, Dict[str, str]]: The status, the JSON payload or None
+                                             and extra response headers.
+        """
+        parsed = urlsplit(target)
+        with self.lock:
+            self.calls.append((method, parsed.path))
+            rule = next(
+                (r for r in self.errors if r.matches(method, parsed.path)), None
+            )
+            if rule is not None and self.random.random() < rule.rate:
+                rule.triggered += 1
+            else:
+                rule = None
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if rule is not None:
+            message = f"Injected error {rule.status}"
+            return rule.status, {"message": message}, dict(rule.headers)
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                raise ValueError
+        except ValueError:
+            return 400, {"message": "Cannot parse JSON body"}, {}
+        query = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+        try:
+            with self.lock:
+                status, payload = self._dispatch(method, parsed.path, query, body)
+        except APIError as error:
+            return error.status, error.body, {}
+        return status, payload, {}
+
+    def _dispatch(
+        self, method: str, path: str, query: Dict[str, str], body: Dict[str, Any]
+    ) -> Tuple[int, Any]:
+        segments = [unquote(segment) for segment in path.split("/") if segment]
+        if segments == ["auth"]:
+            return 200, {}
+        if segments[:1] == ["workspaces"]:
+            return self._workspace_api(method, segments[1:], query, body)
+        workspace = DEFAULT_WORKSPACE
+        if segments and segments[0] not in ENTITY_TYPES:
+            workspace = segments.pop(0)
+            if workspace not in self.workspaces:
+                raise APIError(404, f"Workspace '{workspace}' not found")
+        store = self.workspaces[workspace]
+        if not segments or segments[0] not in ENTITY_TYPES:
+            raise APIError(404, "Not found")
+
+        entity_type = segments[0]
+        if len(segments) == 1:
+            return self._collection(store, entity_type, method, query, body, path)
+        if len(segments) == 2:
+            return self._entity(store, entity_type, segments[1], method, body)
+        return self._nested(store, segments, method, query, body, path)
+
+    def _nested(
+        self,
+        store: _Workspace,
+        segments: List[str],
+        method: str,
+        query: Dict[str, str],
+        body: Dict[str, Any],
+        path: str,
+    ) -> Tuple[int, Any]:
+        """Route the endpoints below an entity, e.g. /consumers/{c}/acls."""
+        entity_type = segments[0]
+        parent = store.get(entity_type, segments[1])
+        rest = segments[2:]
+        if entity_type == "consumer_groups" and rest[0] == "consumers":
+            return self._group_members(store, parent, method, rest[1:], query, body)
+        if entity_type == "consumer_groups" and rest[:2] == ["overrides", "plugins"]:
+            return self._override(store, parent, method, rest[2:], body)
+        if entity_type == "consumers" and rest[0] == "consumer_groups":
+            return self._consumer_groups(store, parent, method, rest[1:], body)
+        nested = NESTED.get((entity_type, rest[0]))
+        if nested is not None and len(rest) <= 2:
+            child_type, field = nested
+            scope = (field, parent["id"])
+            if len(rest) == 1:
+                return self._collection(
+                    store, child_type, method, query, body, path, scope
+                )
+            return self._entity(store, child_type, rest[1], method, body, scope)
+        target = FOREIGN_KEYS.get(entity_type, {}).get(rest[0])
+        if target is not None and len(rest) == 1 and method == "GET":
+            if not parent.get(rest[0]):
+                raise APIError(404, "Not found")
+            return 200, store.get(target, parent[rest[0]]["id"])
+        raise APIError(404, "Not found")
+
+    def _page(
+        self,
+        ordered: _Ordered,
+        lookup: Callable[[str], Dict[str, Any]],
+        query: Dict[str, str],
+        path: str,
+    ) -> Dict[str, Any]:
+        """Paginate keys as Kong does, with `next` relative to the workspace."""
+        try:
+            size = int(query.get("size", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            size = 0
+        if not 1 <= size <= MAX_PAGE_SIZE:
+            raise APIError(
+                400, f"size must be an integer between 1 and {MAX_PAGE_SIZE}"
+            )
+        after = self._offset(query)
+        predicate = None
+        if query.get("tags"):
+            predicate = self._tag_predicate(query["tags"], lookup)
+        if query.get("sort_by"):
+            ordered = self._sorted(ordered, lookup, query)
+        keys, last = ordered.page(after, size, predicate)
+        result: Dict[str, Any] = {"data": [lookup(key) for key in keys], "next": None}
+        if last is not None:
+            offset = base64.urlsafe_b64encode(str(last).encode()).decode()
+            params = {k: v for k, v in query.items() if k != "offset"}
+            params["offset"] = offset
+            relative = [quote(s) for s in path.split("/") if s]
+            if relative and relative[0] not in ENTITY_TYPES + ("workspaces",):
+                relative.pop(0)
+            result["next"] = f"/{'/'.join(relative)}?{urlencode(params)}"
+            result["offset"] = offset
+        return result
+
+    @staticmethod
+    def _offset(query: Dict[str, str]) -> int:
+        if not query.get("offset"):
+            return 0
+        try:
+            return int(base64.urlsafe_b64decode(query["offset"]).decode())
+        except ValueError:
+            raise APIError(400, "'offset' is not a valid offset for this path")
+
+    @staticmethod
+    def _sorted(
+        ordered: _Ordered,
+        lookup: Callable[[str], Dict[str, Any]],
+        query: Dict[str, str],
+    ) -> _Ordered:
+        """Order keys by `sort_by`, with offsets stable while nothing changes."""
+        field = query["sort_by"]
+
+        def value(key: str) -> Tuple[bool, Any]:
+            found = lookup(key).get(field)
+            return found is not None, found if found is not None else 0
+
+        keys = sorted(ordered, key=value, reverse=query.get("sort_desc") == "true")
+        result = _Ordered()
+        result.keys = keys
+        result.order = list(range(1, len(keys) + 1))
+        result.seqs = dict(zip(keys, result.order))
+        return result
+
+    @staticmethod
+    def _tag_predicate(
+        tags: str, lookup: Callable[[str], Dict[str, Any]]
+    ) -> Callable[[str], bool]:
+        if "," in tags and "/" in tags:
+            raise APIError(400, "invalid option (tags: cannot mix 'and' with 'or')")
+        if "/" in tags:
+            wanted = set(tags.split("/"))
+            return lambda key: bool(wanted & set(lookup(key).get("tags") or []))
+        wanted = set(tags.split(","))
+        return lambda key: wanted <= set(lookup(key).get("tags") or [])
+
+    def _collection(
+        self,
+        store: _Workspace,
+        entity_type: str,
+        method: str,
+        query: Dict[str, str],
+        body: Dict[str, Any],
+        path: str,
+        scope: Optional[Tuple[str, str]] = None,
+    ) -> Tuple[int, Any]:
+        table = store.tables[entity_type]
+        if method == "GET":
+            ordered = table.refs.get(scope, _Ordered()) if scope else table.ordered
+            return 200, self._page(ordered, table.rows.__getitem__, query, path)
+        if method == "POST":
+            return 201, self._create(store, entity_type, body, scope)
+        raise APIError(405, "Method not allowed")
+
+    def _entity(
+        self,
+        store: _Workspace,
+        entity_type: str,
+        key: str,
+        method: str,
+        body: Dict[str, Any],
+        scope: Optional[Tuple[str, str]] = None,
+    ) -> Tuple[int, Any]:
+        table = store.tables[entity_type]
+        entity = table.find(key, scope)
+        if method == "GET":
+            if entity is None:
+                raise APIError(404, "Not found")
+            if entity_type == "consumer_groups":
+                return 200, self._group_details(store, entity)
+            return 200, entity
+        if method == "DELETE":
+            if entity is not None:
+                self._delete(store, entity_type, entity)
+            return 204, None
+        if method == "PATCH":
+            if entity is None:
+                raise APIError(404, "Not found")
+            merged = _merge(entity, body)
+            return 200, self._create(store, entity_type, merged, scope, entity)
+        if method == "PUT":
+            return 200, self._put(store, entity_type, key, entity, body, scope)
+        raise APIError(405, "Method not allowed")
+
+    def _put(
+        self,
+        store: _Workspace,
+        entity_type: str,
+        key: str,
+        entity: Optional[Dict[str, Any]],
+        body: Dict[str, Any],
+        scope: Optional[Tuple[str, str]],
+    ) -> Dict[str, Any]:
+        """Replace an entity, or create it with the ID or name in the path."""
+        if entity is None:
+            if UUID_PATTERN.match(key):
+                body = {**body, "id": key}
+            elif entity_type in ENDPOINT_KEYS:
+                body = {**body, ENDPOINT_KEYS[entity_type][0]: key}
+            return self._create(store, entity_type, body, scope)
+        body = {**body, "id": entity["id"], "created_at": entity["created_at"]}
+        return self._create(store, entity_type, body, scope, entity)
+
+    def _create(
+        self,
+        store: _Workspace,
+        entity_type: str,
+        body: Dict[str, Any],
+        scope: Optional[Tuple[str, str]] = None,
+        existing: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Validate and store a new entity, or replace `existing`."""
+        now = int(time.time())
+        entity = copy.deepcopy(DEFAULTS[entity_type])
+        entity.update(copy.deepcopy(body))
+        entity.setdefault("id", str(uuid.uuid4()))
+        entity.setdefault("created_at", now)
+        entity["updated_at"] = now
+        if scope:
+            entity[scope[0]] = {"id": scope[1]}
+
+        for field, target in FOREIGN_KEYS.get(entity_type, {}).items():
+            entity[field] = self._resolve(store, target, field, entity.get(field))
+        if entity_type == "services" and entity.get("url"):
+            url = urlsplit(entity.pop("url"))
+            entity["protocol"] = url.scheme or "http"
+            entity["host"] = url.hostname
+            entity["port"] = url.port or (443 if url.scheme == "https" else 80)
+            entity["path"] = url.path or None
+        elif entity_type == "key-auths" and not entity.get("key"):
+            entity["key"] = uuid.uuid4().hex
+        required = REQUIRED.get(entity_type)
+        if required and not any(entity.get(field) for field in required):
+            raise APIError(
+                400,
+                f"schema violation (at least one of these fields must be non-empty: "
+                f"{', '.join(repr(field) for field in required)})",
+            )
+
+        table = store.tables[entity_type]
+        if existing is None and entity["id"] in table.rows:
+            raise APIError(409, "primary key violation", {"id": "already exists"})
+        table.check_unique(entity)
+        table.save(entity)
+        return entity
+
+    @staticmethod
+    def _resolve(
+        store: _Workspace, target: str, field: str, value: Any
+    ) -> Optional[Dict[str, str]]:
+        if not value:
+            return None
+        if isinstance(value, dict):
+            value = value.get("id") or value.get("name") or value.get("username")
+        entity = store.tables[target].find(str(value))
+        if entity is None:
+            raise APIError(
+                400,
+                f"schema violation ({field}: the foreign key does not reference an "
+                f"existing '{target}' entity.)",
+            )
+        return {"id": entity["id"]}
+
+    def _delete(
+        self, store: _Workspace, entity_type: str, entity: Dict[str, Any]
+    ) -> None:
+        """Delete an entity and, as Kong does, what belongs to it."""
+        entity_id = entity["id"]
+        field = entity_type[:-1]
+        if entity_type == "services" and store.tables["routes"].children(
+            "service", entity_id
+        ):
+            raise APIError(
+                400, "an existing 'routes' entity references this 'services' entity"
+            )
+        for child_type, foreign_keys in FOREIGN_KEYS.items():
+            if foreign_keys.get(field) == entity_type:
+                child_table = store.tables[child_type]
+                for child_id in child_table.children(field, entity_id):
+                    self._delete(store, child_type, child_table.rows[child_id])
+        if entity_type == "consumers":
+            for group_id in store.groups_of.pop(entity_id, {}):
+                store.members[group_id].discard(entity_id)
+        elif entity_type == "consumer_groups":
+            for consumer_id in store.members.pop(entity_id, _Ordered()):
+                store.groups_of[consumer_id].pop(entity_id, None)
+            store.overrides.pop(entity_id, None)
+        store.tables[entity_type].remove(entity_id)
+
+    def _group_details(
+        self, store: _Workspace, group: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        plugins = store.tables["plugins"]
+        details = [
+            plugins.rows[plugin_id]
+            for plugin_id in plugins.children("consumer_group", group["id"])
+        ]
+        if group["id"] in store.overrides:
+            details.append(
+                {
+                    "name": RATE_LIMIT_PLUGIN,
+                    "config": store.overrides[group["id"]],
+                    "consumer_group": {"id": group["id"]},
+                }
+            )
+        members = store.members.get(group["id"]) or []
+        return {
+            "consumer_group": group,
+            "plugins": details,
+            "consumers": [store.tables["consumers"].rows[c] for c in members],
+        }
+
+    def _add_members(
+        self, store: _Workspace, group: Dict[str, Any], consumers: Iterable[str]
+    ) -> List[Dict[str, Any]]:
+        resolved = [store.get("consumers", key) for key in consumers]
+        members = store.members.setdefault(group["id"], _Ordered())
+        for consumer in resolved:
+            members.add(consumer["id"])
+            store.groups_of.setdefault(consumer["id"], {})[group["id"]] = None
+        return resolved
+
+    def _remove_member(
+        self, store: _Workspace, group: Dict[str, Any], consumer: Dict[str, Any]
+    ) -> None:
+        members = store.members.get(group["id"])
+        if members is None or consumer["id"] not in members:
+            raise APIError(404, "Not found")
+        members.discard(consumer["id"])
+        store.groups_of[consumer["id"]].pop(group["id"], None)
+
+    @staticmethod
+    def _listed(value: Any) -> List[str]:
+        values = value if isinstance(value, list) else [value]
+        if not all(values):
+            raise APIError(400, "must provide one or more consumer groups or consumers")
+        return [v.get("id") if isinstance(v, dict) else str(v) for v in values]
+
+    def _group_members(
+        self,
+        store: _Workspace,
+        group: Dict[str, Any],
+        method: str,
+        rest: List[str],
+        query: Dict[str, str],
+        body: Dict[str, Any],
+    ) -> Tuple[int, Any]:
+        members = store.members.get(group["id"]) or _Ordered()
+        consumers = store.tables["consumers"].rows
+        if not rest and method == "GET":
+            path = f"/consumer_groups/{quote(group['id'])}/consumers"
+            return 200, self._page(members, consumers.__getitem__, query, path)
+        if not rest and method == "POST":
+            keys = self._listed(body.get("consumer"))
+            if any(store.get("consumers", key)["id"] in members for key in keys):
+                # Kong rejects the whole batch when any consumer is a member.
+                raise APIError(409, "consumer already in group")
+            added = self._add_members(store, group, keys)
+            return 201, {"consumer_group": group, "consumers": added}
+        if not rest and method == "DELETE":
+            for consumer_id in members:
+                store.groups_of[consumer_id].pop(group["id"], None)
+            store.members.pop(group["id"], None)
+            return 204, None
+        if len(rest) == 1 and method in ("GET", "DELETE"):
+            consumer = store.get("consumers", rest[0])
+            if method == "DELETE":
+                self._remove_member(store, group, consumer)
+                return 204, None
+            if consumer["id"] not in members:
+                raise APIError(404, "Not found")
+            return 200, {"consumer_group": group, "consumer": consumer}
+        raise APIError(405, "Method not allowed")
+
+    def _consumer_groups(
+        self,
+        store: _Workspace,
+        consumer: Dict[str, Any],
+        method: str,
+        rest: List[str],
+        body: Dict[str, Any],
+    ) -> Tuple[int, Any]:
+        groups = store.tables["consumer_groups"].rows
+        if not rest and method == "GET":
+            group_ids = store.groups_of.get(consumer["id"]) or {}
+            return 200, {
+                "consumer": consumer,
+                "consumer_groups": [groups[group_id] for group_id in group_ids],
+            }
+        if not rest and method == "POST":
+            added = []
+            for key in self._listed(body.get("group")):
+                group = store.get("consumer_groups", key)
+                self._add_members(store, group, [consumer["id"]])
+                added.append(group)
+            return 201, {"consumer": consumer, "consumer_groups": added}
+        if not rest and method == "DELETE":
+            for group_id in store.groups_of.pop(consumer["id"], {}):
+                store.members[group_id].discard(consumer["id"])
+            return 204, None
+        if len(rest) == 1 and method == "DELETE":
+            group = store.get("consumer_groups", rest[0])
+            self._remove_member(store, group, consumer)
+            return 204, None
+        raise APIError(405, "Method not allowed")
+
+    def _override(
+        self,
+        store: _Workspace,
+        group: Dict[str, Any],
+        method: str,
+        rest: List[str],
+        body: Dict[str, Any],
+    ) -> Tuple[int, Any]:
+        if rest != [RATE_LIMIT_PLUGIN]:
+            raise APIError(404, "Not found")
+        if method == "PUT":
+            config = body.get("config")
+            if not isinstance(config, dict) or not config.get("limit"):
+                raise APIError(400, "schema violation (config.limit: required field)")
+            store.overrides[group["id"]] = config
+        elif method == "DELETE":
+            store.overrides.pop(group["id"], None)
+            return 204, None
+        elif group["id"] not in store.overrides:
+            raise APIError(404, "Not found")
+        return 200, {
+            "group": group["id"],
+            "plugin": RATE_LIMIT_PLUGIN,
+            "config": store.overrides[group["id"]],
+        }
+
+    def _workspace_api(
+        self,
+        method: str,
+        rest: List[str],
+        query: Dict[str, str],
+        body: Dict[str, Any],
+    ) -> Tuple[int, Any]:
+        if not rest:
+            return self._workspaces(method, query, body)
+        name = rest[0]
+        if name not in self.workspaces:
+            name = next(
+                (n for n, w in self.workspaces.items() if w.entity["id"] == name), name
+            )
+        store = self.workspaces.get(name)
+        if rest[1:] == ["meta"] and method == "GET":
+            if store is None:
+                raise APIError(404, "Not found")
+            counts = {t: len(table.rows) for t, table in store.tables.items()}
+            return 200, {"counts": counts}
+        if len(rest) > 1:
+            raise APIError(404, "Not found")
+        return self._workspace(method, name, store, body)
+
+    def _workspaces(
+        self, method: str, query: Dict[str, str], body: Dict[str, Any]
+    ) -> Tuple[int, Any]:
+        """Handle the /workspaces collection."""
+
+        def lookup(key: str) -> Dict[str, Any]:
+            return self.workspaces[key].entity
+
+        if method == "GET":
+            return 200, self._page(self.workspace_order, lookup, query, "/workspaces")
+        if method == "POST":
+            if not body.get("name"):
+                raise APIError(400, "schema violation (name: required field)")
+            return 201, self.create_workspace(body.pop("name"), **body)
+        raise APIError(405, "Method not allowed")
+
+    def _workspace(
+        self,
+        method: str,
+        name: str,
+        store: Optional[_Workspace],
+        body: Dict[str, Any],
+    ) -> Tuple[int, Any]:
+        """Handle /workspaces/{workspace}."""
+        if method == "GET":
+            if store is None:
+                raise APIError(404, "Not found")
+            return 200, store.entity
+        if method == "DELETE":
+            if store is not None:
+                if not store.is_empty():
+                    raise APIError(400, "Workspace is not empty")
+                del self.workspaces[name]
+                self.workspace_order.discard(name)
+            return 204, None
+        if method not in ("PATCH", "PUT"):
+            raise APIError(405, "Method not allowed")
+        if store is None:
+            if method == "PATCH":
+                raise APIError(404, "Not found")
+            return 200, self.create_workspace(body.pop("name", name), **body)
+        if body.get("name", name) != name:
+            raise APIError(400, "Workspaces cannot be renamed")
+        store.entity.update(body)
+        return 200, store.entity
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+
+class TaskResult:
+    """The outcome of running a function against a single item."""
+
+    def __init__(
+        self,
+        item: Any,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Initializes the TaskResult object.
+
+        Args:
+            item (Any): The item the function was called with.
+            result (Any, optional): The value returned by the function.
+            error (Optional[BaseException], optional): The exception raised by the
+                                                       function, if any.
+        """
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the function completed without raising."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return f"<TaskResult(item={self.item!r}, ok={self.ok})>"
+
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 8,
+) -> List[TaskResult]:
+    """
+    Call `func` for every item using a bounded pool of threads.
+
+    Exceptions raised by `func` are captured on the returned TaskResult rather
+    than propagated, so one failing item does not stop the others.
+
+    Args:
+        func (Callable[[Any], Any]): The function to call for each item.
+        items (Iterable[Any]): The items to process.
+        max_workers (int, optional): The maximum number of concurrent calls.
+                                     Defaults to 8.
+
+    Returns:
+        List[TaskResult]: One result per item, in the same order as `items`.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers should be at least 1.")
+
+    def call(item: Any) -> TaskResult:
+        try:
+            return TaskResult(item, result=func(item))
+        except Exception as error:
+            return TaskResult(item, error=error)
+
+    items = list(items)
+    if len(items) <= 1 or max_workers == 1:
+        return [call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
@@ -1,4 +1,5 @@
 from functools import wraps
+from typing import Any
 
 
 def validate_id_or_name(func):
@@ -34,6 +35,17 @@ def validate_name(func):
     return wrapper
 
 
+def validate_username(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        username = kwargs.get("username", args[1] if len(args) > 1 else None)
+        if not username:
+            raise ValueError("The username must be provided.")
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
 def validate_id_or_name_alt(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -43,3 +55,31 @@ def validate_id_or_name_alt(func):
         return func(*args, **kwargs)
 
     return wrapper
+
+
+def is_not_found(error: Any) -> bool:
+    """
+    Check whether an exception is an HTTP error for a missing (404) entity.
+
+    Args:
+        error (Any): The exception raised by a request.
+
+    Returns:
+        bool: True if the error carries a 404 response.
+    """
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 404
+
+
+def is_conflict(error: Any) -> bool:
+    """
+    Check whether an exception is an HTTP error for a conflicting (409) write.
+
+    Args:
+        error (Any): The exception raised by a request.
+
+    Returns:
+        bool: True if the error carries a 409 response.
+    """
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 409
@@ -0,0 +1,33 @@
+import uuid
+
+# Fixed namespace for every ID generated by this client. Changing it would
+# change every generated ID, so it must never be modified.
+KONG_ID_NAMESPACE = uuid.UUID("8c2a5f0e-3b1d-5c47-9a6e-4f7d2b1c9e30")
+
+
+def deterministic_id(entity_type: str, natural_key: str, workspace: str) -> str:
+    """
+    Build a stable UUIDv5 for an entity from its workspace, type and natural key.
+
+    The same inputs always produce the same ID, which allows an entity to be
+    upserted with a single PUT without first looking it up.
+
+    Args:
+        entity_type (str): The entity type, e.g. "services" or "consumers".
+        natural_key (str): The value identifying the entity within its type,
+                           e.g. a service name or consumer username.
+        workspace (str): The name of the workspace the entity belongs to.
+
+    Returns:
+        str: The generated UUID as a string.
+
+    Raises:
+        ValueError: If any of the arguments are empty.
+    """
+    if not entity_type or not natural_key or not workspace:
+        raise ValueError(
+            "entity_type, natural_key and workspace should be provided and non-empty."
+        )
+
+    name = f"{workspace}:{entity_type}:{natural_key}"
+    return str(uuid.uuid5(KONG_ID_NAMESPACE, name))
@@ -0,0 +1,117 @@
+import unittest
+
+from kong_gateway_client.analysis.access_matrix import AccessMatrix
+
+CONSUMERS = [{"id": "alice"}, {"id": "bob"}, {"id": "carol"}, {"id": "dave"}]
+
+ROUTES = [
+    {"id": "public", "service": {"id": "web"}},
+    {"id": "keyed", "service": {"id": "api"}},
+    {"id": "gold-only", "service": {"id": "api"}},
+    {"id": "no-banned", "service": {"id": "api"}},
+    {"id": "acl-without-auth", "service": {"id": "web"}},
+]
+
+PLUGINS = [
+    {"id": "p-key", "name": "key-auth", "service": {"id": "api"}},
+    {
+        "id": "p-gold",
+        "name": "acl",
+        "route": {"id": "gold-only"},
+        "config": {"allow": ["gold", "platinum"]},
+    },
+    {
+        "id": "p-deny",
+        "name": "acl",
+        "route": {"id": "no-banned"},
+        "config": {"deny": ["banned"]},
+    },
+    {
+        "id": "p-orphan-acl",
+        "name": "acl",
+        "route": {"id": "acl-without-auth"},
+        "config": {"allow": ["gold"]},
+    },
+    {"id": "p-other", "name": "cors"},
+]
+
+ACLS = [
+    {"id": "a1", "group": "gold", "consumer": {"id": "alice"}},
+    {"id": "a2", "group": "banned", "consumer": {"id": "bob"}},
+    {"id": "a3", "group": "platinum", "consumer": {"id": "carol"}},
+    {"id": "a4", "group": "gold", "consumer": {"id": "bob"}},
+]
+
+KEY_AUTHS = [
+    {"id": "k1", "consumer": {"id": "alice"}},
+    {"id": "k2", "consumer": {"id": "bob"}},
+    {"id": "k3", "consumer": {"id": "carol"}},
+]
+
+
+class TestAccessMatrix(unittest.TestCase):
+    def setUp(self):
+        self.matrix = AccessMatrix(CONSUMERS, ROUTES, PLUGINS, ACLS, KEY_AUTHS)
+
+    def test_access(self):
+        self.assertEqual(
+            self.matrix.consumers_for("public"), ["alice", "bob", "carol", "dave"]
+        )
+        self.assertEqual(self.matrix.consumers_for("keyed"), ["alice", "bob", "carol"])
+        self.assertEqual(
+            self.matrix.consumers_for("gold-only"), ["alice", "bob", "carol"]
+        )
+        self.assertEqual(self.matrix.consumers_for("no-banned"), ["alice", "carol"])
+        self.assertEqual(self.matrix.consumers_for("acl-without-auth"), [])
+        self.assertEqual(self.matrix.routes_for("dave"), ["public"])
+        self.assertTrue(self.matrix.can_access("bob", "gold-only"))
+        self.assertFalse(self.matrix.can_access("bob", "no-banned"))
+        self.assertFalse(self.matrix.can_access("nobody", "public"))
+
+    def test_update_consumer(self):
+        self.matrix.update_consumer("bob", ["silver"], has_key=True)
+        self.matrix.update_consumer("erin", ["gold"], has_key=True)
+
+        self.assertFalse(self.matrix.can_access("bob", "gold-only"))
+        self.assertTrue(self.matrix.can_access("bob", "no-banned"))
+        self.assertTrue(self.matrix.can_access("erin", "gold-only"))
+        self.assertEqual(self.matrix.groups["gold"], self.matrix._union(["gold"]))
+        self.assertFalse(self.matrix.groups["banned"] & self.matrix._bit("bob"))
+
+    def test_remove_consumer(self):
+        self.matrix.remove_consumer("alice")
+
+        self.assertEqual(self.matrix.consumers_for("gold-only"), ["bob", "carol"])
+        self.assertEqual(self.matrix.routes_for("alice"), [])
+
+    def test_update_and_remove_plugin(self):
+        self.matrix.update_plugin(
+            {
+                "id": "p-gold",
+                "name": "acl",
+                "route": {"id": "gold-only"},
+                "config": {"allow": ["platinum"]},
+            }
+        )
+        self.assertEqual(self.matrix.consumers_for("gold-only"), ["carol"])
+
+        self.matrix.remove_plugin("p-key")
+
+        self.assertEqual(
+            self.matrix.consumers_for("keyed"), ["alice", "bob", "carol", "dave"]
+        )
+        self.assertEqual(self.matrix.consumers_for("gold-only"), [])
+        self.assertEqual(self.matrix.counts()["keyed"], 4)
+
+    def test_matches_full_rebuild(self):
+        self.matrix.update_consumer("dave", ["gold"], has_key=True)
+        self.matrix.update_plugin({"id": "p-global-key", "name": "key-auth"})
+
+        rebuilt = AccessMatrix(
+            CONSUMERS,
+            ROUTES,
+            PLUGINS + [{"id": "p-global-key", "name": "key-auth"}],
+            ACLS + [{"id": "a5", "group": "gold", "consumer": {"id": "dave"}}],
+            KEY_AUTHS + [{"id": "k4", "consumer": {"id": "dave"}}],
+        )
+        self.assertEqual(self.matrix.access, rebuilt.access)
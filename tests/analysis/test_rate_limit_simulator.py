@@ -0,0 +1,75 @@
+import random
+import unittest
+
+from kong_gateway_client.analysis import rate_limit_simulator
+from kong_gateway_client.analysis.rate_limit_simulator import RateLimitSimulator
+
+
+class TestRateLimitSimulator(unittest.TestCase):
+    def test_fixed_window(self):
+        simulator = RateLimitSimulator([2], [10], "fixed")
+
+        result = simulator.simulate([0, 1, 2, 3, 10, 11, 12], use_numpy=False)
+
+        self.assertEqual(result.total, 7)
+        self.assertEqual(result.rejected, 3)
+        self.assertEqual(result.first_rejected_at, 2)
+
+    def test_sliding_window_weighs_previous_window(self):
+        simulator = RateLimitSimulator([4], [10])
+
+        # 4 accepted in [0, 10). At t=12 the previous window still weighs
+        # 0.8 * 4 = 3.2, so one request fits, at t=18 0.2 * 4 = 0.8 so three do.
+        result = simulator.simulate(
+            [1, 2, 3, 4, 12, 12.5, 18, 18.5, 19, 19.5], use_numpy=False
+        )
+
+        self.assertEqual(result.rejected, 2)
+        self.assertEqual(result.first_rejected_at, 12.5)
+
+    def test_rejected_requests_are_not_counted(self):
+        simulator = RateLimitSimulator([1], [10])
+
+        result = simulator.simulate([0] + [5] * 100 + [25], use_numpy=False)
+
+        # Only the first request counts towards [0, 10), and [10, 20) is empty,
+        # so the request at 25 sees no previous count.
+        self.assertEqual(result.rejected, 100)
+
+    def test_multiple_limits(self):
+        simulator = RateLimitSimulator([2, 3], [1, 60], "fixed")
+
+        result = simulator.simulate([0, 0.1, 0.2, 1, 1.1, 2], use_numpy=False)
+
+        self.assertEqual(result.rejected, 3)
+
+    def test_simulate_traces_and_from_config(self):
+        simulator = RateLimitSimulator.from_config(
+            {"limit": [1], "window_size": [60], "window_type": "fixed"}
+        )
+
+        results = simulator.simulate_traces(
+            {"alice": [0, 1, 2], "bob": [0, 120]}, use_numpy=False
+        )
+        total = results["alice"] + results["bob"]
+
+        self.assertEqual(results["alice"].rejected, 2)
+        self.assertEqual(results["bob"].rejected, 0)
+        self.assertEqual((total.total, total.rejected), (5, 2))
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            RateLimitSimulator([1, 2], [60])
+        with self.assertRaises(ValueError):
+            RateLimitSimulator([1], [60], "leaky")
+
+    @unittest.skipIf(rate_limit_simulator.np is None, "numpy is not installed")
+    def test_numpy_matches_python(self):
+        rng = random.Random(7)
+        timestamps = sorted(rng.uniform(0, 600) for _ in range(5000))
+        for window_type in ("sliding", "fixed"):
+            simulator = RateLimitSimulator([50], [30], window_type)
+            python = simulator.simulate(timestamps, use_numpy=False)
+            vectorized = simulator.simulate(timestamps, use_numpy=True)
+            self.assertEqual(python.rejected, vectorized.rejected)
+            self.assertEqual(python.first_rejected_at, vectorized.first_rejected_at)
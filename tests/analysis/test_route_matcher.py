@@ -0,0 +1,126 @@
+import unittest
+
+from kong_gateway_client.analysis.route_matcher import RouteMatcher
+from kong_gateway_client.resources.routes import KongRoute
+
+SERVICES = [
+    {"id": "s-api", "name": "api"},
+    {"id": "s-web", "name": "web"},
+]
+
+ROUTES = [
+    {"id": "r-root", "name": "root", "paths": ["/"], "service": {"id": "s-web"}},
+    {
+        "id": "r-api",
+        "name": "api",
+        "hosts": ["api.example.com"],
+        "paths": ["/v1"],
+        "service": {"id": "s-api"},
+    },
+    {
+        "id": "r-api-users",
+        "name": "api-users",
+        "hosts": ["api.example.com"],
+        "paths": ["/v1/users"],
+        "service": {"id": "s-api"},
+    },
+    {
+        "id": "r-wildcard",
+        "name": "wildcard",
+        "hosts": ["*.example.com"],
+        "paths": ["/v1"],
+        "service": {"id": "s-web"},
+    },
+    {
+        "id": "r-regex-low",
+        "name": "regex-low",
+        "hosts": ["api.example.com"],
+        "paths": [r"~/v1/users/\d+$"],
+        "regex_priority": 1,
+        "service": {"id": "s-api"},
+    },
+    {
+        "id": "r-regex-high",
+        "name": "regex-high",
+        "hosts": ["api.example.com"],
+        "paths": [r"~/v1/users/42$"],
+        "regex_priority": 10,
+        "service": {"id": "s-api"},
+    },
+    {
+        "id": "r-post",
+        "name": "post",
+        "paths": ["/submit"],
+        "methods": ["POST"],
+        "service": {"id": "s-web"},
+    },
+    {
+        "id": "r-header",
+        "name": "header",
+        "paths": ["/submit"],
+        "methods": ["POST"],
+        "headers": {"X-Version": ["2"]},
+        "service": {"id": "s-api"},
+    },
+    {
+        "id": "r-https",
+        "name": "https",
+        "protocols": ["https"],
+        "paths": ["/secure"],
+        "service": {"id": "s-web"},
+    },
+]
+
+
+class TestRouteMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = RouteMatcher(ROUTES, SERVICES)
+
+    def name_of(self, **request):
+        match = self.matcher.match(**request)
+        return match.route["name"] if match else None
+
+    def test_longest_prefix_wins(self):
+        match = self.matcher.match("/v1/users/me", host="api.example.com")
+
+        self.assertEqual(match.route["name"], "api-users")
+        self.assertEqual(match.service["name"], "api")
+        self.assertEqual(match.path, "/v1/users")
+
+    def test_plain_host_beats_wildcard_and_port_is_ignored(self):
+        self.assertEqual(self.name_of(path="/v1", host="API.example.com:8000"), "api")
+        self.assertEqual(self.name_of(path="/v1", host="www.example.com"), "wildcard")
+        self.assertEqual(self.name_of(path="/v1", host="example.org"), "root")
+
+    def test_regex_paths_by_priority(self):
+        self.assertEqual(
+            self.name_of(path="/v1/users/42", host="api.example.com"), "regex-high"
+        )
+        self.assertEqual(
+            self.name_of(path="/v1/users/7", host="api.example.com"), "regex-low"
+        )
+
+    def test_methods_headers_and_protocols(self):
+        self.assertEqual(self.name_of(path="/submit"), "root")
+        self.assertEqual(self.name_of(path="/submit", method="POST"), "post")
+        self.assertEqual(
+            self.name_of(path="/submit", method="post", headers={"x-version": "2"}),
+            "header",
+        )
+        self.assertEqual(self.name_of(path="/secure"), "root")
+        self.assertEqual(self.name_of(path="/secure", protocol="https"), "https")
+
+    def test_no_match(self):
+        matcher = RouteMatcher([ROUTES[1]])
+
+        self.assertIsNone(matcher.match("/v1", host="other.example.com"))
+        self.assertIsNone(matcher.match("/v2", host="api.example.com"))
+
+    def test_accepts_route_models(self):
+        matcher = RouteMatcher([KongRoute(route) for route in ROUTES[:3]])
+
+        results = matcher.match_many(
+            [{"path": "/v1/x", "host": "api.example.com"}, {"path": "/other"}]
+        )
+
+        self.assertEqual([r.route["name"] for r in results], ["api", "root"])
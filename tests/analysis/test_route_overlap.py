@@ -0,0 +1,91 @@
+import unittest
+
+from kong_gateway_client.analysis.route_overlap import analyze_routes
+
+
+def route(route_id, service="s1", **fields):
+    return {"id": route_id, "name": route_id, "service": {"id": service}, **fields}
+
+
+class TestRouteOverlap(unittest.TestCase):
+    def test_clean_route_table(self):
+        report = analyze_routes(
+            [
+                route("root", paths=["/"]),
+                route("api", paths=["/api"], hosts=["api.example.com"]),
+                route("users", paths=["/api/users"], hosts=["api.example.com"]),
+            ]
+        )
+
+        self.assertTrue(report.ok)
+        self.assertEqual(len(report), 0)
+
+    def test_shadowed_by_identical_earlier_route(self):
+        report = analyze_routes(
+            [
+                route("first", paths=["/api"], created_at=1),
+                route("second", paths=["/api"], created_at=2),
+            ]
+        )
+
+        self.assertEqual([f.route["id"] for f in report.shadowed], ["second"])
+        self.assertEqual(report.shadowed[0].others[0]["id"], "first")
+        self.assertEqual(report.conflicts, [])
+
+    def test_shadowed_on_every_path_only(self):
+        report = analyze_routes(
+            [
+                route("wide", paths=["/api"], methods=["GET", "POST"], created_at=1),
+                route("narrow", paths=["/api/v1"], methods=["GET"], created_at=2),
+                route("longer", paths=["/api/v1"], methods=["GET", "PUT"]),
+                route("partial", paths=["/api/v1", "/other"], methods=["GET"]),
+            ]
+        )
+
+        # "longer" and "partial" are created first and accept every request
+        # "narrow" does, while their own PUTs and "/other" path stay reachable.
+        self.assertEqual([f.route["id"] for f in report.shadowed], ["narrow"])
+        self.assertEqual(
+            sorted(r["id"] for r in report.shadowed[0].others), ["longer", "partial"]
+        )
+
+    def test_wildcard_host_and_method_coverage(self):
+        report = analyze_routes(
+            [
+                route("any-method", paths=["/"], hosts=["*.example.com"]),
+                route(
+                    "get-only", paths=["/"], hosts=["*.example.com"], methods=["GET"]
+                ),
+                route("plain", paths=["/"], hosts=["www.example.com"], methods=["GET"]),
+            ]
+        )
+
+        # More specific routes rank ahead of less specific ones.
+        self.assertEqual(report.shadowed, [])
+
+    def test_more_specific_rules_shadowed(self):
+        report = analyze_routes(
+            [
+                route("post", paths=["/submit"], methods=["POST"], created_at=1),
+                route("post-again", paths=["/submit/form"], methods=["POST"]),
+                route("post-dup", paths=["/submit"], methods=["post"], created_at=2),
+            ]
+        )
+
+        self.assertEqual([f.route["id"] for f in report.shadowed], ["post-dup"])
+
+    def test_conflicting_services(self):
+        report = analyze_routes(
+            [
+                route("orders", service="s1", paths=["/orders"], hosts=["a.com"]),
+                route("legacy", service="s2", paths=["/orders"], hosts=["A.com"]),
+                route("other", service="s2", paths=["/orders"], hosts=["b.com"]),
+            ]
+        )
+
+        self.assertEqual(len(report.conflicts), 1)
+        conflict = report.conflicts[0]
+        self.assertEqual(conflict.route["id"], "orders")
+        self.assertEqual([r["id"] for r in conflict.others], ["legacy"])
+        self.assertEqual(conflict.path, "/orders")
+        self.assertEqual([f.route["id"] for f in report.shadowed], ["legacy"])
@@ -0,0 +1,217 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from requests import Session
+
+from src.kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.operations.key_rotation import (
+    KeyRotation,
+    RotationCheckpoint,
+)
+
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.json_data = json_data
+        self.content = json.dumps(json_data).encode("utf-8") if json_data else b""
+        self.ok = status_code < 400
+        self.status_code = status_code
+        self.text = "Mock API Error"
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(response=self)
+
+
+class TestKeyRotation(unittest.TestCase):
+    def setUp(self):
+        self.get_patcher = patch.object(Session, "get", return_value=MagicMock())
+        self.request_patcher = patch.object(Session, "request")
+
+        self.mock_get = self.get_patcher.start()
+        self.mock_request = self.request_patcher.start()
+        self.mock_request.side_effect = self.respond
+
+        self.keys = {"c1": ["old-1"], "c2": ["old-2"]}
+        self.tags = {}
+        self.failing = set()
+        self.writes = []
+
+        self.client = KongAPIClient(
+            "http://mock-url", admin_token="mock-pass"
+        ).get_kong_client()
+
+    def tearDown(self):
+        self.get_patcher.stop()
+        self.request_patcher.stop()
+
+    def respond(self, method, url, **kwargs):
+        path = url.replace("http://mock-url/default", "")
+        if method == "GET" and path.startswith("/key-auths"):
+            data = [
+                {
+                    "id": key_id,
+                    "consumer": {"id": consumer_id},
+                    "tags": self.tags.get(key_id),
+                }
+                for consumer_id, key_ids in self.keys.items()
+                for key_id in key_ids
+            ]
+            return MockResponse({"data": data, "next": None})
+        if method == "GET" and path.startswith("/consumers"):
+            data = [
+                {"id": consumer_id, "username": f"user-{consumer_id}"}
+                for consumer_id in self.keys
+            ]
+            return MockResponse({"data": data, "next": None})
+        consumer_id = path.split("/")[2]
+        if method == "POST":
+            if consumer_id in self.failing:
+                return MockResponse({"message": "boom"}, 500)
+            key_id = f"new-{consumer_id}"
+            self.keys[consumer_id].append(key_id)
+            self.tags[key_id] = kwargs["json"].get("tags")
+            return MockResponse({"id": key_id, "key": kwargs["json"].get("key")})
+        self.writes.append((method, path, kwargs.get("json")))
+        return MockResponse({})
+
+    def test_rotation_with_ttl(self):
+        rotation = KeyRotation(self.client, overlap=3600, max_workers=2)
+
+        metrics = rotation.run()
+
+        self.assertEqual(metrics.errors, 0)
+        self.assertEqual((metrics.provisioned, metrics.verified), (2, 2))
+        self.assertEqual(metrics.retired, 2)
+        self.assertEqual(
+            sorted(self.writes),
+            [
+                ("PATCH", "/consumers/c1/key-auth/old-1", {"ttl": 3600}),
+                ("PATCH", "/consumers/c2/key-auth/old-2", {"ttl": 3600}),
+            ],
+        )
+
+    def test_rotation_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rotation.json")
+            self.failing = {"c2"}
+
+            first = KeyRotation(
+                self.client,
+                consumers=["c1", "c2"],
+                use_ttl=False,
+                checkpoint=RotationCheckpoint.load(path),
+            ).run()
+
+            self.assertEqual(list(first.failed), ["c2"])
+            self.assertEqual(
+                self.writes, [("DELETE", "/consumers/c1/key-auth/old-1", None)]
+            )
+
+            self.failing = set()
+            self.writes = []
+            checkpoint = RotationCheckpoint.load(path)
+            self.assertEqual(checkpoint.consumers["c1"]["stage"], "retired")
+
+            second = KeyRotation(
+                self.client,
+                consumers=["c1", "c2"],
+                use_ttl=False,
+                checkpoint=checkpoint,
+            ).run()
+
+            self.assertTrue(second.provisioned == second.retired == 1)
+            self.assertEqual(
+                self.writes, [("DELETE", "/consumers/c2/key-auth/old-2", None)]
+            )
+
+    def test_resume_adopts_keys_added_before_a_crash(self):
+        # The first run added c1's new key but stopped before checkpointing it.
+        self.keys["c1"].append("new-c1")
+        self.tags["new-c1"] = ["rotation-1"]
+        checkpoint = RotationCheckpoint()
+        checkpoint.consumers["c1"] = {"old": ["old-1"], "new": None, "stage": None}
+
+        KeyRotation(
+            self.client,
+            consumers=["c1"],
+            use_ttl=False,
+            checkpoint=checkpoint,
+            tags=["rotation-1"],
+        ).run()
+
+        posts = [c for c in self.mock_request.call_args_list if c.args[0] == "POST"]
+        self.assertEqual(posts, [])
+        self.assertEqual(checkpoint.consumers["c1"]["new"], "new-c1")
+        self.assertEqual(
+            self.writes, [("DELETE", "/consumers/c1/key-auth/old-1", None)]
+        )
+
+    @patch("kong_gateway_client.operations.key_rotation.time.sleep")
+    def test_overlap_is_measured_per_consumer(self, sleep):
+        self.keys["c2"].append("new-c2")
+        checkpoint = RotationCheckpoint()
+        checkpoint.consumers = {
+            "c1": {
+                "old": ["old-1"],
+                "new": "new-c1",
+                "stage": "verified",
+                "verified_at": 0,
+            },
+            "c2": {"old": ["old-2"], "new": "new-c2", "stage": "provisioned"},
+        }
+
+        KeyRotation(
+            self.client,
+            consumers=["c1", "c2"],
+            overlap=60,
+            use_ttl=False,
+            checkpoint=checkpoint,
+            max_workers=1,
+        ).run()
+
+        # Only c2, verified in this run, waits out the overlap.
+        self.assertEqual(sleep.call_count, 1)
+        self.assertAlmostEqual(sleep.call_args.args[0], 60, delta=5)
+        self.assertEqual(len(self.writes), 2)
+
+    def test_usernames_are_resolved_to_ids(self):
+        checkpoint = RotationCheckpoint()
+
+        metrics = KeyRotation(
+            self.client,
+            consumers=["user-c1", "c1", "missing"],
+            use_ttl=False,
+            checkpoint=checkpoint,
+        ).run()
+
+        self.assertEqual(list(checkpoint.consumers), ["c1"])
+        self.assertEqual(checkpoint.consumers["c1"]["old"], ["old-1"])
+        self.assertEqual((metrics.total, metrics.retired), (2, 1))
+        self.assertEqual(list(metrics.failed), ["missing"])
+        self.assertEqual(
+            self.writes, [("DELETE", "/consumers/c1/key-auth/old-1", None)]
+        )
+        self.assertEqual(self.keys["c1"], ["old-1", "new-c1"])
+
+    def test_untagged_rotation_adopts_no_keys(self):
+        # Another operator added a key while the rotation was interrupted.
+        self.keys["c1"].append("foreign-c1")
+        checkpoint = RotationCheckpoint()
+        checkpoint.consumers["c1"] = {"old": ["old-1"], "new": None, "stage": None}
+
+        KeyRotation(
+            self.client, consumers=["c1"], use_ttl=False, checkpoint=checkpoint
+        ).run()
+
+        self.assertEqual(checkpoint.consumers["c1"]["new"], "new-c1")
+        self.assertEqual(checkpoint.consumers["c1"]["old"], ["old-1"])
+        self.assertEqual(
+            self.writes, [("DELETE", "/consumers/c1/key-auth/old-1", None)]
+        )
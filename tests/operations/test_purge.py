@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from requests import Session
+
+from src.kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.operations.purge import purge
+import json
+
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.json_data = json_data
+        self.content = json.dumps(json_data).encode("utf-8") if json_data else b""
+        self.ok = status_code < 400
+        self.status_code = status_code
+        self.text = "Mock API Error"
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(response=self)
+
+
+ENTITIES = {
+    "services": [{"id": "s1", "name": "orders"}],
+    "routes": [{"id": "r1", "name": "orders", "service": {"id": "s1"}}],
+    "plugins": [{"id": "p1", "name": "key-auth", "route": {"id": "r1"}}],
+    "consumers": [{"id": "c1", "username": "alice"}],
+    "consumer_groups": [],
+}
+
+
+class TestPurge(unittest.TestCase):
+    def setUp(self):
+        mock_response_auth = MagicMock()
+        self.get_patcher = patch.object(Session, "get", return_value=mock_response_auth)
+        self.request_patcher = patch.object(Session, "request")
+
+        self.mock_get = self.get_patcher.start()
+        self.mock_request = self.request_patcher.start()
+        self.mock_request.side_effect = self.respond
+        self.deletes = []
+
+        self.client = KongAPIClient(
+            "http://mock-url", admin_token="mock-pass"
+        ).get_kong_client()
+
+    def tearDown(self):
+        self.get_patcher.stop()
+        self.request_patcher.stop()
+
+    def respond(self, method, url, **kwargs):
+        path = url.replace("http://mock-url", "")
+        if method == "GET":
+            entity_type = path.split("/")[2].split("?")[0]
+            return MockResponse({"data": ENTITIES[entity_type], "next": None})
+        self.deletes.append(path)
+        if path.endswith("/plugins/p1"):
+            return MockResponse({"message": "Not found"}, status_code=404)
+        return MockResponse({})
+
+    def test_purge_workspace_in_reverse_dependency_order(self):
+        result = purge(self.client, workspace="tenant-a", max_workers=1)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(
+            self.deletes,
+            [
+                "/tenant-a/plugins/p1",
+                "/tenant-a/routes/r1",
+                "/tenant-a/services/s1",
+                "/tenant-a/consumers/c1",
+                "/workspaces/tenant-a",
+            ],
+        )
+        self.assertEqual(result.already_gone, {"plugins": 1})
+        self.assertEqual(result.deleted["services"], 1)
+        self.assertTrue(result.workspace_deleted)
+
+    def test_purge_by_tags_filters_and_keeps_workspace(self):
+        result = purge(self.client, tags=["ephemeral", "ci"])
+
+        fetched = [c[0][1] for c in self.mock_request.call_args_list if c[0][0] == "GET"]
+        self.assertTrue(all(url.endswith("?tags=ephemeral,ci") for url in fetched))
+        self.assertFalse(result.workspace_deleted)
+        self.assertNotIn("/workspaces/default", self.deletes)
+
+    def test_purge_requires_a_scope(self):
+        with self.assertRaises(ValueError):
+            purge(self.client)
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from requests import Session
+
+from src.kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.operations.rollout import (
+    RolloutRecord,
+    TargetSelector,
+    rollback_plugin,
+    rollout_plugin,
+)
+from kong_gateway_client.state.snapshot import WorkspaceSnapshot
+
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.json_data = json_data
+        self.content = json.dumps(json_data).encode("utf-8") if json_data else b""
+        self.ok = status_code < 400
+        self.status_code = status_code
+        self.text = "Mock API Error"
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(response=self)
+
+
+SERVICES = [
+    {"id": "s1", "name": "orders", "tags": ["public", "billing"]},
+    {"id": "s2", "name": "users", "tags": ["public"]},
+    {"id": "s3", "name": "admin", "tags": ["internal"]},
+    {"id": "s4", "name": "search", "tags": ["public"]},
+]
+
+
+class TestRollout(unittest.TestCase):
+    def setUp(self):
+        self.get_patcher = patch.object(Session, "get", return_value=MagicMock())
+        self.request_patcher = patch.object(Session, "request")
+
+        self.mock_get = self.get_patcher.start()
+        self.mock_request = self.request_patcher.start()
+        self.mock_request.side_effect = self.respond
+        self.failing = set()
+        self.deleted = []
+
+        self.client = KongAPIClient(
+            "http://mock-url", admin_token="mock-pass"
+        ).get_kong_client()
+
+    def tearDown(self):
+        self.get_patcher.stop()
+        self.request_patcher.stop()
+
+    def respond(self, method, url, **kwargs):
+        path = url.replace("http://mock-url/default", "")
+        if method == "PUT":
+            body = kwargs["json"]
+            if body["service"]["id"] in self.failing:
+                return MockResponse({"message": "boom"}, 500)
+            return MockResponse({"id": path.split("/")[-1], **body})
+        if method == "DELETE":
+            self.deleted.append(path)
+            return MockResponse({}, 404 if path.endswith("gone") else 204)
+        return MockResponse({"data": [], "next": None})
+
+    def snapshot(self, plugins=()):
+        return WorkspaceSnapshot({"services": SERVICES, "plugins": list(plugins)})
+
+    def test_rollout_in_waves_by_tag(self):
+        existing = {"id": "p0", "name": "key-auth", "service": {"id": "s4"}}
+        waves = []
+
+        record = rollout_plugin(
+            self.client,
+            "key-auth",
+            TargetSelector(tags=["public"]),
+            config={"key_names": ["apikey"]},
+            wave_size=1,
+            snapshot=self.snapshot([existing]),
+            on_wave=lambda r: waves.append(len(r.created)),
+        )
+
+        self.assertTrue(record.ok)
+        self.assertEqual([e["target_id"] for e in record.created], ["s1", "s2"])
+        self.assertEqual(record.existing, ["s4"])
+        self.assertEqual(waves, [1, 2])
+        self.assertEqual(
+            record.plugin_ids[0],
+            self.client.plugin_resource.id_for("key-auth", service_id="s1"),
+        )
+
+    def test_rollout_halts_after_failures(self):
+        self.failing = {"s1"}
+
+        record = rollout_plugin(
+            self.client,
+            "key-auth",
+            TargetSelector(predicate=lambda s: s["name"] != "admin"),
+            wave_size=1,
+            snapshot=self.snapshot(),
+        )
+
+        self.assertFalse(record.ok)
+        self.assertEqual([t for t, _ in record.failed], ["s1"])
+        self.assertEqual(record.pending, ["s2", "s4"])
+
+    def test_rollback_from_saved_record(self):
+        record = RolloutRecord("key-auth")
+        record.created = [
+            {"id": "p1", "entity_type": "services", "target_id": "s1"},
+            {"id": "gone", "entity_type": "services", "target_id": "s2"},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rollout.json")
+            record.save(path)
+            loaded = RolloutRecord.load(path)
+
+        result = rollback_plugin(self.client, loaded)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.deleted, ["p1"])
+        self.assertEqual(result.already_gone, ["gone"])
+        self.assertEqual(sorted(self.deleted), ["/plugins/gone", "/plugins/p1"])
+
+    def test_selector_rejects_unknown_entity_type(self):
+        with self.assertRaises(ValueError):
+            TargetSelector(entity_type="consumers")
@@ -0,0 +1,70 @@
+import threading
+import unittest
+
+from kong_gateway_client.common import ResponseObject
+from kong_gateway_client.operations.scheduler import WriteScheduler
+
+
+class TestWriteScheduler(unittest.TestCase):
+    def test_results_flow_into_dependents(self):
+        scheduler = WriteScheduler()
+        service = scheduler.submit(
+            "service", lambda name: ResponseObject({"id": f"{name}-id"}), "orders"
+        )
+        scheduler.submit(
+            "route", lambda payload: payload, {"service": {"id": service.id}}
+        )
+
+        result = scheduler.run()
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result["route"], {"service": {"id": "orders-id"}})
+
+    def test_refs_to_fields_named_like_internals(self):
+        scheduler = WriteScheduler()
+        credential = scheduler.submit(
+            "credential", lambda: {"key": "secret", "resolve": "yes"}
+        )
+        scheduler.submit(
+            "use", lambda *values: values, credential.key, credential["resolve"]
+        )
+
+        self.assertEqual(scheduler.run()["use"], ("secret", "yes"))
+
+    def test_independent_operations_run_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=5)
+        scheduler = WriteScheduler(max_workers=3)
+        for name in ("a", "b", "c"):
+            scheduler.submit(name, barrier.wait)
+
+        # The barrier only releases if all three calls are in flight together.
+        self.assertTrue(scheduler.run().ok)
+
+    def test_failure_skips_dependents_only(self):
+        def fail():
+            raise ValueError("boom")
+
+        scheduler = WriteScheduler()
+        broken = scheduler.submit("service", fail)
+        scheduler.submit("route", lambda value: value, broken.id)
+        scheduler.submit("plugin", lambda: "ok", depends_on=["route"])
+        scheduler.submit("consumer", lambda: "consumer")
+
+        result = scheduler.run()
+
+        self.assertIsInstance(result.errors["service"], ValueError)
+        self.assertEqual(sorted(result.skipped), ["plugin", "route"])
+        self.assertEqual(result["consumer"], "consumer")
+
+    def test_cycle_raises(self):
+        scheduler = WriteScheduler()
+        scheduler.submit("a", lambda: None, depends_on=["b"])
+        scheduler.submit("b", lambda: None, depends_on=["a"])
+        with self.assertRaises(ValueError):
+            scheduler.run()
+
+    def test_duplicate_key_raises(self):
+        scheduler = WriteScheduler()
+        scheduler.submit("a", lambda: None)
+        with self.assertRaises(ValueError):
+            scheduler.submit("a", lambda: None)
@@ -1,3 +1,4 @@
+import io
 import unittest
 from unittest.mock import MagicMock, patch
 from requests import Session
@@ -325,3 +326,125 @@ class TestConsumerKeyAuth(unittest.TestCase):
         result = self.client.consumer.add_key_auth("test-consumer")
 
         self.assertEqual(result.key, "5SRmk6gLnTy1SyQ1Cl9GzoRXJbjYGGbZ")
+
+    def test_consumer_upsert(self):
+        consumer_id = self.client.consumer.id_for("test-consumer-1")
+        mock_response = MockResponse({"id": consumer_id, "username": "test-consumer-1"})
+        self.mock_request.return_value = mock_response
+
+        result = self.client.consumer.upsert("test-consumer-1", custom_id="custom-1")
+
+        method, url = self.mock_request.call_args[0]
+        self.assertEqual(method, "PUT")
+        self.assertEqual(url, f"http://mock-url/default/consumers/{consumer_id}")
+        self.assertEqual(result.username, "test-consumer-1")
+
+    def test_consumer_upsert_by_keyword(self):
+        consumer_id = self.client.consumer.id_for(username="test-consumer-1")
+        self.mock_request.return_value = MockResponse(
+            {"id": consumer_id, "username": "test-consumer-1"}
+        )
+
+        result = self.client.consumer.upsert(username="test-consumer-1")
+
+        _, url = self.mock_request.call_args[0]
+        self.assertEqual(url, f"http://mock-url/default/consumers/{consumer_id}")
+        self.assertEqual(result.username, "test-consumer-1")
+        with self.assertRaises(ValueError):
+            self.client.consumer.upsert(username="")
+
+    def test_export_credentials(self):
+        pages = {
+            "http://mock-url/default/consumers?size=1000": {
+                "data": [{"id": "c1", "username": "alice"}, {"id": "c2"}],
+                "next": None,
+            },
+            "http://mock-url/default/acls?size=1000": {
+                "data": [
+                    {"id": "a1", "group": "gold", "consumer": {"id": "c1"}},
+                    {"id": "a2", "group": "beta", "consumer": {"id": "c1"}},
+                ],
+                "next": None,
+            },
+            "http://mock-url/default/key-auths?size=1000": {
+                "data": [{"id": "k1", "key": "secret", "consumer": {"id": "c2"}}],
+                "next": None,
+            },
+        }
+        self.mock_request.side_effect = lambda method, url, **kwargs: MockResponse(
+            pages[url]
+        )
+        stream = io.StringIO()
+
+        count = self.client.consumer.export_credentials(stream)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(self.mock_request.call_count, 3)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(records[0]["consumer"]["username"], "alice")
+        self.assertEqual([acl["group"] for acl in records[0]["acls"]], ["gold", "beta"])
+        self.assertEqual(records[0]["key_auths"], [])
+        self.assertEqual(records[1]["acls"], [])
+        self.assertEqual(records[1]["key_auths"], [{"id": "k1", "key": "secret"}])
+
+    def test_sync_acls(self):
+        pages = {
+            "http://mock-url/default/acls?size=1000": {
+                "data": [
+                    {"id": "a1", "group": "gold", "consumer": {"id": "c1"}},
+                    {"id": "a2", "group": "beta", "consumer": {"id": "c1"}},
+                    {"id": "a3", "group": "free", "consumer": {"id": "c3"}},
+                ],
+                "next": None,
+            },
+            "http://mock-url/default/consumers?size=1000": {
+                "data": [{"id": "c1"}, {"id": "c2", "username": "bob"}],
+                "next": None,
+            },
+        }
+
+        def request(method, url, **kwargs):
+            if method == "GET":
+                return MockResponse(pages[url])
+            return MockResponse({"id": "new", "group": kwargs.get("json", {})})
+
+        self.mock_request.side_effect = request
+
+        result = self.client.consumer.sync_acls(
+            {"c1": ["gold", "silver"], "bob": ["free"], "ghost": ["gold"]}
+        )
+
+        self.assertEqual(sorted(result.added), [("c1", "silver"), ("c2", "free")])
+        self.assertEqual(result.removed, [("c1", "beta")])
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual([(c, g) for c, g, _ in result.failed], [("ghost", "gold")])
+        deletes = [c for c in self.mock_request.call_args_list if c.args[0] == "DELETE"]
+        self.assertEqual(
+            deletes[0].args[1], "http://mock-url/default/consumers/c1/acls/a2"
+        )
+
+    def test_sync_acls_merges_keys_for_the_same_consumer(self):
+        pages = {
+            "http://mock-url/default/acls?size=1000": {
+                "data": [{"id": "a1", "group": "gold", "consumer": {"id": "c2"}}],
+                "next": None,
+            },
+            "http://mock-url/default/consumers?size=1000": {
+                "data": [{"id": "c2", "username": "bob"}],
+                "next": None,
+            },
+        }
+
+        def request(method, url, **kwargs):
+            if method == "GET":
+                return MockResponse(pages[url])
+            return MockResponse({"id": "new", "group": kwargs.get("json", {})})
+
+        self.mock_request.side_effect = request
+
+        result = self.client.consumer.sync_acls({"c2": ["gold"], "bob": ["free"]})
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.added, [("c2", "free")])
+        self.assertEqual(result.removed, [])
+        self.assertEqual(result.unchanged, 1)
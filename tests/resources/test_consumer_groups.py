@@ -1,5 +1,6 @@
 import unittest
 from unittest.mock import MagicMock, patch
+import requests
 from requests import Session
 
 from src.kong_gateway_client.api import KongAPIClient
@@ -153,3 +154,214 @@ class TestConsumerGroup(unittest.TestCase):
         self.assertEqual(result.config["window_size"][0], 60)
         self.assertEqual(result.group, "456")
         self.assertEqual(result.plugin, "rate-limiting-advanced")
+
+    def test_consumer_group_add_consumers_in_batches(self):
+        self.mock_request.return_value = MockResponse({"consumers": []})
+
+        result = self.client.consumer_group.add_consumers(
+            "test-group", ["c1", "c2", "c3", "c4", "c5"], batch_size=2
+        )
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.added, ["c1", "c2", "c3", "c4", "c5"])
+        bodies = sorted(
+            call.kwargs["json"]["consumer"]
+            for call in self.mock_request.call_args_list
+        )
+        self.assertEqual(bodies, [["c1", "c2"], ["c3", "c4"], ["c5"]])
+
+    def test_consumer_group_add_consumers_retries_conflicting_batches(self):
+        def request(method, url, json=None, **kwargs):
+            consumers = json["consumer"]
+            if "c2" in consumers or "c3" in consumers:
+                conflict = MockResponse({})
+                conflict.status_code = 409
+                raise requests.HTTPError(response=conflict)
+            return MockResponse({"consumers": []})
+
+        self.mock_request.side_effect = request
+
+        result = self.client.consumer_group.add_consumers(
+            "test-group", ["c1", "c2", "c3", "c4", "c5"], batch_size=2, max_workers=1
+        )
+
+        self.assertTrue(result.ok)
+        self.assertEqual(sorted(result.added), ["c1", "c4", "c5"])
+        self.assertEqual(result.unchanged, 2)
+
+    def test_consumer_group_remove_consumers_tolerates_missing(self):
+        missing = MockResponse({})
+        missing.status_code = 404
+        error = requests.HTTPError(response=missing)
+
+        def request(method, url, **kwargs):
+            if url.endswith("/consumers/gone"):
+                raise error
+            if url.endswith("/consumers/broken"):
+                raise requests.HTTPError(response=MagicMock(status_code=500))
+            return MockResponse({})
+
+        self.mock_request.side_effect = request
+
+        result = self.client.consumer_group.remove_consumers(
+            "test-group", ["c1", "gone", "broken"]
+        )
+
+        self.assertEqual(result.removed, ["c1", "gone"])
+        self.assertEqual([item for item, _ in result.failed], ["broken"])
+
+    def test_consumer_group_sync_members(self):
+        current = {
+            "consumers": [
+                {"id": "1", "username": "alice"},
+                {"id": "2", "username": "bob"},
+                {"id": "3", "username": "carol"},
+            ]
+        }
+
+        def request(method, url, **kwargs):
+            if method == "GET":
+                return MockResponse(current)
+            return MockResponse({})
+
+        self.mock_request.side_effect = request
+
+        result = self.client.consumer_group.sync_members(
+            "test-group", ["alice", "2", "dave", "erin"]
+        )
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.added, ["dave", "erin"])
+        self.assertEqual(result.removed, ["3"])
+        self.assertEqual(result.unchanged, 2)
+        posts = [c for c in self.mock_request.call_args_list if c.args[0] == "POST"]
+        self.assertEqual(len(posts), 1)
+        self.assertEqual(posts[0].kwargs["json"], {"consumer": ["dave", "erin"]})
+
+    def test_consumer_group_iter_consumers_paginates(self):
+        pages = {
+            "http://mock-url/default/consumer_groups/test-group/consumers?size=2": {
+                "data": [{"id": "1"}, {"id": "2"}],
+                "next": "/consumer_groups/test-group/consumers?offset=abc",
+            },
+            "http://mock-url/default/consumer_groups/test-group/consumers?offset=abc": {
+                "data": [{"id": "3", "username": "carol"}],
+                "next": None,
+            },
+        }
+        self.mock_request.side_effect = lambda method, url, **kwargs: MockResponse(
+            pages[url]
+        )
+
+        consumers = self.client.consumer_group.iter_consumers("test-group", size=2)
+
+        self.assertEqual([c.id for c in consumers], ["1", "2", "3"])
+        self.assertEqual(self.mock_request.call_count, 2)
+
+    def test_consumer_group_iter_consumers_legacy_response(self):
+        self.mock_request.return_value = MockResponse(
+            {"consumer_group": {"id": "456"}, "consumers": [{"id": "1"}]}
+        )
+
+        consumers = list(self.client.consumer_group.iter_consumers("test-group"))
+
+        self.assertEqual(len(consumers), 1)
+        self.assertEqual(consumers[0].id, "1")
+
+    def test_consumer_group_iter_consumers_empty_response(self):
+        self.mock_request.return_value = MockResponse({})
+
+        consumers = list(self.client.consumer_group.iter_consumers("test-group"))
+
+        self.assertEqual(consumers, [])
+        self.assertEqual(self.client.consumer_group.count_consumers("test-group"), 0)
+
+    def test_consumer_group_count_consumers(self):
+        self.mock_request.return_value = MockResponse(
+            {"data": [{"id": str(i)} for i in range(3)], "next": None}
+        )
+
+        self.assertEqual(self.client.consumer_group.count_consumers("test-group"), 3)
+
+    def test_consumer_group_build_membership_index(self):
+        base = "http://mock-url/default/consumer_groups"
+        pages = {
+            base: {
+                "data": [{"id": "g1", "name": "gold"}, {"id": "g2", "name": "free"}],
+                "next": None,
+            },
+            f"{base}/g1/consumers?size=1000": {
+                "data": [{"id": "c1", "username": "alice"}, {"id": "c2"}],
+                "next": None,
+            },
+            f"{base}/g2/consumers?size=1000": {
+                "data": [{"id": "c2"}, {"id": "c3"}],
+                "next": None,
+            },
+        }
+        self.mock_request.side_effect = lambda method, url, **kwargs: MockResponse(
+            pages[url]
+        )
+
+        index = self.client.consumer_group.build_membership_index()
+
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.groups_of("c2"), ["g1", "g2"])
+        self.assertEqual(index.groups_of("alice"), ["g1"])
+        self.assertEqual(index.members_of("free"), ["c2", "c3"])
+        self.assertTrue(index.is_member("c3", "g2"))
+        self.assertFalse(index.is_member("c3", "gold"))
+        self.assertFalse(index.is_member("unknown", "g1"))
+        self.assertEqual(index.groups_of("unknown"), [])
+
+    def rate_limit_response(self, url):
+        self.assertTrue(url.endswith("/overrides/plugins/rate-limiting-advanced"))
+        group = url.split("/")[-4]
+        overrides = {
+            "gold": {"limit": [100], "window_size": [60], "window_type": "sliding"},
+            "silver": {"limit": [10], "window_size": [60], "window_type": "sliding"},
+        }
+        if group not in overrides:
+            missing = MockResponse({"message": "Not found"})
+            missing.status_code = 404
+            raise requests.HTTPError(response=missing)
+        return MockResponse(
+            {
+                "group": f"id-{group}",
+                "plugin": "rate-limiting-advanced",
+                "config": {**overrides[group], "retry_after_jitter_max": 0},
+            }
+        )
+
+    def test_consumer_group_get_rate_limits(self):
+        self.mock_request.side_effect = lambda method, url, **kwargs: (
+            self.rate_limit_response(url)
+        )
+
+        overrides = self.client.consumer_group.get_rate_limits(["gold", "bronze"])
+
+        self.assertEqual(overrides["gold"].config["limit"], [100])
+        self.assertEqual(overrides["gold"].group, "id-gold")
+        self.assertIsNone(overrides["bronze"])
+
+    def test_consumer_group_sync_rate_limits(self):
+        def request(method, url, **kwargs):
+            if method == "GET":
+                return self.rate_limit_response(url)
+            return MockResponse({"config": kwargs["json"]["config"]})
+
+        self.mock_request.side_effect = request
+
+        result = self.client.consumer_group.sync_rate_limits(
+            {
+                "gold": {"limit": [100], "window_size": [60]},
+                "silver": {"limit": [20], "window_size": [60]},
+                "bronze": {"limit": [5], "window_size": [60], "window_type": "fixed"},
+            }
+        )
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.unchanged, ["gold"])
+        self.assertEqual(sorted(result.updated), ["bronze", "silver"])
+        puts = [c for c in self.mock_request.call_args_list if c.args[0] == "PUT"]
+        self.assertEqual(len(puts), 2)
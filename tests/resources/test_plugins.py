@@ -216,3 +216,22 @@ class TestPluginResource(unittest.TestCase):
             "http://mock-url/default/consumers/test-consumer/plugins/789",
             verify=False,
         )
+
+    def test_upsert_plugin(self):
+        plugin_id = self.client.plugin_resource.id_for("key-auth", service_id="123")
+        mock_response = MockResponse({"id": plugin_id, "name": "key-auth"})
+        self.mock_request.return_value = mock_response
+
+        result = self.client.plugin_resource.upsert("key-auth", service_id="123")
+
+        method, url = self.mock_request.call_args[0]
+        self.assertEqual(method, "PUT")
+        self.assertEqual(url, f"http://mock-url/default/plugins/{plugin_id}")
+        self.assertEqual(
+            self.mock_request.call_args[1]["json"],
+            {"name": "key-auth", "service": {"id": "123"}},
+        )
+        self.assertEqual(result.id, plugin_id)
+        self.assertNotEqual(
+            plugin_id, self.client.plugin_resource.id_for("key-auth", route_id="123")
+        )
@@ -134,3 +134,21 @@ class TestService(unittest.TestCase):
 
         result = self.client.service.delete("123")
         self.assertIsNone(result)
+
+    def test_service_upsert(self):
+        service_id = self.client.service.id_for("test-service-1")
+        mock_response = MockResponse({"id": service_id, "name": "test-service-1"})
+        self.mock_request.return_value = mock_response
+
+        result = self.client.service.upsert(
+            "test-service-1", url="http://test-service-1"
+        )
+
+        method, url = self.mock_request.call_args[0]
+        self.assertEqual(method, "PUT")
+        self.assertEqual(url, f"http://mock-url/default/services/{service_id}")
+        self.assertEqual(
+            self.mock_request.call_args[1]["json"],
+            {"name": "test-service-1", "url": "http://test-service-1"},
+        )
+        self.assertEqual(result.id, service_id)
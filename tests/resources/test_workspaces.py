@@ -31,8 +31,6 @@ class TestWorkspace(unittest.TestCase):
         self.request_patcher = patch.object(
             Session, "request", return_value=mock_response_auth
         )
-        self.mock_request = self.request_patcher.start()
-
         self.mock_get = self.get_patcher.start()
 
         self.mock_request = self.request_patcher.start()
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from requests import Session
+
+from src.kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.state.clone import copy_workspace
+from kong_gateway_client.utils.ids import deterministic_id
+import json
+
+
+class MockResponse:
+    def __init__(self, json_data):
+        self.json_data = json_data
+        self.content = json.dumps(json_data).encode("utf-8") if json_data else b""
+        self.ok = True
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        pass
+
+
+PAGES = {
+    "/services?size=1": {
+        "data": [{"id": "s1", "name": "orders", "created_at": 1}],
+        "next": "/services?offset=s1",
+    },
+    "/services?offset=s1": {"data": [{"id": "s2", "name": "billing"}], "next": None},
+    "/routes?size=1": {
+        "data": [{"id": "r1", "name": "orders", "service": {"id": "s1"}}],
+        "next": None,
+    },
+}
+
+
+class TestCopyWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.get_patcher = patch.object(Session, "get", return_value=MagicMock())
+        self.request_patcher = patch.object(Session, "request")
+
+        self.mock_get = self.get_patcher.start()
+        self.mock_request = self.request_patcher.start()
+        self.mock_request.side_effect = self.respond
+        self.writes = {}
+
+        self.source = KongAPIClient(
+            "http://source", admin_token="mock-pass"
+        ).get_kong_client()
+        self.target = KongAPIClient(
+            "http://target", admin_token="mock-pass"
+        ).get_kong_client()
+
+    def tearDown(self):
+        self.get_patcher.stop()
+        self.request_patcher.stop()
+
+    def respond(self, method, url, **kwargs):
+        if method == "GET":
+            path = url.split("/default", 1)[1]
+            return MockResponse(PAGES.get(path, {"data": [], "next": None}))
+        self.writes[url] = kwargs["json"]
+        return MockResponse({"id": url.rsplit("/", 1)[1]})
+
+    def test_cross_cluster_copy_preserves_ids(self):
+        result = copy_workspace(self.source, self.target, page_size=1, queue_size=1)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.copied, {"services": 2, "routes": 1})
+        self.assertEqual(
+            self.writes["http://target/default/services/s1"], {"name": "orders"}
+        )
+        self.assertEqual(
+            self.writes["http://target/default/routes/r1"]["service"], {"id": "s1"}
+        )
+
+    def test_same_cluster_copy_remaps_ids_and_foreign_keys(self):
+        result = copy_workspace(
+            self.source,
+            self.source,
+            target_workspace="green",
+            page_size=1,
+            max_workers=2,
+        )
+
+        service_id = deterministic_id("services", "s1", "green")
+        route_id = deterministic_id("routes", "r1", "green")
+        self.assertTrue(result.ok)
+        self.assertIn(f"http://source/green/services/{service_id}", self.writes)
+        self.assertEqual(
+            self.writes[f"http://source/green/routes/{route_id}"]["service"],
+            {"id": service_id},
+        )
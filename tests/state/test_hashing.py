@@ -0,0 +1,141 @@
+import unittest
+
+from kong_gateway_client.common import ResponseObject
+from kong_gateway_client.resources.services import KongService
+from kong_gateway_client.state.hashing import WorkspaceDigest, entity_hash
+from kong_gateway_client.state.snapshot import WorkspaceSnapshot
+
+
+def make_snapshot(prefix, port=8080, created_at=1):
+    return WorkspaceSnapshot(
+        {
+            "services": [
+                {
+                    "id": f"{prefix}-s1",
+                    "name": "orders",
+                    "host": "orders",
+                    "port": port,
+                    "protocol": "http",
+                    "created_at": created_at,
+                },
+                {"id": f"{prefix}-s2", "name": "billing", "host": "billing"},
+            ],
+            "routes": [
+                {
+                    "id": f"{prefix}-r1",
+                    "name": "orders",
+                    "paths": ["/orders"],
+                    "service": {"id": f"{prefix}-s1"},
+                    "updated_at": created_at,
+                }
+            ],
+        }
+    )
+
+
+class TestEntityHash(unittest.TestCase):
+    def test_hash_ignores_key_order_server_fields_and_nulls(self):
+        first = {"name": "orders", "host": "orders", "created_at": 1, "path": None}
+        second = {"host": "orders", "name": "orders", "created_at": 2}
+        self.assertEqual(entity_hash(first), entity_hash(second))
+        self.assertNotEqual(entity_hash(first), entity_hash({"name": "billing"}))
+
+    def test_hash_accepts_models(self):
+        data = {"id": "1", "name": "orders", "host": "orders"}
+        service = KongService(ResponseObject(data))
+        self.assertEqual(entity_hash(service), entity_hash(data))
+
+
+class TestWorkspaceDigest(unittest.TestCase):
+    def test_identical_workspaces_on_different_clusters_match(self):
+        first = WorkspaceDigest.from_snapshot(make_snapshot("a", created_at=1))
+        second = WorkspaceDigest.from_snapshot(make_snapshot("b", created_at=2))
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.diff(second), {})
+
+    def test_non_portable_digest_includes_ids(self):
+        first = WorkspaceDigest.from_snapshot(make_snapshot("a"), portable=False)
+        second = WorkspaceDigest.from_snapshot(make_snapshot("b"), portable=False)
+        self.assertNotEqual(first, second)
+
+    def test_diff_reports_only_changed_entities(self):
+        first = WorkspaceDigest.from_snapshot(make_snapshot("a"))
+        second = WorkspaceDigest.from_snapshot(make_snapshot("a", port=9090))
+
+        changes = first.diff(second)
+        self.assertEqual(list(changes), ["services"])
+        self.assertEqual(changes["services"].changed, ["orders"])
+        self.assertEqual(changes["services"].added, [])
+
+    def test_document_matches_snapshot(self):
+        document = {
+            "services": [
+                {"name": "orders", "url": "http://orders:8080"},
+                {"name": "billing", "host": "billing"},
+            ],
+            "routes": [{"name": "orders", "paths": ["/orders"], "service": "orders"}],
+        }
+        self.assertEqual(
+            WorkspaceDigest.from_document(document),
+            WorkspaceDigest.from_snapshot(make_snapshot("a")),
+        )
+
+    def test_declared_fields_ignore_server_defaults(self):
+        snapshot = WorkspaceSnapshot(
+            {
+                "services": [
+                    {
+                        "id": "s1",
+                        "name": "orders",
+                        "host": "orders",
+                        "port": 8080,
+                        "protocol": "http",
+                        "path": None,
+                        "retries": 5,
+                        "connect_timeout": 60000,
+                        "enabled": True,
+                    }
+                ],
+                "routes": [
+                    {
+                        "id": "r1",
+                        "name": "orders",
+                        "paths": ["/orders"],
+                        "protocols": ["http", "https"],
+                        "strip_path": True,
+                        "service": {"id": "s1"},
+                    }
+                ],
+                "plugins": [
+                    {
+                        "id": "p1",
+                        "name": "rate-limiting",
+                        "route": {"id": "r1"},
+                        "enabled": True,
+                        "protocols": ["grpc", "grpcs", "http", "https"],
+                        "config": {"minute": 10, "policy": "local"},
+                    }
+                ],
+            }
+        )
+        document = {
+            "services": [{"name": "orders", "url": "http://orders:8080"}],
+            "routes": [{"name": "orders", "paths": ["/orders"], "service": "orders"}],
+            "plugins": [
+                {"name": "rate-limiting", "route": "orders", "config": {"minute": 10}}
+            ],
+        }
+
+        desired = WorkspaceDigest.from_document(document)
+        self.assertNotEqual(desired, WorkspaceDigest.from_snapshot(snapshot))
+        self.assertEqual(
+            desired, WorkspaceDigest.from_snapshot(snapshot, declared=document)
+        )
+
+        document["plugins"][0]["config"]["minute"] = 20
+        changes = WorkspaceDigest.from_document(document).diff(
+            WorkspaceDigest.from_snapshot(snapshot, declared=document)
+        )
+        self.assertEqual(list(changes), ["plugins"])
+        self.assertEqual(len(changes["plugins"].changed), 1)
@@ -0,0 +1,151 @@
+import unittest
+from itertools import count
+from unittest.mock import MagicMock, patch
+from requests import Session
+
+from src.kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.state.mirror import WorkspaceMirror
+import json
+
+
+class MockResponse:
+    def __init__(self, json_data):
+        self.json_data = json_data
+        self.content = json.dumps(json_data).encode("utf-8") if json_data else b""
+        self.ok = True
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        pass
+
+
+class TestWorkspaceMirror(unittest.TestCase):
+    def setUp(self):
+        self.get_patcher = patch.object(Session, "get", return_value=MagicMock())
+        self.request_patcher = patch.object(Session, "request")
+
+        self.mock_get = self.get_patcher.start()
+        self.mock_request = self.request_patcher.start()
+        self.mock_request.side_effect = self.respond
+
+        self.primary_entities = {
+            "services": [
+                {"id": "s1", "name": "orders", "created_at": 1, "updated_at": 1}
+            ],
+            "routes": [],
+        }
+        self.secondary_entities = {
+            "services": [],
+            "routes": [{"id": "old", "name": "stale"}],
+        }
+        self.calls = []
+
+        self.primary = KongAPIClient(
+            "http://primary", admin_token="mock-pass"
+        ).get_kong_client()
+        self.secondary = KongAPIClient(
+            "http://secondary", admin_token="mock-pass"
+        ).get_kong_client()
+        self.mirror = WorkspaceMirror(
+            self.primary,
+            self.secondary,
+            full_check_every=100,
+            entity_types=["services", "routes"],
+            max_workers=1,
+        )
+
+    def tearDown(self):
+        self.get_patcher.stop()
+        self.request_patcher.stop()
+
+    def respond(self, method, url, **kwargs):
+        self.calls.append((method, url))
+        if url.endswith("/meta"):
+            counts = {t: len(e) for t, e in self.primary_entities.items()}
+            return MockResponse({"counts": counts})
+        if method == "GET":
+            host, entity_type = url.split("?")[0].split("/default/")
+            source = (
+                self.primary_entities
+                if host == "http://primary"
+                else self.secondary_entities
+            )
+            data = source[entity_type]
+            if "sort_by=updated_at" in url:
+                data = sorted(data, key=lambda e: e.get("updated_at") or 0)[-1:]
+            return MockResponse({"data": data, "next": None})
+        return MockResponse({})
+
+    def test_first_cycle_reconciles_secondary(self):
+        changes = self.mirror.sync_once()
+
+        self.assertEqual(changes["services"].added, ["s1"])
+        self.assertEqual(changes["routes"].removed, ["old"])
+        writes = [call for call in self.calls if call[0] in ("PUT", "DELETE")]
+        self.assertEqual(
+            writes,
+            [
+                ("PUT", "http://secondary/default/services/s1"),
+                ("DELETE", "http://secondary/default/routes/old"),
+            ],
+        )
+        self.assertIsNotNone(self.mirror.metrics.replication_lag_seconds)
+
+    def test_unchanged_types_only_cost_the_meta_call_and_probes(self):
+        self.mirror.sync_once()
+        self.calls.clear()
+
+        self.assertEqual(self.mirror.sync_once(), {})
+        probe = "?size=1&sort_by=updated_at&sort_desc=true"
+        self.assertEqual(
+            self.calls,
+            [
+                ("GET", "http://primary/workspaces/default/meta"),
+                ("GET", f"http://primary/default/services{probe}"),
+                ("GET", f"http://primary/default/routes{probe}"),
+            ],
+        )
+
+    def test_in_place_update_is_mirrored_without_a_full_check(self):
+        self.mirror.sync_once()
+        self.primary_entities["services"][0].update(name="checkout", updated_at=2)
+        self.calls.clear()
+
+        changes = self.mirror.sync_once()
+
+        self.assertEqual(list(changes), ["services"])
+        self.assertEqual(changes["services"].changed, ["s1"])
+        self.assertIn(("PUT", "http://secondary/default/services/s1"), self.calls)
+        self.assertEqual(self.mirror.metrics.last_changed_types, ["services"])
+
+        # The update has been seen, so the next cycle does not refetch.
+        self.calls.clear()
+        self.assertEqual(self.mirror.sync_once(), {})
+        self.assertEqual(len(self.calls), 3)
+
+    def test_changed_type_is_refetched_and_diffed(self):
+        self.mirror.sync_once()
+        self.primary_entities["services"].append({"id": "s2", "name": "billing"})
+        self.calls.clear()
+
+        changes = self.mirror.sync_once()
+
+        self.assertEqual(list(changes), ["services"])
+        self.assertEqual(changes["services"].added, ["s2"])
+        self.assertIn(("PUT", "http://secondary/default/services/s2"), self.calls)
+        self.assertEqual(self.mirror.metrics.upserts_total, 2)
+
+    @patch("kong_gateway_client.state.mirror.time.time", side_effect=count())
+    def test_lag_only_resets_after_refetching_every_type(self, _):
+        self.mirror.full_check_every = 2
+        self.mirror.sync_once()
+        first = self.mirror.metrics.last_consistent_at
+
+        # Counts are unchanged, so an in-place update could have been missed.
+        self.mirror.sync_once()
+        self.assertEqual(self.mirror.metrics.last_consistent_at, first)
+
+        self.mirror.sync_once()
+        self.assertGreater(self.mirror.metrics.last_consistent_at, first)
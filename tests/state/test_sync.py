@@ -0,0 +1,152 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from requests import Session
+
+from src.kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.state.snapshot import WorkspaceSnapshot
+from kong_gateway_client.state.sync import StateSync
+import json
+
+
+class MockResponse:
+    def __init__(self, json_data):
+        self.json_data = json_data
+        self.content = json.dumps(json_data).encode("utf-8") if json_data else b""
+        self.ok = True
+
+    def json(self):
+        return self.json_data
+
+    def raise_for_status(self):
+        pass
+
+
+SNAPSHOT = {
+    "services": [
+        {
+            "id": "s1",
+            "name": "orders",
+            "protocol": "http",
+            "host": "orders",
+            "port": 8080,
+            "path": None,
+            "retries": 5,
+        },
+        {"id": "s2", "name": "legacy", "protocol": "http", "host": "legacy"},
+    ],
+    "routes": [
+        {"id": "r1", "name": "orders", "paths": ["/orders"], "service": {"id": "s1"}},
+        {"id": "r2", "name": "legacy", "paths": ["/legacy"], "service": {"id": "s2"}},
+    ],
+    "plugins": [
+        {
+            "id": "p1",
+            "name": "key-auth",
+            "route": {"id": "r1"},
+            "service": None,
+            "consumer": None,
+            "config": {"key_names": ["apikey"], "hide_credentials": False},
+        }
+    ],
+}
+
+DESIRED = {
+    "services": [{"name": "orders", "url": "http://orders:8080"}],
+    "routes": [{"name": "orders", "service": "orders", "paths": ["/orders"]}],
+    "plugins": [
+        {"name": "key-auth", "route": "orders", "config": {"key_names": ["apikey"]}}
+    ],
+}
+
+
+class TestStateSync(unittest.TestCase):
+    def setUp(self):
+        mock_response_auth = MagicMock()
+        mock_response_auth.json.return_value = {"auth_key": "some_auth_value"}
+        mock_response_auth.raise_for_status.return_value = None
+
+        self.get_patcher = patch.object(Session, "get", return_value=mock_response_auth)
+        self.request_patcher = patch.object(
+            Session, "request", return_value=MockResponse({})
+        )
+
+        self.mock_get = self.get_patcher.start()
+        self.mock_request = self.request_patcher.start()
+
+        self.client = KongAPIClient(
+            "http://mock-url", admin_token="mock-pass"
+        ).get_kong_client()
+        self.sync = StateSync(self.client, max_workers=1)
+        self.snapshot = WorkspaceSnapshot(SNAPSHOT)
+
+    def tearDown(self):
+        self.get_patcher.stop()
+        self.request_patcher.stop()
+
+    def test_diff_unchanged_entities_only_deletes_extras(self):
+        plan = self.sync.diff(DESIRED, self.snapshot)
+
+        self.assertEqual(plan.creates, [])
+        self.assertEqual(plan.updates, [])
+        self.assertEqual(
+            [(op.entity_type, op.entity_id) for op in plan.deletes],
+            [("services", "s2"), ("routes", "r2")],
+        )
+
+    def test_diff_without_delete_missing_is_empty(self):
+        self.sync.delete_missing = False
+        self.assertTrue(self.sync.diff(DESIRED, self.snapshot).is_empty)
+
+    def test_diff_detects_updates_and_creates(self):
+        desired = {
+            "services": [
+                {"name": "orders", "url": "http://orders:9090"},
+                {"name": "billing", "url": "https://billing"},
+            ],
+            "routes": [
+                {"name": "orders", "service": "orders", "paths": ["/orders"]},
+                {"name": "billing", "service": {"name": "billing"}, "paths": ["/b"]},
+            ],
+        }
+        self.sync.delete_missing = False
+        plan = self.sync.diff(desired, self.snapshot)
+
+        self.assertEqual([op.key for op in plan.updates], ["orders"])
+        self.assertEqual(plan.updates[0].changes, ["port"])
+        billing_id = self.client.service.id_for("billing")
+        self.assertEqual(
+            [(op.entity_type, op.entity_id) for op in plan.creates],
+            [("services", billing_id), ("routes", self.client.route.id_for("billing"))],
+        )
+        self.assertEqual(plan.creates[0].payload["port"], 443)
+        self.assertEqual(plan.creates[1].payload["service"], {"id": billing_id})
+
+    def test_diff_unknown_reference_raises(self):
+        desired = {"routes": [{"name": "orphan", "service": "missing"}]}
+        with self.assertRaises(ValueError):
+            self.sync.diff(desired, self.snapshot)
+
+    def test_apply_runs_in_dependency_order(self):
+        desired = {
+            "services": [{"name": "billing", "url": "https://billing"}],
+            "routes": [{"name": "billing", "service": "billing", "paths": ["/b"]}],
+        }
+        plan = self.sync.diff(desired, self.snapshot)
+        result = self.sync.apply(plan)
+
+        self.assertTrue(result.ok)
+        calls = [
+            (c[0][0], c[0][1].split("/")[4]) for c in self.mock_request.call_args_list
+        ]
+        self.assertEqual(
+            calls,
+            [
+                ("PUT", "services"),
+                ("PUT", "routes"),
+                ("DELETE", "plugins"),
+                ("DELETE", "routes"),
+                ("DELETE", "routes"),
+                ("DELETE", "services"),
+                ("DELETE", "services"),
+            ],
+        )
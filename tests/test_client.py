@@ -98,6 +98,19 @@ class TestKongClient(unittest.TestCase):
         self.assertEqual(len(result), 3)
         self.assertEqual(result[2]["name"], "item3")
 
+    def test_for_workspace(self):
+        self.mock_request.return_value = MockResponse({"id": "1", "name": "svc"})
+
+        workspace_client = self.client.for_workspace("team-a")
+        workspace_client.service.get("svc")
+
+        self.assertEqual(
+            self.mock_request.call_args[0][1], "http://mock-url/team-a/services/svc"
+        )
+        self.assertIs(workspace_client.session, self.client.session)
+        self.assertEqual(self.client.target_workspace, "default")
+        self.assertIs(workspace_client.service.client, workspace_client)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import requests
+
+from kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.instrumentation import (
+    LatencyHistogram,
+    RequestBudgetExceeded,
+    RequestMetrics,
+    endpoint_template,
+)
+from kong_gateway_client.testing.fake_admin_api import FakeAdminAPI
+
+
+class TestEndpointTemplate(unittest.TestCase):
+    def test_replaces_ids_and_drops_query(self):
+        self.assertEqual(
+            endpoint_template("/consumers/alice/acls/123?size=10"),
+            "/consumers/{id}/acls/{id}",
+        )
+        self.assertEqual(endpoint_template("/consumers?offset=abc"), "/consumers")
+        self.assertEqual(
+            endpoint_template("/consumer_groups/gold/overrides/plugins/rla"),
+            "/consumer_groups/{id}/overrides/plugins/{id}",
+        )
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = LatencyHistogram((0.01, 0.1, 1.0))
+        for seconds in (0.001, 0.002, 0.05, 0.5, 3.0):
+            histogram.observe(seconds)
+
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(histogram.quantile(0.4), 0.01)
+        self.assertEqual(histogram.quantile(0.6), 0.1)
+        self.assertEqual(histogram.quantile(1.0), 1.0)
+
+
+class TestRequestHooks(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeAdminAPI().start()
+        self.client = KongAPIClient(self.api.url, admin_token="test").get_kong_client()
+        self.api.load("consumers", [{"username": f"user-{i}"} for i in range(3)])
+
+    def tearDown(self):
+        self.api.stop()
+
+    def test_hooks_receive_events(self):
+        events = []
+        self.client.hooks.before_request.append(lambda e: events.append(("before", e)))
+        self.client.hooks.after_response.append(lambda e: events.append(("after", e)))
+        self.client.hooks.on_error.append(lambda e: events.append(("error", e)))
+
+        self.client.consumer.get("user-1")
+        with self.assertRaises(requests.HTTPError):
+            self.client.consumer.get("missing")
+
+        kinds = [kind for kind, _ in events]
+        self.assertEqual(kinds, ["before", "after", "before", "error"])
+        event = events[1][1]
+        self.assertEqual(event.template, "/consumers/{id}")
+        self.assertEqual((event.status, event.workspace), (200, "default"))
+        self.assertGreater(event.response_bytes, 0)
+        self.assertEqual(events[3][1].status, 404)
+
+    def test_metrics_group_by_template(self):
+        metrics = RequestMetrics()
+        self.client.hooks.register(metrics)
+        for i in range(3):
+            self.client.consumer.get(f"user-{i}")
+        self.client.fetch_all("/consumers", size=2)
+        self.client.hooks.unregister(metrics)
+        self.client.consumer.get("user-0")
+
+        stats = metrics.get("GET", "/consumers/user-0")
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(metrics.get("GET", "/consumers").count, 2)
+        self.assertEqual(metrics.endpoints()[0].template, "/consumers/{id}")
+        self.assertFalse(self.client.hooks)
+
+        text = metrics.to_prometheus()
+        labels = 'method="GET",endpoint="/consumers/{id}",workspace="default"'
+        self.assertIn(f'kong_client_requests_total{{{labels},status="200"}} 3', text)
+        self.assertIn(
+            f'kong_client_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3',
+            text,
+        )
+
+    def test_request_budget_raises_with_breakdown(self):
+        with self.assertRaises(RequestBudgetExceeded) as context:
+            with self.client.request_budget(max_calls=2):
+                for i in range(3):
+                    self.client.consumer.get(f"user-{i}")
+
+        message = str(context.exception)
+        self.assertIn("3 requests, over the budget of 2", message)
+        self.assertIn("3 GET /consumers/{id}", message)
+        self.assertFalse(self.client.hooks)
+
+    def test_request_budget_by_endpoint(self):
+        with self.client.request_budget(
+            by_endpoint={"GET /consumers/{id}": 0, "/consumers": 1}, strict=False
+        ) as budget:
+            self.client.fetch_all("/consumers")
+            self.client.consumer.get("user-0")
+
+        self.assertEqual(budget.calls, 2)
+        self.assertEqual(
+            budget.violations, ["1 GET /consumers/{id} requests, over the budget of 0"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.testing.fake_admin_api import FakeAdminAPI
+
+
+class TestClientProfiler(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeAdminAPI().start()
+        self.client = KongAPIClient(self.api.url, admin_token="test").get_kong_client()
+        self.api.load("consumers", [{"username": f"user-{i}"} for i in range(50)])
+
+    def tearDown(self):
+        self.api.stop()
+
+    def test_attributes_requests_to_open_operations(self):
+        with self.client.profile() as profiler:
+            with profiler.operation("get_all") as get_all:
+                self.client.fetch_all("/consumers", size=20)
+            self.client.consumer.get("user-0")
+
+        total = profiler.operations[0]
+        self.assertEqual([op.name for op in profiler.operations], ["total", "get_all"])
+        self.assertEqual((get_all.requests, total.requests), (3, 4))
+        self.assertGreater(get_all.network, 0)
+        self.assertGreater(get_all.decode, 0)
+        self.assertGreater(get_all.response_bytes, 0)
+        self.assertLessEqual(get_all.network + get_all.decode, get_all.wall)
+        self.assertGreaterEqual(total.wall, get_all.wall)
+        self.assertIsNone(get_all.memory_peak)
+        self.assertFalse(self.client.hooks)
+
+        report = profiler.report()
+        self.assertIn("network %", report)
+        self.assertIn("get_all", report)
+
+    def test_counts_errors(self):
+        with self.client.profile() as profiler:
+            with self.assertRaises(Exception):
+                self.client.consumer.get("missing")
+        self.assertEqual(profiler.operations[0].errors, 1)
+
+    def test_trace_memory(self):
+        with self.client.profile(trace_memory=True, top=3) as profiler:
+            with profiler.operation("get_all") as get_all:
+                consumers = self.client.consumer.get_all()
+        self.assertEqual(len(consumers), 50)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreater(get_all.memory_peak, 0)
+        self.assertGreaterEqual(profiler.operations[0].memory_peak, get_all.memory_peak)
+        self.assertEqual(len(get_all.top_allocations), 3)
+        self.assertIn("Top allocations in get_all:", profiler.report())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            profiler.write(path)
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        self.assertEqual(data["operations"][1]["name"], "get_all")
+        self.assertEqual(data["operations"][1]["requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import logging
+import unittest
+from unittest import mock
+
+import requests
+
+from kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.request_log import RequestLog
+from kong_gateway_client.testing.fake_admin_api import FakeAdminAPI
+
+
+class TestRequestLog(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeAdminAPI().start()
+        self.client = KongAPIClient(self.api.url, admin_token="test").get_kong_client()
+        self.api.load("consumers", [{"username": "alice"}])
+
+    def tearDown(self):
+        self.api.stop()
+
+    def test_logs_failures_with_context(self):
+        self.api.inject_error(500, path="/default/consumers/alice", times=1)
+        with self.assertLogs("kong_gateway_client", logging.WARNING) as logs:
+            with self.assertRaises(requests.HTTPError):
+                self.client.consumer.get("alice")
+
+        (record,) = logs.records
+        self.assertIn("Request GET /consumers/{id} failed: 500", record.getMessage())
+        self.assertEqual(record.kong_request["workspace"], "default")
+        self.assertEqual(record.kong_request["status"], 500)
+        self.assertGreaterEqual(record.kong_request["duration"], 0)
+
+    def test_not_found_is_debug(self):
+        with self.assertLogs("kong_gateway_client", logging.DEBUG) as logs:
+            with self.assertRaises(requests.HTTPError):
+                self.client.consumer.get("missing")
+        self.assertEqual(logs.records[0].levelno, logging.DEBUG)
+
+    def test_slow_requests_and_truncation(self):
+        self.client.request_log = RequestLog(slow_threshold=0.0, body_limit=10)
+        with self.assertLogs("kong_gateway_client", logging.WARNING) as logs:
+            self.client.consumer.get("alice")
+
+        record = logs.records[0]
+        self.assertTrue(record.getMessage().startswith("Slow request GET"))
+        self.assertRegex(
+            record.kong_request["body"], r"^.{10}\.\.\. \(\d+ characters\)$"
+        )
+
+    def test_samples_bursts(self):
+        self.client.request_log = RequestLog(burst=2, window=60)
+        self.api.inject_error(503, path="/default/consumers/alice")
+        with mock.patch("kong_gateway_client.request_log.time.monotonic") as clock:
+            clock.return_value = 0.0
+            with self.assertLogs("kong_gateway_client", logging.WARNING) as logs:
+                for _ in range(5):
+                    with self.assertRaises(requests.HTTPError):
+                        self.client.consumer.get("alice")
+                clock.return_value = 61.0
+                with self.assertRaises(requests.HTTPError):
+                    self.client.consumer.get("alice")
+
+        self.assertEqual(len(logs.records), 3)
+        self.assertIn("(3 similar suppressed)", logs.records[2].getMessage())
+        self.assertEqual(logs.records[2].kong_request["suppressed"], 3)
+
+    def test_validates_sampling(self):
+        with self.assertRaises(ValueError):
+            RequestLog(burst=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import requests
+
+from kong_gateway_client.api import KongAPIClient
+from kong_gateway_client.testing.fake_admin_api import FakeAdminAPI
+
+
+class TestFakeAdminAPI(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeAdminAPI().start()
+        self.client = KongAPIClient(self.api.url, admin_token="test").get_kong_client()
+
+    def tearDown(self):
+        self.api.stop()
+
+    def test_pagination_follows_workspace_relative_next(self):
+        self.api.load("consumers", [{"username": f"user-{i}"} for i in range(25)])
+
+        consumers = self.client.fetch_all("/consumers", size=10)
+
+        self.assertEqual([c["username"] for c in consumers][:2], ["user-0", "user-1"])
+        self.assertEqual(len(consumers), 25)
+        self.assertEqual(self.api.calls, [("GET", "/default/consumers")] * 3)
+
+    def test_tags_filter(self):
+        self.api.load(
+            "services",
+            [
+                {"name": "a", "host": "a.local", "tags": ["team-a", "prod"]},
+                {"name": "b", "host": "b.local", "tags": ["team-b", "prod"]},
+                {"name": "c", "host": "c.local", "tags": ["team-a"]},
+            ],
+        )
+
+        both = self.client.fetch_all("/services?tags=team-a,prod")
+        either = self.client.fetch_all("/services?tags=team-b/team-a", size=1)
+
+        self.assertEqual([s["name"] for s in both], ["a"])
+        self.assertEqual([s["name"] for s in either], ["a", "b", "c"])
+
+    def test_sort_by(self):
+        self.api.load("consumers", [{"username": u} for u in ("bob", "carol", "al")])
+
+        ascending = self.client.fetch_all("/consumers?sort_by=username", size=2)
+        descending = self.client.fetch_all("/consumers?sort_by=username&sort_desc=true")
+
+        self.assertEqual([c["username"] for c in ascending], ["al", "bob", "carol"])
+        self.assertEqual([c["username"] for c in descending], ["carol", "bob", "al"])
+
+    def test_workspaces_are_isolated(self):
+        self.client.workspace.create("team")
+        team = self.client.for_workspace("team")
+        team.consumer.create("alice", "alice-1")
+
+        self.assertEqual(len(team.fetch_all("/consumers")), 1)
+        self.assertEqual(self.client.fetch_all("/consumers"), [])
+        metadata = self.client.workspace.get_metadata("team")
+        self.assertEqual(metadata.counts["consumers"], 1)
+
+    def test_nested_routes_and_unique_plugins(self):
+        service = self.client.request(
+            "POST", "/services", json={"name": "api", "url": "https://api.local/v1"}
+        )
+        self.client.request(
+            "POST", "/services/api/routes", json={"name": "r", "paths": ["/v1"]}
+        )
+        first = self.client.plugin_resource.upsert("key-auth", service_id=service.id)
+        again = self.client.plugin_resource.upsert("key-auth", service_id=service.id)
+
+        self.assertEqual((service.protocol, service.port), ("https", 443))
+        self.assertEqual(first.id, again.id)
+        self.assertEqual(len(self.client.fetch_all("/services/api/plugins")), 1)
+        with self.assertRaises(requests.HTTPError) as context:
+            self.client.request(
+                "POST", "/plugins", json={"name": "key-auth", "service": {"id": "api"}}
+            )
+        self.assertEqual(context.exception.response.status_code, 409)
+
+    def test_consumer_group_membership(self):
+        self.api.load("consumers", [{"username": f"user-{i}"} for i in range(12)])
+        self.client.consumer_group.create("gold")
+
+        changes = self.client.consumer_group.add_consumers(
+            "gold", [f"user-{i}" for i in range(12)], batch_size=5
+        )
+        self.client.consumer_group.remove_consumers("gold", ["user-0"])
+        self.client.request("DELETE", "/consumers/user-1")
+
+        self.assertEqual(len(changes.added), 12)
+        self.assertEqual(self.client.consumer_group.count_consumers("gold", size=5), 10)
+        groups = self.client.request("GET", "/consumers/user-2/consumer_groups")
+        self.assertEqual([g["name"] for g in groups.consumer_groups], ["gold"])
+
+        with self.assertRaises(requests.HTTPError) as context:
+            self.client.request(
+                "POST",
+                "/consumer_groups/gold/consumers",
+                json={"consumer": ["user-2", "user-11"]},
+            )
+        self.assertEqual(context.exception.response.status_code, 409)
+
+    def test_error_injection(self):
+        rule = self.api.inject_error(503, times=1, method="GET", path="/consumers$")
+
+        with self.assertRaises(requests.HTTPError) as context:
+            self.client.request("GET", "/consumers")
+        self.client.request("GET", "/consumers")
+
+        self.assertEqual(context.exception.response.status_code, 503)
+        self.assertEqual(rule.triggered, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+import uuid
+
+from kong_gateway_client.utils.ids import deterministic_id
+
+
+class TestDeterministicId(unittest.TestCase):
+    def test_same_inputs_give_same_id(self):
+        first = deterministic_id("services", "orders", "default")
+        second = deterministic_id("services", "orders", "default")
+        self.assertEqual(first, second)
+        self.assertEqual(uuid.UUID(first).version, 5)
+
+    def test_inputs_are_scoped(self):
+        base = deterministic_id("services", "orders", "default")
+        self.assertNotEqual(base, deterministic_id("routes", "orders", "default"))
+        self.assertNotEqual(base, deterministic_id("services", "orders", "team-a"))
+        self.assertNotEqual(base, deterministic_id("services", "billing", "default"))
+
+    def test_empty_inputs_raise(self):
+        with self.assertRaises(ValueError):
+            deterministic_id("services", "", "default")